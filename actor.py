@@ -1,6 +1,11 @@
 import tkinter as tk
 from tkinter import messagebox, simpledialog, filedialog, ttk, Menu
 import json
+import configparser
+from engine.compiler import compile_script, validate_script
+from engine.pacing import Pacing
+from engine.session import input_options_from_config, max_workers_from_config
+from engine.estimate import estimate, format_estimate
 
 class ScriptManager:
     def __init__(self):
@@ -33,6 +38,22 @@ class ScriptManager:
         with open(filename, 'r', encoding='utf-8') as f:
             self.scripts = json.load(f)
 
+    def check_script(self, config_file="config.ini"):
+        """检查指令并估算运行时间，节奏和循环次数按运行器的配置文件计算
+        Returns:
+            (错误列表, 估算结果文本行)，有错误时估算结果为空
+        """
+        errors = validate_script(self.scripts)
+        if errors:
+            return errors, []
+        config = configparser.ConfigParser()
+        config.read(config_file, encoding='utf-8')
+        program = compile_script(self.scripts)
+        result = estimate(program, Pacing.from_config(config), config.getint('Settings', 'max_loops', fallback=3),
+                          input_options_from_config(config))
+        return [], format_estimate(result, config.getint('Settings', 'sessions', fallback=1),
+                                   max_workers_from_config(config))
+
 class App:
     def __init__(self, root):
         self.manager = ScriptManager()
@@ -54,6 +75,9 @@ class App:
         clear_button = tk.Button(top_frame, text="清空列表", command=self.clear_scripts)
         clear_button.pack(side=tk.LEFT, padx=5)
 
+        check_button = tk.Button(top_frame, text="检查脚本", command=self.check_script)
+        check_button.pack(side=tk.LEFT, padx=5)
+
         # 创建主框架
         main_frame = tk.Frame(root)
         main_frame.pack(side=tk.TOP, fill=tk.BOTH, expand=True, padx=10, pady=5)
@@ -129,7 +153,9 @@ class App:
             self.get_input_text()
         elif command == "时间等待":
             self.get_time_wait_input()
-        elif command in ["循环起点", "循环终点", "回到顶部"]:
+        elif command == "循环起点":
+            self.get_loop_start_input()
+        elif command in ["循环终点", "回到顶部"]:
             self.command_join(command)
         else:
             params = simpledialog.askstring("输入参数", f"请输入参数 (指令: {command}):")
@@ -137,6 +163,20 @@ class App:
                 param_list = [param.strip() for param in params.split(',')] if params else []
                 self.command_join(command, param_list)
 
+    def get_loop_start_input(self):
+        """获取循环次数，留空则使用运行器的最大循环次数"""
+        count = simpledialog.askstring("循环起点", "循环次数（留空使用运行器设置）:")
+        if count is None:
+            return
+        count = count.strip()
+        if not count:
+            self.command_join("循环起点")
+            return
+        if not count.isdigit() or int(count) <= 0:
+            messagebox.showwarning("输入错误", "循环次数必须为正整数。")
+            return
+        self.command_join("循环起点", [count])
+
     def get_time_wait_input(self):
         """获取时间等待的秒数输入"""
         window = tk.Toplevel(self.root)
@@ -376,7 +416,19 @@ class App:
         if filename:
             self.manager.load_script(filename)
             self.update_command_listbox()
-            messagebox.showinfo("加载成功", "脚本已加载。")
+            errors, _ = self.manager.check_script()
+            if errors:
+                messagebox.showwarning("加载成功", "脚本已加载，但存在错误:\n" + "\n".join(str(e) for e in errors))
+            else:
+                messagebox.showinfo("加载成功", "脚本已加载。")
+
+    def check_script(self):
+        """检查脚本错误并显示预计运行时间"""
+        errors, lines = self.manager.check_script()
+        if errors:
+            messagebox.showerror("检查失败", "\n".join(str(e) for e in errors))
+        else:
+            messagebox.showinfo("检查通过", "\n".join(lines))
 
     def update_command_listbox(self):
         self.command_listbox.delete(0, tk.END)
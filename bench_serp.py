@@ -0,0 +1,100 @@
+import argparse
+import glob
+import os
+import sys
+import time
+import serp
+
+# 搜索结果页解析的离线基准测试：对保存的 HTML 样本比较各解析后端的耗时，并核对提取结果是否一致
+# 保存样本: python bench_serp.py --save 关键词 --pages 3
+# 运行测试: python bench_serp.py [样本目录或文件...] --repeat 50 --site example.com
+
+FIXTURE_DIR = os.path.join('fixtures', 'serp')
+
+
+def save_fixtures(query, pages, fixture_dir):
+    """抓取实时搜索结果页保存为样本"""
+    os.makedirs(fixture_dir, exist_ok=True)
+    stamp = time.strftime("%Y%m%d_%H%M%S")
+    for page in range(pages):
+        response = serp.fetch(serp.search_url(query, page))
+        if response.status_code != 200:
+            print(f"第 {page + 1} 页请求失败: {response.status_code}", file=sys.stderr)
+            return 1
+        path = os.path.join(fixture_dir, f"{stamp}_{page + 1}.html")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(response.text)
+        print(f"已保存: {path}")
+        time.sleep(1)
+    return 0
+
+
+def load_fixtures(paths):
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, '*.html'))))
+        elif os.path.isfile(path):
+            files.append(path)
+    pages = []
+    for file in files:
+        with open(file, 'r', encoding='utf-8') as f:
+            pages.append((file, f.read()))
+    return pages
+
+
+def bench(pages, backends, repeat, site=None):
+    """返回 后端 -> 每页平均耗时（毫秒），各后端提取的地址不一致时输出差异"""
+    timings = {}
+    baseline = None
+    for name in backends:
+        parse = serp.get_backend(name)
+        extracted = [parse(html) for _, html in pages]  # 预热，并用于核对结果
+        if baseline is None:
+            baseline = (name, extracted)
+        else:
+            for (file, _), expected, actual in zip(pages, baseline[1], extracted):
+                if expected != actual:
+                    print(f"{file}: {name} 与 {baseline[0]} 提取的地址不一致", file=sys.stderr)
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for _, html in pages:
+                if site:
+                    serp.find_site(html, site, name)
+                else:
+                    parse(html)
+        timings[name] = (time.perf_counter() - start) * 1000 / (repeat * len(pages))
+    return timings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="搜索结果页解析基准测试")
+    parser.add_argument('paths', nargs='*', default=[FIXTURE_DIR], help="样本目录或 HTML 文件")
+    parser.add_argument('-r', '--repeat', type=int, default=20, help="每个样本重复解析的次数")
+    parser.add_argument('-b', '--backend', action='append', help="只测试指定的后端，可重复")
+    parser.add_argument('--site', help="同时测试按域名查找该站点")
+    parser.add_argument('--save', metavar='QUERY', help="抓取该关键词的搜索结果页保存为样本")
+    parser.add_argument('--pages', type=int, default=1, help="--save 时保存的页数")
+    args = parser.parse_args(argv)
+
+    if args.save:
+        return save_fixtures(args.save, args.pages, args.paths[0])
+
+    pages = load_fixtures(args.paths)
+    if not pages:
+        print("未找到样本，请先运行: python bench_serp.py --save 关键词", file=sys.stderr)
+        return 1
+    backends = args.backend or serp.available_backends()
+    timings = bench(pages, backends, args.repeat, args.site)
+
+    slowest = max(timings.values())
+    print(f"样本 {len(pages)} 页，每页重复 {args.repeat} 次")
+    print(f"{'后端':<12}{'毫秒/页':>10}{'加速':>8}")
+    for name, ms in sorted(timings.items(), key=lambda item: item[1]):
+        print(f"{name:<12}{ms:>10.3f}{slowest / ms:>7.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,212 @@
+import asyncio
+import json
+import time
+import aiohttp
+from browser.bit import NON_IDEMPOTENT_PATHS, window_data
+
+
+class _ServiceUnavailable(Exception):
+    pass
+
+
+# 比特浏览器API异步调用，接口与 Bit 保持一致，所有方法均为协程
+class AsyncBit:
+    def __init__(self, url=None, headers=None, name=None, proxy=None, finger=None, abortImage=False, abortMedia=False,
+                 timeout=(3, 60), retries=3, backoff=0.3, limit=100, session=None, health_ttl=30):
+        """
+        Args:
+            timeout: (连接超时, 读取超时)
+            retries: 连接失败或服务暂时不可用时的重试次数
+            backoff: 重试退避系数，第 n 次重试前等待 backoff * 2 ** (n - 1) 秒
+            limit: 连接池的最大连接数
+            session: 可传入共享的 aiohttp.ClientSession，由调用方负责关闭
+            health_ttl: 健康检查结果的缓存秒数
+        """
+        if url:
+            self.url = url
+        else:
+            self.url = "http://127.0.0.1:54345"
+        if headers:
+            self.headers = headers
+        else:
+            self.headers = {'Content-Type': 'application/json'}
+        self.json_data = window_data(name, proxy, finger, abortImage, abortMedia)
+        self.ids = set()
+
+        self.timeout = aiohttp.ClientTimeout(connect=timeout[0], sock_read=timeout[1])
+        self.retries = retries
+        self.backoff = backoff
+        self.limit = limit
+        self.session = session
+        self._own_session = session is None
+
+        self.health_ttl = health_ttl
+        self._health = None
+        self._health_checked = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close_session()
+
+    def _get_session(self):
+        if self.session is None:
+            connector = aiohttp.TCPConnector(limit=self.limit)
+            self.session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+        return self.session
+
+    # 释放连接池
+    async def close_session(self):
+        if self.session is not None and self._own_session:
+            await self.session.close()
+            self.session = None
+
+    async def _post(self, path, json_data=None):
+        """向比特浏览器本地服务发送请求，返回解析后的JSON"""
+        data = json.dumps(json_data) if json_data is not None else None
+        session = self._get_session()
+        # 非幂等接口只重试连接失败，参见 Bit._create_session
+        retry_status = not path.startswith(NON_IDEMPOTENT_PATHS)
+        for attempt in range(self.retries + 1):
+            try:
+                async with session.post(f"{self.url}{path}", data=data, headers=self.headers,
+                                        timeout=self.timeout) as res:
+                    if res.status in (502, 503, 504) and retry_status and attempt < self.retries:
+                        raise _ServiceUnavailable(res.status)
+                    return await res.json(content_type=None)
+            except (aiohttp.ClientConnectorError, _ServiceUnavailable):
+                # 读取超时不重试：POST 请求可能已被服务端执行
+                if attempt >= self.retries:
+                    raise
+                await asyncio.sleep(self.backoff * 2 ** attempt)
+
+    async def health(self, max_age=None):
+        """查询服务健康状态，max_age 秒（缺省为 health_ttl）内的结果直接复用"""
+        max_age = self.health_ttl if max_age is None else max_age
+        if self._health is not None and time.monotonic() - self._health_checked < max_age:
+            return self._health
+        try:
+            res = await self._post("/health")
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            res = {'success': False, 'msg': str(e)}
+        self._health = res
+        self._health_checked = time.monotonic()
+        return res
+
+    @property
+    def status(self):
+        """最近一次健康检查结果：None 尚未检查，True 正常，False 异常"""
+        if self._health is None:
+            return None
+        return bool(self._health.get('success'))
+
+    # 创建浏览器窗口
+    async def create(self):
+        res = await self._post("/browser/update", self.json_data)
+        browser_id = res['data']['id']
+        print(f"浏览器ID:{browser_id}")
+        self.ids.add(browser_id)
+        return browser_id
+
+    # 批量创建浏览器窗口
+    async def create_many(self, n):
+        return await asyncio.gather(*(self.create() for _ in range(n)))
+
+    # 打开浏览器窗口
+    async def open(self, browser_id):
+        if browser_id not in self.ids:
+            return None
+        json_data = {"id": f'{browser_id}'}
+        return await self._post("/browser/open", json_data)
+
+    # 关闭浏览器窗口
+    async def close(self, browser_id):
+        if browser_id not in self.ids:
+            return None
+        json_data = {"id": f'{browser_id}'}
+        res = await self._post("/browser/close", json_data)
+        print("关闭浏览器窗口", res)
+        return res
+
+    # 批量关闭浏览器窗口，服务端没有按ID批量关闭的接口，并发逐个关闭
+    async def close_many(self, browser_ids):
+        return await asyncio.gather(*(self.close(browser_id) for browser_id in browser_ids))
+
+    # 关闭所有浏览器窗口
+    async def close_all(self):
+        print(await self._post("/browser/close/all"))
+
+    # 重置浏览器关闭状态
+    async def reset(self, browser_id):
+        if browser_id not in self.ids:
+            return None
+        json_data = {"id": f'{browser_id}'}
+        print("重置浏览器关闭状态", await self._post("/browser/reset", json_data))
+
+    # 删除浏览器窗口
+    async def delete(self, browser_id):
+        if browser_id not in self.ids:
+            return None
+        json_data = {"id": f'{browser_id}'}
+        print("删除浏览器窗口", await self._post("/browser/delete", json_data))
+        self.ids.discard(browser_id)
+
+    # 批量删除浏览器窗口，每次请求最多100个ID
+    async def delete_many(self, browser_ids, batch_size=100):
+        browser_ids = [browser_id for browser_id in browser_ids if browser_id in self.ids]
+        batches = [browser_ids[i:i + batch_size] for i in range(0, len(browser_ids), batch_size)]
+        results = await asyncio.gather(*(self._post("/browser/delete/ids", {"ids": ids}) for ids in batches))
+        for batch, res in zip(batches, results):
+            if res.get('success'):
+                self.ids.difference_update(batch)
+        print("批量删除浏览器窗口", f"{len(browser_ids)}个", results)
+        return results
+
+    # 获取浏览器窗口详情
+    async def detail(self, browser_id):
+        if browser_id not in self.ids:
+            return None
+        json_data = {"id": f'{browser_id}'}
+        return await self._post("/browser/detail", json_data)
+
+    # 清理窗口缓存
+    async def clear(self, browser_ids):
+        json_data = {"ids": browser_ids}
+        return await self._post("/cache/clear", json_data)
+
+    # 一键自适应排列窗口
+    async def flexable(self):
+        res = await self._post("/windowbounds/flexable")
+        print("一键自适应排列窗口", res)
+        return res['success']
+
+    # 批量修改窗口代理信息
+    async def proxy(self, json_data):
+        res = await self._post("/browser/proxy/update", json_data)
+        print("批量修改窗口代理信息", res)
+        return res['success']
+
+    # 随机指纹值
+    async def finger(self, browser_id):
+        if browser_id not in self.ids:
+            return None
+        json_data = {"browserId": f'{browser_id}'}
+        return await self._post("/browser/fingerprint/random", json_data)
+
+    # 固定指纹值
+    async def finger_fix(self, browser_id, finger):
+        if browser_id not in self.ids:
+            return None
+        if isinstance(finger, str):
+            finger = json.loads(finger)
+        json_data = {"ids": [browser_id], "browserFingerPrint": finger}
+        return await self._post("/browser/update/partial", json_data)
+
+    async def run(self, rpa_id):
+        json_data = {"id": f'{rpa_id}'}
+        print(await self._post("/rpa/run", json_data))
+
+    async def stop(self, rpa_id):
+        json_data = {"id": f'{rpa_id}'}
+        print(await self._post("/rpa/stop", json_data))
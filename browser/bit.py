@@ -1,11 +1,59 @@
 import requests
 import json
 import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# 非幂等接口：服务端可能已执行后才返回网关错误，重试会重复创建窗口或重复启动任务，只重试连接失败
+# 按地址前缀匹配，/browser/update/partial 也包含在内
+NON_IDEMPOTENT_PATHS = ('/browser/update', '/rpa/run')
+
+
+# 创建窗口的请求参数
+def window_data(name=None, proxy=None, finger=None, abortImage=False, abortMedia=False):
+    if not name:
+        name = time.time()
+    if proxy:
+        json_data = {
+            'name': name,  # 窗口名称
+            'remark': '',  # 备注
+            'proxyMethod': 2,  # 代理方式 2自定义 3 提取IP
+            # 自定义代理类型['noproxy', 'http', 'https', 'socks5', 'ssh']中一个，默认noproxy
+            'proxyType': proxy['type'],
+            'host': proxy['host'],  # 代理主机
+            'port': proxy['port'],  # 代理端口
+            'proxyUserName': proxy['username'],  # 代理账号
+            'proxyPassword': proxy['password'],
+            "browserFingerPrint": {  # 指纹对象
+                'coreVersion': '124'  # 内核版本，注意，win7/win8/winserver 2012 已经不支持112及以上内核了，无法打开
+            }
+        }
+    else:
+        json_data = {
+            'name': name,  # 窗口名称
+            'remark': '',  # 备注
+            'proxyMethod': 2,  # 代理方式 2自定义 3 提取IP
+            # 自定义代理类型['noproxy', 'http', 'https', 'socks5', 'ssh']中一个，默认noproxy
+            'proxyType': 'noproxy',
+            "browserFingerPrint": {  # 指纹对象
+                'coreVersion': '124'  # 内核版本，注意，win7/win8/winserver 2012 已经不支持112及以上内核了，无法打开
+            }
+        }
+    if abortImage:
+        json_data['abortImage'] = True
+    if abortMedia:
+        json_data['abortMedia'] = True
+    if finger:
+        json_data['browserFingerPrint'] = finger
+    return json_data
 
 
 # 比特浏览器API调用
 class Bit:
-    def __init__(self, url=None, headers=None, name=None, proxy=None, finger=None, abortImage=False, abortMedia=False):
+    def __init__(self, url=None, headers=None, name=None, proxy=None, finger=None, abortImage=False, abortMedia=False,
+                 timeout=(3, 60), retries=3, backoff=0.3, pool_size=10, health_ttl=30):
         if url:
             self.url = url
         else:
@@ -14,63 +62,106 @@ class Bit:
             self.headers = headers
         else:
             self.headers = {'Content-Type': 'application/json'}
-        if not name:
-            name = time.time()
-        if proxy:
-            self.json_data = {
-                'name': name,  # 窗口名称
-                'remark': '',  # 备注
-                'proxyMethod': 2,  # 代理方式 2自定义 3 提取IP
-                # 自定义代理类型['noproxy', 'http', 'https', 'socks5', 'ssh']中一个，默认noproxy
-                'proxyType': proxy['type'],
-                'host': proxy['host'],  # 代理主机
-                'port': proxy['port'],  # 代理端口
-                'proxyUserName': proxy['username'],  # 代理账号
-                'proxyPassword': proxy['password'],
-                "browserFingerPrint": {  # 指纹对象
-                    'coreVersion': '124'  # 内核版本，注意，win7/win8/winserver 2012 已经不支持112及以上内核了，无法打开
-                }
-            }
-        else:
-            self.json_data = {
-                'name': name,  # 窗口名称
-                'remark': '',  # 备注
-                'proxyMethod': 2,  # 代理方式 2自定义 3 提取IP
-                # 自定义代理类型['noproxy', 'http', 'https', 'socks5', 'ssh']中一个，默认noproxy
-                'proxyType': 'noproxy',
-                "browserFingerPrint": {  # 指纹对象
-                    'coreVersion': '124'  # 内核版本，注意，win7/win8/winserver 2012 已经不支持112及以上内核了，无法打开
-                }
-            }
-        if abortImage:
-            self.json_data['abortImage'] = True
-        if abortMedia:
-            self.json_data['abortMedia'] = True
-        if finger:
-            self.json_data['browserFingerPrint'] = finger
-        self.ids = []
-        self.health()
-
-    def health(self):
-        res = requests.post(f"{self.url}/health").json()
-        print(res)
+        self.json_data = window_data(name, proxy, finger, abortImage, abortMedia)
+        self.ids = set()
+
+        # 请求超时：(连接超时, 读取超时)，打开窗口可能较慢，读取超时给得较宽
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.session = self._create_session(self.url, retries, backoff, pool_size)
+
+        # 健康检查结果缓存，构造时只在后台检查，不阻塞调用方
+        self.health_ttl = health_ttl
+        self._health = None
+        self._health_checked = 0
+        self._health_lock = threading.Lock()
+        self._health_thread = None
+        self.probe()
+
+    @staticmethod
+    def _create_session(url, retries, backoff, pool_size):
+        """创建复用连接的会话，连接失败和服务暂时不可用时按退避重试"""
+        # 读取超时不重试：POST 请求可能已被服务端执行，重试会重复创建窗口
+        def adapter(status):
+            retry = Retry(total=retries, connect=retries, read=0, status=status,
+                          backoff_factor=backoff, status_forcelist=(502, 503, 504),
+                          allowed_methods=None, raise_on_status=False)
+            return HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+
+        session = requests.Session()
+        session.mount('http://', adapter(retries))
+        session.mount('https://', adapter(retries))
+        # requests 按最长前缀选择适配器，非幂等接口使用不重试状态码的适配器
+        for path in NON_IDEMPOTENT_PATHS:
+            session.mount(f"{url}{path}", adapter(0))
+        return session
+
+    def _post(self, path, json_data=None):
+        """向比特浏览器本地服务发送请求"""
+        data = json.dumps(json_data) if json_data is not None else None
+        return self.session.post(f"{self.url}{path}", data=data, headers=self.headers, timeout=self.timeout)
+
+    def _pipeline(self, func, items):
+        """在连接池范围内并发调用 func，按 items 顺序返回结果"""
+        items = list(items)
+        if not items:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.pool_size, len(items))) as executor:
+            return list(executor.map(func, items))
+
+    # 释放连接池
+    def close_session(self):
+        self.session.close()
+
+    def health(self, max_age=None):
+        """查询服务健康状态，max_age 秒（缺省为 health_ttl）内的结果直接复用"""
+        max_age = self.health_ttl if max_age is None else max_age
+        if self._health is not None and time.monotonic() - self._health_checked < max_age:
+            return self._health
+        try:
+            res = self._post("/health").json()
+        except (requests.RequestException, ValueError) as e:
+            res = {'success': False, 'msg': str(e)}
+        with self._health_lock:
+            self._health = res
+            self._health_checked = time.monotonic()
+        return res
+
+    def probe(self):
+        """在后台线程中刷新健康状态，已有检查在进行时直接返回"""
+        with self._health_lock:
+            if self._health_thread is not None and self._health_thread.is_alive():
+                return
+            self._health_thread = threading.Thread(target=self.health, args=(0,), daemon=True)
+            self._health_thread.start()
+
+    @property
+    def status(self):
+        """最近一次健康检查结果：None 尚未得到结果，True 正常，False 异常；结果过期时在后台刷新"""
+        if self._health is None:
+            return None
+        if time.monotonic() - self._health_checked >= self.health_ttl:
+            self.probe()
+        return bool(self._health.get('success'))
 
     # 创建浏览器窗口
     def create(self):
-        res = requests.post(f"{self.url}/browser/update",
-                            data=json.dumps(self.json_data), headers=self.headers).json()
+        res = self._post("/browser/update", self.json_data).json()
         browser_id = res['data']['id']
         print(f"浏览器ID:{browser_id}")
-        self.ids.append(browser_id)
+        self.ids.add(browser_id)
         return browser_id
 
+    # 批量创建浏览器窗口
+    def create_many(self, n):
+        return self._pipeline(lambda _: self.create(), range(n))
+
     # 打开浏览器窗口
     def open(self, browser_id):
         if browser_id not in self.ids:
             return None
         json_data = {"id": f'{browser_id}'}
-        res = requests.post(f"{self.url}/browser/open",
-                            data=json.dumps(json_data), headers=self.headers).json()
+        res = self._post("/browser/open", json_data).json()
         return res
 
     # 关闭浏览器窗口
@@ -78,54 +169,65 @@ class Bit:
         if browser_id not in self.ids:
             return None
         json_data = {"id": f'{browser_id}'}
-        print("关闭浏览器窗口", requests.post(f"{self.url}/browser/close",
-                                       data=json.dumps(json_data), headers=self.headers).json())
+        res = self._post("/browser/close", json_data).json()
+        print("关闭浏览器窗口", res)
+        return res
+
+    # 批量关闭浏览器窗口，服务端没有按ID批量关闭的接口，并发逐个关闭
+    def close_many(self, browser_ids):
+        return self._pipeline(self.close, browser_ids)
 
     # 关闭所有浏览器窗口
     def close_all(self):
-        print(requests.post(f"{self.url}/browser/close/all"))
+        print(self._post("/browser/close/all"))
 
     # 重置浏览器关闭状态
     def reset(self, browser_id):
         if browser_id not in self.ids:
             return None
         json_data = {"id": f'{browser_id}'}
-        print("重置浏览器关闭状态", requests.post(f"{self.url}/browser/reset",
-                                         data=json.dumps(json_data), headers=self.headers).json())
+        print("重置浏览器关闭状态", self._post("/browser/reset", json_data).json())
 
     # 删除浏览器窗口
     def delete(self, browser_id):
         if browser_id not in self.ids:
             return None
         json_data = {"id": f'{browser_id}'}
-        print("删除浏览器窗口", requests.post(f"{self.url}/browser/delete",
-                                       data=json.dumps(json_data), headers=self.headers).json())
-        self.ids.remove(browser_id)
+        print("删除浏览器窗口", self._post("/browser/delete", json_data).json())
+        self.ids.discard(browser_id)
+
+    # 批量删除浏览器窗口，每次请求最多100个ID
+    def delete_many(self, browser_ids, batch_size=100):
+        browser_ids = [browser_id for browser_id in browser_ids if browser_id in self.ids]
+        batches = [browser_ids[i:i + batch_size] for i in range(0, len(browser_ids), batch_size)]
+        results = self._pipeline(lambda ids: self._post("/browser/delete/ids", {"ids": ids}).json(), batches)
+        for batch, res in zip(batches, results):
+            if res.get('success'):
+                self.ids.difference_update(batch)
+        print("批量删除浏览器窗口", f"{len(browser_ids)}个", results)
+        return results
 
     # 获取浏览器窗口详情
     def detail(self, browser_id):
         if browser_id not in self.ids:
             return None
         json_data = {"id": f'{browser_id}'}
-        return requests.post(f"{self.url}/browser/delete",
-                             data=json.dumps(json_data), headers=self.headers).json()
+        return self._post("/browser/detail", json_data).json()
 
     # 清理窗口缓存
     def clear(self, browser_ids):
         json_data = {"ids": browser_ids}
-        return requests.post(f"{self.url}/cache/clear",
-                             data=json.dumps(json_data), headers=self.headers).json()
+        return self._post("/cache/clear", json_data).json()
 
     # 一键自适应排列窗口
     def flexable(self):
-        res = requests.post(f"{self.url}/windowbounds/flexable", headers=self.headers).json()
+        res = self._post("/windowbounds/flexable").json()
         print("一键自适应排列窗口", res)
         return res['success']
 
     # 批量修改窗口代理信息
     def proxy(self, json_data):
-        res = requests.post(f"{self.url}/browser/proxy/update",
-                            data=json.dumps(json_data), headers=self.headers).json()
+        res = self._post("/browser/proxy/update", json_data).json()
         print("批量修改窗口代理信息", res)
         return res['success']
 
@@ -134,23 +236,21 @@ class Bit:
         if browser_id not in self.ids:
             return None
         json_data = {"browserId": f'{browser_id}'}
-        return requests.post(f"{self.url}/browser/fingerprint/random",
-                             data=json.dumps(json_data), headers=self.headers).json()
+        return self._post("/browser/fingerprint/random", json_data).json()
 
     # 固定指纹值
     def finger_fix(self, browser_id, finger):
         if browser_id not in self.ids:
             return None
-        json_data = {"ids": [browser_id], "browserFingerPrint": json.loads(finger)}
-        return requests.post(f"{self.url}/browser/update/partial",
-                             data=json.dumps(json_data), headers=self.headers).json()
+        if isinstance(finger, str):
+            finger = json.loads(finger)
+        json_data = {"ids": [browser_id], "browserFingerPrint": finger}
+        return self._post("/browser/update/partial", json_data).json()
     
     def run(self, rpa_id):
         json_data = {"id": f'{rpa_id}'}
-        print(requests.post(f"{self.url}/rpa/run",
-                            data=json.dumps(json_data), headers=self.headers).json())
+        print(self._post("/rpa/run", json_data).json())
 
     def stop(self, rpa_id):
         json_data = {"id": f'{rpa_id}'}
-        print(requests.post(f"{self.url}/rpa/stop",
-                            data=json.dumps(json_data), headers=self.headers).json())
+        print(self._post("/rpa/stop", json_data).json())
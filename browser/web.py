@@ -2,7 +2,7 @@ import requests
 import json
 from browser.bit import Bit
 from selenium import webdriver
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, WebDriverException
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.desired_capabilities import DesiredCapabilities
@@ -11,6 +11,121 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.common.action_chains import ActionChains
 import time
 import random  # 确保导入 random 模块
+import threading
+import atexit
+
+
+# 浏览器连接管理
+# chromedriver 服务进程按驱动路径共享，每次打开窗口只新建 WebDriver 会话，不再启动新的进程。
+# 会话不跨窗口复用：打开比特窗口总是创建新窗口、关闭窗口后调试地址失效，缓存会话不会命中，
+# 这里只记录每个窗口的会话，在窗口关闭或进程退出时结束它们
+class DriverCache:
+    def __init__(self):
+        self.services = {}
+        self.drivers = {}  # 窗口ID -> [WebDriver]
+        self.lock = threading.Lock()
+
+    def _service(self, path):
+        """获取正在运行的 chromedriver 服务，进程已退出时重新启动"""
+        with self.lock:
+            service = self.services.get(path)
+            if service is None or not service.is_connectable():
+                service = Service(path)
+                service.start()
+                self.services[path] = service
+            return service
+
+    def attach(self, browser_id, path, address):
+        """通过共享的 chromedriver 服务连接到窗口的调试地址"""
+        options = webdriver.ChromeOptions()
+        options.add_experimental_option("debuggerAddress", address)
+        driver = webdriver.Remote(command_executor=self._service(path).service_url, options=options)
+        with self.lock:
+            self.drivers.setdefault(browser_id, []).append(driver)
+        return driver
+
+    def release(self, browser_id):
+        """结束窗口的所有会话"""
+        with self.lock:
+            drivers = self.drivers.pop(browser_id, [])
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass  # 窗口或 chromedriver 已经不存在，chromedriver 退出时抛出的是 urllib3 的连接错误
+
+    def shutdown(self):
+        """结束所有会话和 chromedriver 服务进程"""
+        with self.lock:
+            browser_ids = list(self.drivers)
+        for browser_id in browser_ids:
+            self.release(browser_id)
+        with self.lock:
+            services = list(self.services.values())
+            self.services.clear()
+        for service in services:
+            try:
+                service.stop()
+            except Exception:
+                pass
+
+
+driver_cache = DriverCache()
+atexit.register(driver_cache.shutdown)  # 进程退出时结束共享的 chromedriver 服务进程
+
+# 在页面中等待元素出现：已存在时立即返回，否则由 MutationObserver 在 DOM 变化时检查
+WAIT_FOR_ELEMENT_JS = """
+var selector = arguments[0], timeout = arguments[1], done = arguments[arguments.length - 1];
+if (document.querySelector(selector)) { done(true); return; }
+var timer = null;
+var observer = new MutationObserver(function () {
+    if (document.querySelector(selector)) {
+        observer.disconnect();
+        clearTimeout(timer);
+        done(true);
+    }
+});
+observer.observe(document.documentElement, {childList: true, subtree: true, attributes: true});
+timer = setTimeout(function () { observer.disconnect(); done(false); }, timeout);
+"""
+
+# 一次检查多个选择器，返回存在且可见的选择器
+LIVE_SELECTORS_JS = """
+return arguments[0].filter(function (selector) {
+    try {
+        var element = document.querySelector(selector);
+        if (!element) return false;
+        var style = window.getComputedStyle(element);
+        if (style.display === 'none' || style.visibility === 'hidden') return false;
+        var rect = element.getBoundingClientRect();
+        return rect.width > 0 && rect.height > 0;
+    } catch (e) {
+        return false;
+    }
+});
+"""
+
+# 通过脚本直接设置输入框的值，并触发 input/change 事件
+SET_VALUE_JS = """
+var element = arguments[0], value = arguments[1];
+element.focus();
+var proto = element instanceof HTMLTextAreaElement ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+var descriptor = Object.getOwnPropertyDescriptor(proto, 'value');
+if (descriptor && descriptor.set && element instanceof proto.constructor) {
+    descriptor.set.call(element, value);
+} else {
+    element.value = value;
+}
+element.dispatchEvent(new Event('input', {bubbles: true}));
+element.dispatchEvent(new Event('change', {bubbles: true}));
+"""
+
+# 文本输入方式
+INPUT_HUMAN = 'human'  # 逐字输入，字间随机延迟
+INPUT_CHUNK = 'chunk'  # 分段输入，段间随机延迟
+INPUT_FAST = 'fast'  # 一次输入全部文本
+INPUT_SCRIPT = 'script'  # 通过脚本设置值并触发事件
+INPUT_MODES = (INPUT_HUMAN, INPUT_CHUNK, INPUT_FAST, INPUT_SCRIPT)
 
 
 class Web:
@@ -21,11 +136,10 @@ class Web:
         self.path = self.open_res['data']['driver']
         self.address = self.open_res['data']['http']
 
-        self.chrome_options = webdriver.ChromeOptions()
-        self.chrome_options.add_experimental_option("debuggerAddress", self.address)
-
-        self.chrome_service = Service(self.path)
-        self.driver = webdriver.Chrome(service=self.chrome_service, options=self.chrome_options)
+        self.driver = driver_cache.attach(self.browser_id, self.path, self.address)
+        self.wait_mode = 'observe'  # 元素等待方式：observe 监听DOM变化，poll 轮询
+        self.set_input_mode(INPUT_HUMAN)
+        self._script_timeout = None
 
     # 访问URL
     def open(self, url):
@@ -71,31 +185,107 @@ class Web:
         except NoSuchElementException:
             print(f"元素未找到: {element_selector}")
 
+    # 可用元素
+    def live_selectors(self, element_selectors):
+        """在一次脚本调用中检查多个选择器，按原顺序返回页面上存在且可见的选择器
+        脚本执行失败（如页面正在跳转）时改为逐个检查
+        """
+        selectors = list(element_selectors)
+        try:
+            live = self.driver.execute_script(LIVE_SELECTORS_JS, selectors)
+        except WebDriverException:
+            return [selector for selector in selectors if self._visible(selector)]
+        live = set(live or ())
+        return [selector for selector in selectors if selector in live]
+
+    def _visible(self, element_selector):
+        """选择器的第一个匹配元素是否可见，选择器无效时视为不可见"""
+        try:
+            elements = self.driver.find_elements(By.CSS_SELECTOR, element_selector)
+            return bool(elements) and elements[0].is_displayed()
+        except WebDriverException:
+            return False
+
     # 元素等待
     def wait_for_element(self, element_selector, timeout=10):
-        """等待指定元素出现"""
+        """等待指定元素出现，元素一出现即返回；监听失败（如页面跳转）时改为轮询剩余时间"""
         end_time = time.time() + timeout
-        while time.time() < end_time:
+        if self.wait_mode == 'observe':
             try:
-                self.driver.find_element(By.CSS_SELECTOR, element_selector)
-                return True
-            except NoSuchElementException:
-                time.sleep(0.5)
+                if self._observe_element(element_selector, timeout):
+                    return True
+            except WebDriverException:
+                pass
+        if self._poll_element(element_selector, end_time):
+            return True
         print(f"超时: 元素未找到: {element_selector}")
         return False
 
+    def _observe_element(self, element_selector, timeout):
+        """在页面中注入 MutationObserver 等待元素，一次往返完成"""
+        # 异步脚本超时比页面内计时稍长，确保由页面返回结果
+        script_timeout = timeout + 1
+        if self._script_timeout != script_timeout:
+            self.driver.set_script_timeout(script_timeout)
+            self._script_timeout = script_timeout
+        return self.driver.execute_async_script(WAIT_FOR_ELEMENT_JS, element_selector, int(timeout * 1000))
+
+    def _poll_element(self, element_selector, end_time, interval=0.05, max_interval=0.5):
+        """轮询等待元素，间隔从 interval 开始翻倍，不超过 max_interval"""
+        while True:
+            if self.driver.find_elements(By.CSS_SELECTOR, element_selector):
+                return True
+            remaining = end_time - time.time()
+            if remaining <= 0:
+                return False
+            time.sleep(min(interval, remaining))
+            interval = min(interval * 2, max_interval)
+
+    # 页面就绪等待
+    def wait_ready(self, timeout=10):
+        """等待页面 document.readyState 为 complete"""
+        end_time = time.time() + timeout
+        while time.time() < end_time:
+            if self.driver.execute_script("return document.readyState") == "complete":
+                return True
+            time.sleep(0.1)
+        print(f"超时: 页面未加载完成: {self.get_current_url()}")
+        return False
+
     # 输入文本
+    def set_input_mode(self, mode, min_delay=0.2, max_delay=0.8, chunk_size=5):
+        """设置文本输入方式
+        Args:
+            mode: 输入方式，见 INPUT_MODES
+            min_delay, max_delay: 逐字或分段输入时的随机延迟范围（秒），均为0时不延迟
+            chunk_size: 分段输入时每段的字数
+        """
+        if mode not in INPUT_MODES:
+            raise ValueError(f"未知的输入方式: {mode}")
+        self.input_mode = mode
+        self.input_delay = (min_delay, max(min_delay, max_delay))
+        self.input_chunk = max(1, int(chunk_size))
+
     def input_text(self, element_selector, text):
-        """在指定元素中输入文本，一个字一个字地输入"""
+        """在指定元素中输入文本，输入方式由 set_input_mode 设置"""
         try:
             element = self.driver.find_element(By.CSS_SELECTOR, element_selector)
+            if self.input_mode == INPUT_SCRIPT:
+                self.driver.execute_script(SET_VALUE_JS, element, text)
+                return
+
             element.clear()  # 清空输入框
-            
-            for char in text:
-                element.send_keys(char)  # 一个字一个字地输入
-                # 生成随机延迟时间，范围可以根据需要调整
-                delay = random.uniform(0.2, 0.8)  # 随机延迟在0.2到0.8秒之间
-                time.sleep(delay)  # 随机延迟
+            if self.input_mode == INPUT_FAST:
+                element.send_keys(text)
+                return
+
+            size = 1 if self.input_mode == INPUT_HUMAN else self.input_chunk
+            min_delay, max_delay = self.input_delay
+            for start in range(0, len(text), size):
+                element.send_keys(text[start:start + size])
+                # 随机延迟，模拟人工输入
+                if max_delay > 0:
+                    time.sleep(random.uniform(min_delay, max_delay))
         except NoSuchElementException:
             print(f"元素未找到: {element_selector}")
 
@@ -117,7 +307,7 @@ class Web:
     # 关闭浏览器
     def close(self):
         """关闭浏览器"""
-        self.driver.quit()
+        driver_cache.release(self.browser_id)
     
     # 谷歌搜索
     def google(self, site, keyword, page):
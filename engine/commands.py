@@ -0,0 +1,237 @@
+import random
+import sys
+import time
+
+# browser.bit（requests）和 browser.web（selenium）较重，在首次用到的指令中才导入，
+# 编译和校验脚本时不需要加载它们
+
+
+# 指令处理函数
+# 每个函数接收运行上下文 ctx 和编译后的指令 instr，
+# 返回下一条指令的索引，返回 None 表示顺序执行下一条
+
+
+def create_bit_window(ctx, instr):
+    from browser.bit import Bit
+    args = instr.args
+    if args['abort_image']:
+        ctx.abort_image = True
+    if args['abort_media']:
+        ctx.abort_media = True
+    if args['proxy_use']:
+        ctx.proxy_use = True
+        ctx.proxy_api = args['proxy_api']
+    ctx.bit_window = Bit(args['url'], abortImage=ctx.abort_image, abortMedia=ctx.abort_media)
+    ctx.show_message("比特窗口创建成功", level="info")
+
+
+def open_bit_window(ctx, instr):
+    from browser.web import Web
+    if ctx.bit_window.status is False:
+        ctx.show_message(f"比特浏览器本地服务不可用: {ctx.bit_window.url}", level="warning")
+    ctx.bit_browser = ctx.bit_window.create()
+    ctx.web_browser = Web(ctx.bit_window, ctx.bit_browser)
+    if ctx.input_options:
+        ctx.web_browser.set_input_mode(**ctx.input_options)
+    ctx.show_message("比特窗口打开成功", level="info")
+
+
+def _release_driver(browser_id):
+    """结束窗口的 WebDriver 会话；browser.web 尚未加载说明从未连接过浏览器，无需处理"""
+    web = sys.modules.get('browser.web')
+    if web is not None:
+        web.driver_cache.release(browser_id)
+
+
+def close_bit_window(ctx, instr):
+    _release_driver(ctx.bit_browser)  # 窗口关闭后会话随之失效
+    ctx.bit_window.close(ctx.bit_browser)
+    ctx.show_message("比特窗口已关闭", level="info")
+
+
+def delete_bit_window(ctx, instr):
+    _release_driver(ctx.bit_browser)
+    ctx.bit_window.delete(ctx.bit_browser)
+    ctx.show_message("比特窗口已删除", level="info")
+
+
+def reset_bit_window(ctx, instr):
+    ctx.bit_window.reset(ctx.bit_browser)
+    ctx.show_message("窗口状态已重置", level="info")
+
+
+def detail_bit_window(ctx, instr):
+    detail = ctx.bit_window.detail(ctx.bit_browser)
+    ctx.show_message("窗口详情:", clear=True)
+    ctx.show_message(detail, level="info")
+
+
+def clear_cache(ctx, instr):
+    ctx.bit_window.clear([ctx.bit_browser])
+    ctx.show_message("窗口缓存已清理", level="info")
+
+
+def flexable(ctx, instr):
+    ctx.bit_window.flexable()
+    ctx.show_message("窗口已重新排列", level="info")
+
+
+def finger_random(ctx, instr):
+    if ctx.bit_window.finger(ctx.bit_browser):
+        ctx.show_message("窗口指纹已随机化", level="info")
+    else:
+        raise Exception("窗口随机指纹失败")
+
+
+def finger_fix(ctx, instr):
+    if ctx.bit_window.finger_fix(ctx.bit_browser, instr.args):
+        ctx.show_message("窗口指纹已修改", level="info")
+    else:
+        raise Exception("窗口指纹修改失败")
+
+
+def modify_proxy(ctx, instr):
+    if not ctx.proxy_use:
+        ctx.show_message("代理功能未启用", level="warning")
+        return
+
+    args = instr.args
+    if args['mode'] == "fixed":
+        proxy_data = {
+            'ids': [ctx.bit_browser],
+            'proxyMethod': 2,
+            'proxyType': args['type'],
+            'host': args['host'],
+            'port': args['port'],
+            'proxyUserName': args['username'],
+            'proxyPassword': args['password'],
+        }
+        if ctx.bit_window.proxy(proxy_data):
+            ctx.show_message(f"窗口代理已修改（固定模式）: {args['type']} {args['host']}:{args['port']} "
+                             f"{args['username']}/{args['password']}", level="info")
+        else:
+            raise Exception("窗口代理修改失败")
+    else:  # api
+        proxy = ctx.get_proxy()
+        if not proxy:
+            raise Exception("获取代理失败，无法修改窗口代理")
+        proxy_data = {
+            'ids': [ctx.bit_browser],
+            'proxyMethod': 2,
+            'proxyType': proxy['type'],
+            'host': proxy['ip'],
+            'port': proxy['port'],
+            'proxyUserName': proxy['username'],
+            'proxyPassword': proxy['password'],
+        }
+        if ctx.bit_window.proxy(proxy_data):
+            ctx.show_message(f"窗口代理已修改（接口模式）: {proxy['type']} {proxy['ip']}:{proxy['port']} "
+                             f"{proxy['username']}/{proxy['password']}", level="info")
+        else:
+            raise Exception("窗口代理修改失败")
+
+
+def open_url(ctx, instr):
+    ctx.web_browser.open(instr.args)
+    ctx.show_message(f"正在访问: {instr.args}", level="info")
+
+
+def scroll(ctx, instr):
+    scroll_pixels = instr.args['pixels']
+    if instr.args['random']:
+        # 根据滚动方向决定随机范围
+        if scroll_pixels > 0:
+            actual_pixels = random.randint(0, scroll_pixels)
+        else:
+            actual_pixels = random.randint(scroll_pixels, 0)
+        ctx.web_browser.scroll(str(actual_pixels))
+        ctx.show_message(f"随机滚动页面: {actual_pixels}像素", level="info")
+    else:
+        ctx.web_browser.scroll(str(scroll_pixels))
+        ctx.show_message(f"滚动页面: {scroll_pixels}像素", level="info")
+
+
+def top(ctx, instr):
+    ctx.web_browser.top()
+    ctx.show_message("回到顶部", level="info")
+
+
+def hover(ctx, instr):
+    ctx.web_browser.hover(instr.args)
+    ctx.show_message(f"鼠标悬停于元素: {instr.args}", level="info")
+
+
+def click(ctx, instr):
+    selectors = instr.args
+    if len(selectors) > 1:
+        # 只在页面上实际存在且可见的候选元素中随机选择
+        live = ctx.web_browser.live_selectors(selectors)
+        if not live:
+            ctx.show_message(f"候选元素均未找到: {', '.join(selectors)}", level="warning")
+            return
+        selected_selector = random.choice(live)
+        ctx.show_message(f"随机选择元素: {selected_selector}", level="info")
+        ctx.web_browser.click(selected_selector)
+    else:
+        ctx.web_browser.click(selectors[0])
+        ctx.show_message(f"点击元素: {selectors[0]}", level="info")
+
+
+def wait_for_element(ctx, instr):
+    ctx.web_browser.wait_for_element(instr.args)
+    ctx.show_message(f"等待元素出现: {instr.args}", level="info")
+
+
+def scroll_to_element(ctx, instr):
+    ctx.web_browser.scroll_to_element(instr.args)
+    ctx.show_message(f"滚动到元素: {instr.args}", level="info")
+
+
+def input_text(ctx, instr):
+    ctx.web_browser.input_text(instr.args['selector'], instr.args['text'])
+    ctx.show_message(f"在元素 {instr.args['selector']} 中输入文本", level="info")
+
+
+def time_wait(ctx, instr):
+    wait_time = instr.args['seconds']
+    if instr.args['random']:
+        wait_time = random.randint(1, wait_time)
+    ctx.show_message(f"时间等待共需{wait_time}秒", level="info")
+    ctx.waiting_time = time.monotonic() + wait_time
+
+
+def loop_start(ctx, instr):
+    # 循环栈中每一项为 [循环起点索引, 已完成次数]
+    ctx.loop_stack.append([instr.index, 0])
+    ctx.show_message(f"设置循环起点: 第 {instr.index + 1} 行", level="info")
+
+
+def loop_end(ctx, instr):
+    # 单步运行时可能从循环中间开始，此时补上对应的循环计数
+    if not ctx.loop_stack or ctx.loop_stack[-1][0] != instr.target:
+        ctx.loop_stack.append([instr.target, 0])
+    counter = ctx.loop_stack[-1]
+    max_loops = instr.args or ctx.max_loops
+    counter[1] += 1
+    if counter[1] < max_loops:
+        ctx.show_message(f"第 {counter[1]} 次循环完成，返回第 {instr.target + 1} 行", level="info")
+        return instr.target + 1
+    ctx.show_message(f"达到最大循环次数 {max_loops}，循环结束", level="info")
+    ctx.loop_stack.pop()
+    return None
+
+
+def google_search(ctx, instr):
+    args = instr.args
+    while True:
+        find = False
+        for page in range(args['start'] - 1, args['end']):
+            search_page = ctx.web_browser.google(args['site'], args['keyword'], page)
+            if search_page > 0:
+                ctx.show_message(f"Google搜索: 在第 {search_page} 页找到关键词 {args['keyword']} 搜索结果", level="info")
+                find = True
+                break
+            else:
+                raise Exception(f"Google搜索: 在第 {page + 1} 页未找到关键词 {args['keyword']} 搜索结果")
+        if find or not args['loop']:
+            break
@@ -0,0 +1,259 @@
+import json
+from engine import commands
+from engine.pacing import CONTROL, LOCAL, BROWSER
+
+
+class ScriptError(Exception):
+    """脚本编译错误，携带出错的行号"""
+
+    def __init__(self, index, command, message):
+        self.index = index
+        self.command = command
+        super().__init__(f"第 {index + 1} 行 '{command}': {message}")
+
+
+# 编译后的指令
+class Instruction:
+    __slots__ = ('index', 'command', 'params', 'args', 'handler', 'kind', 'target')
+
+    def __init__(self, index, command, params, args, handler, kind, target=None):
+        self.index = index  # 在脚本中的行号（从0开始）
+        self.command = command
+        self.params = params  # 原始参数，用于日志显示
+        self.args = args  # 解析后的参数
+        self.handler = handler  # 已绑定的处理函数
+        self.kind = kind  # 指令类别，决定执行节奏
+        self.target = target  # 循环跳转目标
+
+    def __repr__(self):
+        return f"Instruction({self.index}, {self.command!r}, {self.args!r})"
+
+
+def _need(params, count):
+    if len(params) < count:
+        raise ValueError(f"需要 {count} 个参数，实际 {len(params)} 个")
+
+
+def _flag(params, index):
+    """解析 是/否 参数，缺省为否"""
+    return len(params) > index and params[index] == '是'
+
+
+def _int(value, name):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"无效的{name}: {value}，必须为整数")
+
+
+def _none(params):
+    return None
+
+
+def _selector(params):
+    _need(params, 1)
+    return params[0]
+
+
+def _parse_create(params):
+    _need(params, 1)
+    proxy_api = params[4] if _flag(params, 3) and len(params) > 4 else None
+    if _flag(params, 3) and not proxy_api:
+        raise ValueError("启用代理时必须提供代理接口地址")
+    return {
+        'url': params[0],
+        'abort_image': _flag(params, 1),
+        'abort_media': _flag(params, 2),
+        'proxy_use': _flag(params, 3),
+        'proxy_api': proxy_api,
+    }
+
+
+def _parse_finger_fix(params):
+    _need(params, 1)
+    try:
+        return json.loads(params[0])
+    except json.JSONDecodeError as e:
+        raise ValueError(f"指纹JSON格式错误: {e}")
+
+
+def _parse_proxy(params):
+    """解析代理参数，固定模式格式为 {username}:{password}@{ip}:{port}，账号部分可省略"""
+    _need(params, 2)
+    proxy_mode, proxy_type = params[0], params[1]
+    if proxy_mode != "fixed":
+        return {'mode': 'api', 'type': proxy_type}
+
+    _need(params, 3)
+    parts = params[2].split('@')
+    if len(parts) > 2:
+        raise ValueError("代理参数格式应为: {username}:{password}@{ip}:{port}")
+    if len(parts) == 2:
+        user_pass, host_port = parts
+        user_pass_parts = user_pass.split(':')
+        if len(user_pass_parts) != 2:
+            raise ValueError("代理用户名和密码格式应为: username:password")
+        username, password = user_pass_parts
+    else:
+        host_port = parts[0]
+        username, password = '', ''
+
+    host_port_parts = host_port.split(':')
+    if len(host_port_parts) != 2:
+        raise ValueError("代理IP和端口格式应为: ip:port")
+    ip, port = host_port_parts
+    _int(port, "代理端口")
+    return {
+        'mode': 'fixed',
+        'type': proxy_type,
+        'host': ip,
+        'port': port,
+        'username': username,
+        'password': password,
+    }
+
+
+def _parse_url(params):
+    _need(params, 1)
+    return params[0]
+
+
+def _parse_scroll(params):
+    _need(params, 1)
+    return {'pixels': _int(params[0], "滚动像素"), 'random': _flag(params, 1)}
+
+
+def _parse_click(params):
+    _need(params, 1)
+    if ',' in params[0]:
+        return [s.strip() for s in params[0].split(',') if s.strip()]
+    return [params[0]]
+
+
+def _parse_input(params):
+    _need(params, 2)
+    return {'selector': params[0], 'text': params[1]}
+
+
+def _parse_wait(params):
+    _need(params, 1)
+    seconds = _int(params[0], "等待时间")
+    if seconds < 0:
+        raise ValueError(f"无效的等待时间: {params[0]}，不能为负数")
+    randomize = _flag(params, 1)
+    if randomize and seconds == 0:
+        # 随机等待在 1 到等待时间之间取值
+        raise ValueError(f"无效的等待时间: {params[0]}，随机等待时必须大于0")
+    return {'seconds': seconds, 'random': randomize}
+
+
+def _parse_loop_start(params):
+    """循环次数可选，缺省时使用运行器设置的最大循环次数"""
+    if not params or params[0] in (None, ''):
+        return None
+    count = _int(params[0], "循环次数")
+    if count <= 0:
+        raise ValueError(f"无效的循环次数: {params[0]}，必须大于0")
+    return count
+
+
+def _parse_google(params):
+    _need(params, 4)
+    start = _int(params[2], "起始页")
+    end = _int(params[3], "结束页")
+    if start <= 0 or end < start:
+        raise ValueError("起始页必须大于0，结束页必须大于等于起始页")
+    return {
+        'site': params[0],
+        'keyword': params[1],
+        'start': start,
+        'end': end,
+        'loop': _flag(params, 4),
+    }
+
+
+# 指令表：指令名称 -> (参数解析函数, 处理函数, 指令类别)
+COMMANDS = {
+    "创建比特窗口": (_parse_create, commands.create_bit_window, LOCAL),
+    "打开比特窗口": (_none, commands.open_bit_window, LOCAL),
+    "关闭比特窗口": (_none, commands.close_bit_window, LOCAL),
+    "删除比特窗口": (_none, commands.delete_bit_window, LOCAL),
+    "重置关闭状态": (_none, commands.reset_bit_window, LOCAL),
+    "获取窗口详情": (_none, commands.detail_bit_window, LOCAL),
+    "清理窗口缓存": (_none, commands.clear_cache, LOCAL),
+    "一键排列窗口": (_none, commands.flexable, LOCAL),
+    "窗口随机指纹": (_none, commands.finger_random, LOCAL),
+    "窗口固定指纹": (_parse_finger_fix, commands.finger_fix, LOCAL),
+    "修改窗口代理": (_parse_proxy, commands.modify_proxy, LOCAL),
+    "访问URL": (_parse_url, commands.open_url, BROWSER),
+    "滚动页面": (_parse_scroll, commands.scroll, BROWSER),
+    "回到顶部": (_none, commands.top, BROWSER),
+    "鼠标悬停": (_selector, commands.hover, BROWSER),
+    "鼠标点击": (_parse_click, commands.click, BROWSER),
+    "元素等待": (_selector, commands.wait_for_element, BROWSER),
+    "元素滚动": (_selector, commands.scroll_to_element, BROWSER),
+    "输入文本": (_parse_input, commands.input_text, BROWSER),
+    "时间等待": (_parse_wait, commands.time_wait, CONTROL),
+    "循环起点": (_parse_loop_start, commands.loop_start, CONTROL),
+    "循环终点": (_none, commands.loop_end, CONTROL),
+    "Google搜索": (_parse_google, commands.google_search, BROWSER),
+}
+
+
+def _compile(scripts):
+    """编译脚本并收集所有错误，返回 (指令列表, 错误列表)"""
+    if not isinstance(scripts, list):
+        return [], [ScriptError(-1, "", "脚本必须是指令列表")]
+
+    program = []
+    errors = []
+    loop_starts = []  # 未匹配的循环起点栈
+    for index, script in enumerate(scripts):
+        if not isinstance(script, dict) or 'command' not in script:
+            errors.append(ScriptError(index, "", "缺少 command 字段"))
+            continue
+        command = script['command']
+        params = script.get('params') or []
+        if command not in COMMANDS:
+            errors.append(ScriptError(index, command, "未知指令"))
+            continue
+
+        parser, handler, kind = COMMANDS[command]
+        try:
+            args = parser(params)
+        except ValueError as e:
+            errors.append(ScriptError(index, command, str(e)))
+            args = None
+
+        instr = Instruction(index, command, params, args, handler, kind)
+        program.append(instr)
+
+        # 匹配循环起点和循环终点，互相记录跳转目标，支持嵌套
+        if command == "循环起点":
+            loop_starts.append(instr)
+        elif command == "循环终点":
+            if not loop_starts:
+                errors.append(ScriptError(index, command, "没有匹配的循环起点"))
+                continue
+            start = loop_starts.pop()
+            start.target = index
+            instr.target = start.index
+            instr.args = start.args  # 循环终点共享起点的循环次数
+
+    for start in reversed(loop_starts):
+        errors.append(ScriptError(start.index, start.command, "没有匹配的循环终点"))
+    errors.sort(key=lambda e: e.index)
+    return program, errors
+
+
+def compile_script(scripts):
+    """将加载的JSON脚本编译为指令列表，参数错误在加载时即抛出 ScriptError（行号最小的一个）"""
+    program, errors = _compile(scripts)
+    if errors:
+        raise errors[0]
+    return program
+
+
+def validate_script(scripts):
+    """检查脚本而不执行，返回所有 ScriptError 的列表，没有错误时为空列表"""
+    return _compile(scripts)[1]
@@ -0,0 +1,95 @@
+import math
+from engine.pacing import BROWSER, READY_NONE, READY_ELEMENT, ELEMENT_COMMANDS
+
+# 脚本静态耗时估算：按时间等待参数、指令节奏和循环次数计算最坏情况下的运行时间，
+# 只计入脚本本身规定的等待，不含网络请求和页面加载的耗时
+
+ELEMENT_WAIT_TIMEOUT = 10  # Web.wait_for_element 的默认超时
+GOOGLE_PAGE_WAIT = 1  # Web.google 打开搜索页后的固定等待
+
+
+def _input_time(text, input_options):
+    """输入文本的最长耗时，与 Web.input_text 的输入方式一致"""
+    mode = input_options.get('mode', 'human')
+    if mode in ('fast', 'script'):
+        return 0
+    max_delay = input_options.get('max_delay', 0.8)
+    size = 1 if mode == 'human' else max(1, int(input_options.get('chunk_size', 5)))
+    return math.ceil(len(text) / size) * max_delay
+
+
+def instruction_cost(instr, pacing, input_options=None):
+    """单条指令执行一次在最坏情况下的耗时（秒），包括执行前后的节奏控制"""
+    input_options = input_options or {}
+    cost = 0
+    if instr.command == "时间等待":
+        # 随机等待的上限就是设定的秒数
+        cost += instr.args['seconds']
+    elif instr.command == "元素等待":
+        cost += ELEMENT_WAIT_TIMEOUT
+    elif instr.command == "输入文本":
+        cost += _input_time(instr.args['text'], input_options)
+    elif instr.command == "Google搜索":
+        # 当前页未找到即报错，最多搜索一页
+        cost += GOOGLE_PAGE_WAIT
+
+    if pacing.ready == READY_ELEMENT and instr.command in ELEMENT_COMMANDS:
+        cost += pacing.ready_timeout
+    if instr.kind == BROWSER and pacing.ready != READY_NONE:
+        cost += pacing.ready_timeout
+    else:
+        cost += pacing.delays.get(instr.kind, 0)
+    return cost
+
+
+def execution_counts(program, max_loops):
+    """每条指令的执行次数，嵌套循环的次数相乘；未指定次数的循环按 max_loops 计算"""
+    counts = []
+    multipliers = [1]
+    for instr in program:
+        counts.append(multipliers[-1])
+        if instr.command == "循环起点":
+            multipliers.append(multipliers[-1] * (instr.args or max_loops))
+        elif instr.command == "循环终点":
+            multipliers.pop()  # 循环终点每轮都执行，按循环内的次数计
+    return counts
+
+
+def estimate(program, pacing, max_loops=3, input_options=None):
+    """估算编译后的脚本单个会话的最长运行时间
+    Returns:
+        dict: {'total': 秒, 'steps': 执行的指令条数, 'commands': 指令 -> 秒}
+    """
+    result = {'total': 0, 'steps': 0, 'commands': {}}
+    for instr, count in zip(program, execution_counts(program, max_loops)):
+        cost = instruction_cost(instr, pacing, input_options) * count
+        result['total'] += cost
+        result['steps'] += count
+        result['commands'][instr.command] = result['commands'].get(instr.command, 0) + cost
+    return result
+
+
+def batch_time(total, sessions=1, max_workers=1):
+    """多个会话按并发上限分批运行时的总时间"""
+    return total * math.ceil(sessions / max(1, min(max_workers, sessions)))
+
+
+def format_duration(seconds):
+    seconds = int(math.ceil(seconds))
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    if hours:
+        return f"{hours}小时{minutes}分{seconds}秒"
+    if minutes:
+        return f"{minutes}分{seconds}秒"
+    return f"{seconds}秒"
+
+
+def format_estimate(result, sessions=1, max_workers=1):
+    """将估算结果格式化为文本行"""
+    lines = [f"预计最长运行时间: {format_duration(batch_time(result['total'], sessions, max_workers))}"
+             f"（单个会话 {format_duration(result['total'])}，执行 {result['steps']} 条指令，不含网络和页面加载耗时）"]
+    for command, seconds in sorted(result['commands'].items(), key=lambda item: item[1], reverse=True):
+        if seconds > 0:
+            lines.append(f"  {command}: {format_duration(seconds)}")
+    return lines
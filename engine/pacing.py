@@ -0,0 +1,67 @@
+# 指令节奏控制：按指令类别决定执行后的延迟，或等待页面就绪信号
+
+# 指令类别
+CONTROL = 'control'  # 流程控制，如循环、时间等待
+LOCAL = 'local'  # 本地比特浏览器接口调用
+BROWSER = 'browser'  # 浏览器页面操作
+
+# 就绪等待模式
+READY_NONE = 'none'  # 仅使用固定延迟
+READY_DOCUMENT = 'document'  # 页面操作后等待 document.readyState 为 complete
+READY_ELEMENT = 'element'  # 在 READY_DOCUMENT 基础上，元素操作前先等待元素出现
+
+# 操作元素的指令，就绪模式为 element 时在执行前等待元素出现
+ELEMENT_COMMANDS = {"鼠标悬停", "鼠标点击", "元素滚动", "输入文本"}
+
+
+def _selector(instr):
+    """取出指令操作的元素选择器，无法确定时返回 None"""
+    args = instr.args
+    if isinstance(args, str):
+        return args
+    if isinstance(args, dict):
+        return args.get('selector')
+    if isinstance(args, list) and len(args) == 1:
+        return args[0]
+    return None
+
+
+class Pacing:
+    def __init__(self, delays=None, ready=READY_NONE, ready_timeout=10):
+        self.delays = {CONTROL: 0, LOCAL: 0, BROWSER: 0.3}
+        if delays:
+            self.delays.update(delays)
+        self.ready = ready
+        self.ready_timeout = ready_timeout
+
+    @classmethod
+    def from_config(cls, config, section='Pacing'):
+        """从 configparser 配置中读取节奏设置，缺省项使用默认值"""
+        delays = {
+            CONTROL: config.getfloat(section, 'control_delay', fallback=0),
+            LOCAL: config.getfloat(section, 'local_delay', fallback=0),
+            BROWSER: config.getfloat(section, 'browser_delay', fallback=0.3),
+        }
+        ready = config.get(section, 'ready', fallback=READY_NONE)
+        if ready not in (READY_NONE, READY_DOCUMENT, READY_ELEMENT):
+            ready = READY_NONE
+        ready_timeout = config.getfloat(section, 'ready_timeout', fallback=10)
+        return cls(delays, ready, ready_timeout)
+
+    def before(self, ctx, instr):
+        """指令执行前：就绪模式为 element 时等待目标元素出现"""
+        if self.ready != READY_ELEMENT or instr.command not in ELEMENT_COMMANDS or ctx.web_browser is None:
+            return
+        selector = _selector(instr)
+        if selector:
+            ctx.web_browser.wait_for_element(selector, timeout=self.ready_timeout)
+
+    def after(self, ctx, instr, cancelled):
+        """指令执行后：页面操作按就绪信号等待，其余按类别延迟，cancelled() 为真时提前结束"""
+        if instr.kind == BROWSER and self.ready != READY_NONE:
+            if ctx.web_browser is not None:
+                ctx.web_browser.wait_ready(timeout=self.ready_timeout)
+            return
+        delay = self.delays.get(instr.kind, 0)
+        if delay > 0:
+            ctx.timer.wait(delay, cancelled)
@@ -0,0 +1,145 @@
+import importlib
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+# 耗时类别
+WEBDRIVER = 'webdriver'  # WebDriver 往返
+BIT_API = 'bit_api'  # 比特浏览器本地接口调用
+SLEEP = 'sleep'  # 等待和延迟
+PYTHON = 'python'  # 其余时间，即解释器自身的开销
+CATEGORIES = (WEBDRIVER, BIT_API, SLEEP, PYTHON)
+
+
+class _TimedTime:
+    """替换 browser.web 中的 time 模块，将其中的 sleep 计入等待时间"""
+
+    def __init__(self, profiler):
+        self._profiler = profiler
+
+    def __getattr__(self, name):
+        return getattr(time, name)
+
+    def sleep(self, seconds):
+        self._profiler.measure(SLEEP, time.sleep, seconds)
+
+
+# 脚本解释器性能分析
+# 只在开启时安装钩子：替换会话中比特接口、WebDriver 和定时器的方法，关闭后全部还原
+class Profiler:
+    def __init__(self):
+        self.totals = defaultdict(float)  # (指令, 类别) -> 秒
+        self.counts = defaultdict(int)  # 指令 -> 执行次数
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.patched = []
+        self.web_module = None
+
+    def _hook_web_module(self):
+        """替换 browser.web 的 time 模块以统计其内部的 sleep，并为连接浏览器计时
+        在会话创建比特窗口之后才安装，避免不使用浏览器的脚本导入 selenium；
+        必须在打开比特窗口之前安装，否则连接浏览器（启动 chromedriver、webdriver.Remote 建立会话）
+        这一最耗时的 WebDriver 调用会被计入 python
+        """
+        with self.lock:
+            if self.web_module is not None:
+                return
+            self.web_module = importlib.import_module('browser.web')
+            self.web_module.time = _TimedTime(self)
+        self._patch(self.web_module.driver_cache, ('attach',), WEBDRIVER)
+
+    def uninstall(self):
+        """还原所有钩子"""
+        if self.web_module is not None:
+            self.web_module.time = time
+            self.web_module = None
+        for obj, names in self.patched:
+            for name in names:
+                obj.__dict__.pop(name, None)
+            obj.__dict__.pop('_profiler', None)
+        self.patched = []
+
+    def _add(self, command, category, seconds):
+        with self.lock:
+            self.totals[(command, category)] += seconds
+
+    @contextmanager
+    def command(self, command, count=True):
+        """统计一条指令的总耗时，未被其他类别认领的时间计入 python"""
+        frame = {'command': command, 'children': 0.0, 'busy': False}
+        self.local.frame = frame
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            total = time.perf_counter() - start
+            self.local.frame = None
+            self._add(command, PYTHON, max(total - frame['children'], 0))
+            if count:
+                with self.lock:
+                    self.counts[command] += 1
+
+    def measure(self, category, func, *args, **kwargs):
+        """调用 func 并将耗时计入当前指令的 category，嵌套调用只统计最外层"""
+        frame = getattr(self.local, 'frame', None)
+        if frame is None or frame['busy']:
+            return func(*args, **kwargs)
+        frame['busy'] = True
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            frame['busy'] = False
+            frame['children'] += elapsed
+            self._add(frame['command'], category, elapsed)
+
+    def _patch(self, obj, names, category):
+        """用计时包装替换实例上的方法，同一个对象只替换一次"""
+        if obj is None or getattr(obj, '_profiler', None) is self:
+            return
+        for name in names:
+            original = getattr(type(obj), name).__get__(obj)
+            setattr(obj, name, lambda *args, _f=original, **kwargs: self.measure(category, _f, *args, **kwargs))
+        obj._profiler = self
+        self.patched.append((obj, names))
+
+    def instrument(self, session):
+        """为会话当前持有的比特接口、WebDriver 和定时器安装计时钩子"""
+        # 批量接口在线程池中调用 _post，工作线程没有当前指令，由调用线程按整个批量调用计时
+        self._patch(session.bit_window, ('_post', '_pipeline'), BIT_API)
+        if session.bit_window is not None:
+            self._hook_web_module()
+        if session.web_browser is not None:
+            self._patch(session.web_browser.driver, ('execute',), WEBDRIVER)
+        self._patch(session.timer, ('wait', 'wait_until'), SLEEP)
+
+    def run(self, session, instr, func):
+        """在分析模式下执行一条指令"""
+        self.instrument(session)
+        with self.command(instr.command):
+            return func(instr)
+
+    def wait_until(self, session, deadline, cancelled):
+        """时间等待指令的实际等待发生在执行循环中，计入该指令的耗时"""
+        self.instrument(session)
+        with self.command("时间等待", count=False):
+            return session.timer.wait_until(deadline, cancelled)
+
+    def summary(self):
+        """返回 指令 -> {类别: 秒}"""
+        result = {}
+        with self.lock:
+            for (command, category), seconds in self.totals.items():
+                result.setdefault(command, dict.fromkeys(CATEGORIES, 0.0))[category] = seconds
+        return result
+
+    def write_collapsed(self, path, root="脚本"):
+        """输出火焰图工具使用的折叠栈格式，每行为 '脚本;指令;类别 微秒数'"""
+        with open(path, 'w', encoding='utf-8') as f:
+            for command, categories in self.summary().items():
+                for category, seconds in categories.items():
+                    micros = int(seconds * 1000000)
+                    if micros > 0:
+                        f.write(f"{root};{command};{category} {micros}\n")
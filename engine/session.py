@@ -0,0 +1,250 @@
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event
+from engine.timer import Timer
+from engine.pacing import Pacing
+from engine.trace import command_event
+
+DEFAULT_MAX_WORKERS = os.cpu_count() or 1  # 未配置时的会话并发上限
+
+
+def max_workers_from_config(config, section='Settings'):
+    """读取会话并发上限，运行器、命令行和脚本管理器的估算使用同一个缺省值"""
+    return config.getint(section, 'max_workers', fallback=DEFAULT_MAX_WORKERS)
+
+
+def input_options_from_config(config, section='Input'):
+    """读取文本输入设置，未配置时返回空字典（逐字输入）"""
+    if not config.has_section(section):
+        return {}
+    return {
+        'mode': config.get(section, 'mode', fallback='human'),
+        'min_delay': config.getfloat(section, 'min_delay', fallback=0.2),
+        'max_delay': config.getfloat(section, 'max_delay', fallback=0.8),
+        'chunk_size': config.getint(section, 'chunk_size', fallback=5),
+    }
+
+
+# 脚本执行会话：拥有独立的比特窗口、浏览器和解释器状态
+class Session:
+    def __init__(self, program, session_id=1, max_loops=3, pacing=None, on_message=None, on_step=None,
+                 log_size=10000, input_options=None, trace=None, profiler=None):
+        self.session_id = session_id
+        self.program = program
+        self.max_loops = max_loops
+        self.pacing = pacing or Pacing()
+        self.on_message = on_message  # 回调 (session, message, clear, level)
+        self.on_step = on_step  # 回调 (session, index)，开始执行某条指令时调用
+        self.input_options = input_options or {}  # 文本输入方式，参见 Web.set_input_mode
+        self.trace = trace  # TraceWriter，记录每条指令的耗时
+        self.profiler = profiler  # Profiler，为 None 时不做任何统计
+
+        self.bit_window = None
+        self.bit_browser = None
+        self.web_browser = None
+
+        self.abort_image = False
+        self.abort_media = False
+        self.proxy_use = False
+        self.proxy_api = None
+
+        self.running = False
+        self.pause_event = Event()
+        self.pause_event.set()
+        self.timer = Timer()
+        self.current_index = 0
+        self.loop_stack = []  # 循环计数栈，支持嵌套循环
+        self.waiting_time = 0  # 时间等待的到期时间（time.monotonic）
+        self.wait_started = None  # (指令, 开始时间)，时间等待的记录在实际等待结束后写入
+        self.error = None
+
+        self.logs = deque(maxlen=log_size)  # 本会话的日志
+
+    def show_message(self, message, clear=False, level="info"):
+        """记录本会话的日志，并转发给 on_message 回调"""
+        if clear:
+            self.logs.clear()
+        self.logs.append(f"[{time.strftime('%H:%M:%S')}] [{level}] {message}")
+        if self.on_message:
+            self.on_message(self, message, clear, level)
+
+    def get_proxy(self):
+        import requests
+        try:
+            response = requests.post(self.proxy_api)
+            if response.status_code == 200:
+                data = response.json()
+                if data['status'] == 'success':
+                    proxy_info = data['proxy']
+                    return proxy_info
+            else:
+                data = response.json()
+                self.show_message(f"获取代理失败:{data['message']}", level="error")
+                return None
+        except Exception as e:
+            self.show_message(f"获取代理异常:{str(e)}", level="error")
+            return None
+
+    def execute(self, instr):
+        """执行单条编译后的指令，返回跳转目标索引（None 表示顺序执行）"""
+        self.show_message(f"执行命令: {instr.command}, 参数: {instr.params}", level="info")
+
+        start = time.monotonic()
+        waiting_time = self.waiting_time
+        try:
+            result = instr.handler(self, instr)
+        except Exception as e:
+            if self.trace:
+                self.trace.emit(command_event(self.session_id, instr, start, time.monotonic(), 'error', str(e)))
+            self.show_message(f"执行命令 '{instr.command}' 时出错: {str(e)}", level="error")
+            raise  # 重新抛出异常，让上层处理
+        if self.running and self.waiting_time != waiting_time:
+            # 时间等待的实际等待发生在执行循环中，等待结束后再写入记录
+            self.wait_started = (instr, start)
+        elif self.trace:
+            self.trace.emit(command_event(self.session_id, instr, start, time.monotonic(), 'ok'))
+        return result
+
+    def _trace_wait(self, outcome):
+        """写入时间等待的记录，耗时从指令开始执行算起，到等待结束为止（包括其间的暂停）"""
+        if self.wait_started is None:
+            return
+        instr, start = self.wait_started
+        self.wait_started = None
+        if self.trace:
+            self.trace.emit(command_event(self.session_id, instr, start, time.monotonic(), outcome))
+
+    def step(self, index):
+        """单步执行指定索引的指令，返回下一条指令的索引"""
+        next_index = self.execute(self.program[index])
+        self.current_index = next_index if next_index is not None else index + 1
+        return self.current_index
+
+    def _run_instruction(self, instr):
+        """执行一条指令及其前后的节奏控制"""
+        self.pacing.before(self, instr)
+        next_index = self.execute(instr)
+        # 按指令类别控制节奏，避免执行过快
+        self.pacing.after(self, instr, self.wait_cancelled)
+        return next_index
+
+    def wait_cancelled(self):
+        """等待的取消条件：停止或暂停"""
+        return not self.running or not self.pause_event.is_set()
+
+    def run(self, start=None, cancelled=None):
+        """从 start（缺省为当前位置）开始运行脚本直到结束、出错或被停止，成功返回 True
+        Args:
+            cancelled: 无参函数，返回真时不再启动，如会话池已停止
+        """
+        self.running = True
+        # 先置 running 再检查：stop() 若落在两者之间，要么在这里被发现，要么随后清除 running
+        if cancelled is not None and cancelled():
+            self.running = False
+            return False
+        self.error = None
+        i = self.current_index if start is None else start
+        try:
+            while i < len(self.program):
+                if not self.running:
+                    break
+
+                self.pause_event.wait()  # 等待暂停事件
+                if not self.running:
+                    break
+
+                if self.waiting_time:
+                    # 到期时唤醒，暂停或停止时立即返回
+                    if self.profiler is None:
+                        done = self.timer.wait_until(self.waiting_time, self.wait_cancelled)
+                    else:
+                        done = self.profiler.wait_until(self, self.waiting_time, self.wait_cancelled)
+                    if not done:
+                        if self.running:
+                            # 暂停期间保留剩余的等待时间
+                            remaining = max(self.waiting_time - time.monotonic(), 0)
+                            self.pause_event.wait()
+                            self.waiting_time = time.monotonic() + remaining
+                        continue
+                    self.waiting_time = 0
+                    self._trace_wait('ok')
+
+                self.current_index = i
+                instr = self.program[i]
+                if self.on_step:
+                    self.on_step(self, i)
+
+                try:
+                    if self.profiler is None:
+                        next_index = self._run_instruction(instr)
+                    else:
+                        next_index = self.profiler.run(self, instr, self._run_instruction)
+                except Exception as e:
+                    self.error = f"执行命令 '{instr.command}' 时发生错误: {str(e)}"
+                    self.show_message(self.error, level="error")
+                    break
+
+                # 更新索引，考虑循环跳转
+                i = next_index if next_index is not None else i + 1
+        finally:
+            self._trace_wait('ok' if self.running else 'stopped')  # 脚本以时间等待结束时不再等待
+            self.running = False
+            self.current_index = 0
+            self.loop_stack = []  # 重置循环计数
+            self.waiting_time = 0
+            self.show_message("脚本执行结束", clear=False)
+        return self.error is None
+
+    def pause(self):
+        self.pause_event.clear()
+        self.timer.wake()  # 立即中断正在进行的等待
+
+    def resume(self):
+        self.pause_event.set()
+
+    def stop(self):
+        self.running = False
+        self.pause_event.set()  # 确保暂停事件被设置
+        self.timer.wake()  # 立即中断正在进行的等待
+
+
+# 会话池：以有限的并发数同时运行多个会话
+class SessionPool:
+    def __init__(self, session_factory, count, max_workers):
+        """
+        Args:
+            session_factory: 函数 (session_id) -> Session
+            count: 会话数量
+            max_workers: 最大并发数
+        """
+        self.sessions = [session_factory(session_id) for session_id in range(1, count + 1)]
+        self.max_workers = max(1, min(max_workers, count))
+        self.stopped = False
+
+    def run(self):
+        """运行所有会话直到结束，返回每个会话是否成功"""
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="session") as executor:
+            futures = [executor.submit(self._run_session, session) for session in self.sessions]
+            return [future.result() for future in futures]
+
+    def _run_session(self, session):
+        # 排队期间被停止的会话不再启动
+        return session.run(cancelled=lambda: self.stopped)
+
+    def errors(self):
+        return [(session.session_id, session.error) for session in self.sessions if session.error]
+
+    def pause(self):
+        for session in self.sessions:
+            session.pause()
+
+    def resume(self):
+        for session in self.sessions:
+            session.resume()
+
+    def stop(self):
+        self.stopped = True  # 必须先于 session.stop()，参见 Session.run
+        for session in self.sessions:
+            session.stop()
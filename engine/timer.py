@@ -0,0 +1,33 @@
+import threading
+import time
+
+
+# 可中断的定时等待
+class Timer:
+    def __init__(self):
+        self._cond = threading.Condition()
+
+    def wait_until(self, deadline, cancelled):
+        """等待到 deadline（time.monotonic 时间）
+        Args:
+            deadline: 到期时间
+            cancelled: 无参函数，返回真时立即结束等待
+        Returns:
+            bool: 到期返回 True，被取消返回 False
+        """
+        with self._cond:
+            while not cancelled():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return True
+                self._cond.wait(remaining)
+            return False
+
+    def wait(self, seconds, cancelled):
+        """等待指定的秒数，参见 wait_until"""
+        return self.wait_until(time.monotonic() + seconds, cancelled)
+
+    def wake(self):
+        """唤醒所有等待者，使其重新检查取消条件"""
+        with self._cond:
+            self._cond.notify_all()
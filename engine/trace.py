@@ -0,0 +1,114 @@
+import json
+import queue
+import sys
+import threading
+
+
+# 运行记录：每条指令一行JSON，由后台线程写入文件，不阻塞执行线程
+class TraceWriter:
+    def __init__(self, path):
+        self.path = path
+        self.queue = queue.SimpleQueue()
+        self.closed = False
+        self.file = open(path, 'a', encoding='utf-8')
+        self.thread = threading.Thread(target=self._write_loop, name="trace", daemon=True)
+        self.thread.start()
+
+    def emit(self, event):
+        """提交一条记录，写入器关闭后的记录被忽略"""
+        if not self.closed:
+            self.queue.put(event)
+
+    def _write_loop(self):
+        while True:
+            event = self.queue.get()
+            if event is None:
+                break
+            self.file.write(json.dumps(event, ensure_ascii=False) + "\n")
+            # 队列暂时为空时刷新，保证异常退出时已写入的记录尽量完整
+            if self.queue.empty():
+                self.file.flush()
+        self.file.close()
+
+    def close(self):
+        """写完所有已提交的记录后关闭文件"""
+        if self.closed:
+            return
+        self.closed = True
+        self.queue.put(None)
+        self.thread.join()
+
+
+def command_event(session_id, instr, start, end, outcome, error=None):
+    """构造一条指令记录，start/end 为 time.monotonic 时间
+    outcome: 'ok' 成功，'error' 出错，'stopped' 时间等待被停止
+    """
+    event = {
+        'session': session_id,
+        'index': instr.index,
+        'command': instr.command,
+        'params': instr.params,
+        'start': round(start, 6),
+        'end': round(end, 6),
+        'duration': round(end - start, 6),
+        'outcome': outcome,
+    }
+    if error is not None:
+        event['error'] = error
+    return event
+
+
+def _percentile(values, p):
+    """最近秩法计算百分位数，values 需已排序"""
+    rank = max(1, -(-len(values) * p // 100))
+    return values[int(rank) - 1]
+
+
+def summarize(path):
+    """统计记录文件中每种指令的耗时
+    Returns:
+        dict: 指令 -> {'count', 'errors', 'p50', 'p95', 'p99', 'max'}，耗时单位为秒
+    """
+    durations = {}
+    errors = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            event = json.loads(line)
+            command = event.get('command')
+            if command is None:
+                continue
+            durations.setdefault(command, []).append(event['duration'])
+            if event.get('outcome') == 'error':
+                errors[command] = errors.get(command, 0) + 1
+
+    summary = {}
+    for command, values in durations.items():
+        values.sort()
+        summary[command] = {
+            'count': len(values),
+            'errors': errors.get(command, 0),
+            'p50': _percentile(values, 50),
+            'p95': _percentile(values, 95),
+            'p99': _percentile(values, 99),
+            'max': values[-1],
+        }
+    return summary
+
+
+def format_summary(summary):
+    """将统计结果格式化为文本行，按 p95 从慢到快排列"""
+    lines = [f"{'指令':<10}{'次数':>8}{'失败':>6}{'p50':>10}{'p95':>10}{'p99':>10}{'最大':>10}"]
+    for command, stats in sorted(summary.items(), key=lambda item: item[1]['p95'], reverse=True):
+        lines.append(f"{command:<10}{stats['count']:>8}{stats['errors']:>6}"
+                     f"{stats['p50']:>10.3f}{stats['p95']:>10.3f}{stats['p99']:>10.3f}{stats['max']:>10.3f}")
+    return lines
+
+
+if __name__ == "__main__":
+    # 用法: python -m engine.trace trace.jsonl
+    for trace_file in sys.argv[1:]:
+        print(trace_file)
+        print("\n".join(format_summary(summarize(trace_file))))
@@ -0,0 +1,47 @@
+import datetime
+import hashlib
+import json
+import os
+import uuid
+
+LICENSE_FILE = "license.json"
+
+
+class LicenseError(Exception):
+    pass
+
+
+def machine_code():
+    """当前机器的机器码"""
+    return str(uuid.getnode())
+
+
+def check_license(path=LICENSE_FILE):
+    """验证 license 文件，成功返回 (客户名称, 过期时间)，失败抛出 LicenseError"""
+    if not os.path.exists(path):
+        raise LicenseError("未找到 license 文件")
+
+    # 读取 license 文件
+    with open(path, "r", encoding="utf-8") as f:
+        license_data = json.load(f)
+
+    # 验证 license 格式
+    if "data" not in license_data or "signature" not in license_data:
+        raise LicenseError("License 格式错误")
+
+    # 验证签名
+    data_str = json.dumps(license_data["data"], sort_keys=True)
+    current_signature = hashlib.sha256(data_str.encode()).hexdigest()
+    if current_signature != license_data["signature"]:
+        raise LicenseError("License 签名无效")
+
+    # 验证机器码
+    if machine_code() != license_data["data"]["machine_code"]:
+        raise LicenseError("License 与本机不匹配")
+
+    # 验证过期时间
+    expiry_date = datetime.datetime.strptime(license_data["data"]["expiry_date"], "%Y-%m-%d %H:%M:%S")
+    if datetime.datetime.now() > expiry_date:
+        raise LicenseError("License 已过期")
+
+    return license_data["data"]["customer"], expiry_date
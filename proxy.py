@@ -1,5 +1,3 @@
-from flask import Flask, request, jsonify
-import requests
 import tkinter as tk
 from tkinter import messagebox
 import configparser
@@ -8,12 +6,13 @@ import os
 
 api_url = None
 field_mapping = None
-app = Flask(__name__)
 
 
-@app.route('/proxy', methods=['GET', 'POST'])
+# flask 和 requests 较重，在首次使用时才导入，不拖慢界面启动
 def get_proxy():
     global api_url, field_mapping
+    import requests
+    from flask import jsonify
     try:
         response = requests.get(api_url)
         response.raise_for_status()
@@ -93,6 +92,14 @@ def get_proxy():
         return jsonify({"status": "fail", "message": f"Error parsing proxy data: {str(e)}"}), 500
 
 
+def run_server(port=5001):
+    """启动本地代理服务"""
+    from flask import Flask
+    server = Flask(__name__)
+    server.add_url_rule('/proxy', view_func=get_proxy, methods=['GET', 'POST'])
+    server.run(port=port, debug=True, use_reloader=False)
+
+
 class ProxyApp:
     def __init__(self, root):
         self.root = root
@@ -246,6 +253,7 @@ class ProxyApp:
             messagebox.showerror("错误", f"保存配置时出错: {str(e)}")
 
     def get_proxy(self):
+        import requests
         try:
             response = requests.post('http://127.0.0.1:5001/proxy')
             if response.status_code == 200:
@@ -288,9 +296,9 @@ class ProxyApp:
 
 
 if __name__ == "__main__":
-    # 启动 Flask 服务
+    # 启动 Flask 服务，flask 在服务线程中导入，不阻塞界面
     from threading import Thread
-    flask_thread = Thread(target=lambda: app.run(port=5001, debug=True, use_reloader=False))
+    flask_thread = Thread(target=run_server)
     flask_thread.start()
 
     # 启动 Tkinter 界面
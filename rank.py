@@ -2,36 +2,32 @@ import tkinter as tk
 from tkinter import ttk
 from tkinter import messagebox
 import sqlite3  # 添加 sqlite3 导入
-import requests
-from bs4 import BeautifulSoup
+import queue
+from rank_db import RankDatabase, RankWriter
+import serp
 import time
 import random
 import threading
-import openpyxl
-from openpyxl.styles import Font, PatternFill
 import datetime
 from tkinter import filedialog
 
+RANK_POLL_MS = 50  # 查询结果队列的处理间隔（毫秒）
 
-def search_google(query, site, max_pages=50):
-    query = f"{query}"
-    for page in range(max_pages):
-        url = f"https://www.google.com/search?q={query}&start={page * 10}"
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.3"
-        }
 
-        response = requests.get(url, headers=headers)
+def search_google(query, site, max_pages=50, backend=None):
+    """逐页查询关键词，返回 [页码(从0开始), 页内位置, 总排名, 结果地址]，未找到返回 None，请求失败返回 False"""
+    for page in range(max_pages):
+        url = serp.search_url(query, page)
+        response = serp.fetch(url)
         if response.status_code != 200:
             print(f"Failed to retrieve results: {response.status_code}")
             return False
 
-        soup = BeautifulSoup(response.text, 'html.parser')
-        results = soup.find('div', id='main').find_all('div', recursive=False)[3:13]   # 查找所有链接
-
-        for index, result in enumerate(results):
-            if site in result.text:
-                return [page, index+1, page * 10 + index + 1, url]
+        # 只提取结果链接，按域名匹配目标站点
+        found = serp.find_site(response.text, site, backend)
+        if found:
+            index, result_url = found
+            return [page, index, page * 10 + index, result_url]
 
         print(f"Page {page + 1} does not contain {site}. Continuing to next page...")
         time.sleep(random.randint(1, 3))
@@ -45,14 +41,21 @@ class SiteKeywordManager:
         self.root = root
         self.root.title("站点关键词Google排名查询器 v1.0")
         self.root.iconbitmap(".\\resource\\rank.ico")
-        # 初始化数据库
-        self.init_database()
+        # 初始化数据库，查询结果由写入线程逐条保存
+        self.db = RankDatabase('local.db')
+        self.writer = RankWriter(self.db)
         
         # 从数据库加载数据
         self.sites = []
-        self.keywords = {}
-        self.rank_update = False
-        self.rank_error = False
+        self.keywords = {}  # 站点名称 -> 关键词列表，按需加载
+        self.keyword_items = {}  # 当前显示的关键词 -> 表格行ID
+        self.shown_site = None  # 关键词表格当前显示的站点
+        self.stop_refreshing = False
+
+        # 查询线程通过队列提交界面更新，主线程定时取出处理（非线程化的 Tcl 不能从其他线程调用 Tk）
+        self.rank_events = queue.SimpleQueue()
+        self.root.after(RANK_POLL_MS, self._process_rank_events)
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
         
         # 创建左右分栏
         self.left_frame = ttk.Frame(root)
@@ -67,68 +70,22 @@ class SiteKeywordManager:
         # 右侧关键词管理
         self.setup_keyword_section()
         self.load_data()
-        self.loop()
-
-    def loop(self):
-        if self.rank_update:
-            selection = self.site_tree.selection()
-            if selection:  # 如果没有选中项，直接返回
-                selected_item = self.site_tree.item(selection[0])
-                selected_site = selected_item['values'][1]
-                self._update_database_ranks(selected_site, self.keywords[selected_site])
-                print('排名更新到数据库')
-                self.rank_update = False
-                self.on_site_select(None)
-                messagebox.showinfo("刷新排名", "关键词排名已刷新")
-
-        self.root.after(500, self.loop)
-
-    def init_database(self):
-        """初始化数据库连接和表"""
-        self.conn = sqlite3.connect('local.db')
-        self.cursor = self.conn.cursor()
-        
-        # 创建站点表
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS sites (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT UNIQUE
-            )
-        ''')
-        
-        # 创建关键表，添加 rank 列
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS keywords (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                site_id INTEGER,
-                keyword TEXT,
-                rank INTEGER DEFAULT 0,
-                FOREIGN KEY (site_id) REFERENCES sites (id),
-                UNIQUE(site_id, keyword)
-            )
-        ''')
-        self.conn.commit()
 
     def load_data(self):
-        """从数据库加载数据到存"""
-        # 加载站点
-        self.cursor.execute('SELECT name FROM sites order by id')
-        sites = self.cursor.fetchall()
-        self.sites = [site[0] for site in sites]
-        
-        # 加载每个站点的关键词和排名
+        """从数据库加载站点列表，关键词在首次选中站点时再加载"""
+        self.sites = self.db.sites()
+        self.keywords = {}
+
+        # 更新站点列表显示
         for index, site in enumerate(self.sites, 1):
-            self.cursor.execute('''
-                SELECT k.keyword, k.rank 
-                FROM keywords k
-                JOIN sites s ON k.site_id = s.id 
-                WHERE s.name = ? order by k.id
-            ''', (site,))
-            self.keywords[site] = [(row[0], row[1]) for row in self.cursor.fetchall()]
-            
-            # 更新站点列表显示
             self.site_tree.insert('', 'end', values=(index, site))
 
+    def site_keywords(self, site):
+        """返回站点的关键词和排名列表，未加载时从数据库查询并缓存"""
+        if site not in self.keywords:
+            self.keywords[site] = self.db.keywords(site)
+        return self.keywords[site]
+
     def setup_site_section(self):
         # 站点输入框
         site_frame = ttk.Frame(self.left_frame)
@@ -229,8 +186,7 @@ class SiteKeywordManager:
         
         try:
             # 添加站点到数据库
-            self.cursor.execute('INSERT INTO sites (name) VALUES (?)', (site,))
-            self.conn.commit()
+            self.db.add_site(site)
             
             # 更新内存数据
             self.sites.append(site)
@@ -254,8 +210,9 @@ class SiteKeywordManager:
         selected_site = selected_item['values'][1]  # 获取站点名称
         
         # 清空当前表格
-        for item in self.keyword_tree.get_children():
-            self.keyword_tree.delete(item)
+        self.keyword_tree.delete(*self.keyword_tree.get_children())
+        self.keyword_items = {}
+        self.shown_site = selected_site
             
         # 重新设置表格的列
         self.keyword_tree.heading('序号', text='序号')
@@ -268,9 +225,9 @@ class SiteKeywordManager:
         self.keyword_tree.column('排名', width=100, anchor='center')
         
         # 填充该站点的关键词数据
-        for index, (keyword, rank) in enumerate(self.keywords[selected_site], 1):
+        for index, (keyword, rank, _) in enumerate(self.site_keywords(selected_site), 1):
             display_rank = "无排名" if rank == 0 else rank
-            self.keyword_tree.insert('', 'end', values=(index, keyword, display_rank))
+            self.keyword_items[keyword] = self.keyword_tree.insert('', 'end', values=(index, keyword, display_rank))
             
         # 确保表格可见
         self.keyword_tree.pack(fill=tk.BOTH, expand=True)
@@ -291,23 +248,16 @@ class SiteKeywordManager:
             return
             
         try:
-            # 取站点ID
-            self.cursor.execute('SELECT id FROM sites WHERE name = ?', (selected_site,))
-            site_id = self.cursor.fetchone()[0]
-            
             # 添加关键词到数据库，设置默认排名为0
-            self.cursor.execute(''' 
-                INSERT INTO keywords (site_id, keyword, rank) 
-                VALUES (?, ?, 0)
-            ''', (site_id, keyword))
-            self.conn.commit()
+            self.db.add_keyword(selected_site, keyword)
             
             # 更新内存数据
-            self.keywords[selected_site].append((keyword, 0))
+            keywords = self.site_keywords(selected_site)
+            keywords.append((keyword, 0, None))
             
             # 更新表格显示，显示“无排名”
-            self.keyword_tree.insert('', 'end', 
-                                   values=(len(self.keywords[selected_site]), keyword, "无排名"))  # 修改此行
+            self.keyword_items[keyword] = self.keyword_tree.insert('', 'end', 
+                                   values=(len(keywords), keyword, "无排名"))  # 修改此行
             
             # 清空输入框
             self.keyword_entry.delete(0, tk.END)
@@ -331,27 +281,20 @@ class SiteKeywordManager:
             return
             
         try:
-            # 获取站点ID
-            self.cursor.execute('SELECT id FROM sites WHERE name = ?', (selected_site,))
-            site_id = self.cursor.fetchone()[0]
-            
-            # 删除关联的关键词
-            self.cursor.execute('DELETE FROM keywords WHERE site_id = ?', (site_id,))
-            
-            # 删除站点
-            self.cursor.execute('DELETE FROM sites WHERE id = ?', (site_id,))
-            self.conn.commit()
+            # 删除站点及关联的关键词
+            self.db.delete_site(selected_site)
             
             # 更新内存数据
             self.sites.remove(selected_site)
-            del self.keywords[selected_site]
+            self.keywords.pop(selected_site, None)
             
             # 更新界面
             self.site_tree.delete(selection[0])
             
             # 清空关键词表格
-            for item in self.keyword_tree.get_children():
-                self.keyword_tree.delete(item)
+            self.keyword_tree.delete(*self.keyword_tree.get_children())
+            self.keyword_items = {}
+            self.shown_site = None
                 
         except sqlite3.Error as e:
             messagebox.showerror("错误", f"删除站点失败：{str(e)}")
@@ -378,19 +321,11 @@ class SiteKeywordManager:
             return
             
         try:
-            # 获取站点ID
-            self.cursor.execute('SELECT id FROM sites WHERE name = ?', (selected_site,))
-            site_id = self.cursor.fetchone()[0]
-            
             # 从数据库删除关键词
-            self.cursor.execute(''' 
-                DELETE FROM keywords 
-                WHERE site_id = ? AND keyword = ? 
-            ''', (site_id, keyword))
-            self.conn.commit()
+            self.db.delete_keyword(selected_site, keyword)
             
             # 更新内存数据
-            self.keywords[selected_site] = [kw for kw in self.keywords[selected_site] if kw[0] != keyword]  # 修改此行
+            self.keywords[selected_site] = [kw for kw in self.site_keywords(selected_site) if kw[0] != keyword]  # 修改此行
             
             # 更新表格显示
             self.keyword_tree.delete(selection[0])
@@ -412,7 +347,7 @@ class SiteKeywordManager:
         selected_site = selected_item['values'][1]
         
         # 获取当前站点的关键词
-        updated_keywords = self.keywords[selected_site][:]  # 复制当前关键词
+        updated_keywords = self.site_keywords(selected_site)[:]  # 复制当前关键词
 
         # 获取最大页码设置
         try:
@@ -425,79 +360,97 @@ class SiteKeywordManager:
         self._refresh_ranks_thread(selected_site, updated_keywords, max_pages)  # 传递 updated_keywords 和 max_pages
 
     def _refresh_ranks_thread(self, selected_site, updated_keywords, max_pages):
-        self.rank_error = False
+        """在后台线程刷新关键词排名，每完成一个关键词即写入数据库并更新界面"""
         # 禁用刷新按钮
         self.refresh_button.config(state=tk.DISABLED)
-        """刷新关键词排名"""
-        def worker(updated_keywords, event):
-            # 更新内存数据结构
-            total_keywords = len(updated_keywords)
-            self.progress_bar['maximum'] = total_keywords
-            self.progress_bar['value'] = 0
-            
-            for index, (keyword, _) in enumerate(updated_keywords):
+        self.stop_refreshing = False
+        total_keywords = len(updated_keywords)
+        self.progress_bar['maximum'] = total_keywords
+        self.progress_bar['value'] = 0
+        self.progress_label['text'] = f"0/{total_keywords}"
+        site_id = self.db.site_id(selected_site)
+
+        def worker():
+            error = False
+            for keyword, _, _ in updated_keywords:
+                if self.stop_refreshing:
+                    break
                 try:
                     new_rank_data = search_google(keyword, selected_site, max_pages)  # 使用 max_pages
-                    rank_value = new_rank_data[2] if new_rank_data else 0
-                    
-                    # 更新关键词的排名
-                    updated_keywords[index] = (keyword, rank_value)
-                    
-                except Exception as e:  # 捕捉网络连接异常
-                    self.rank_error = True
+                except Exception:  # 捕捉网络连接异常
+                    error = True
                     break  # 结束线程
-                
-                # 更新进度条和标签
-                self.progress_bar['value'] += 1
-                self.progress_label['text'] = f"{self.progress_bar['value']}/{total_keywords}"  # 更新标签
-                self.progress_bar.update_idletasks()
-            
-            # 在这里更新数据库中的排名
-            self.keywords[selected_site] = updated_keywords
-            event.set()  # 设置事件，表示任务完成
-
-        event = threading.Event()  # 创建事件
-        thread = threading.Thread(target=worker, args=(updated_keywords, event))
-        thread.start()  # 启动线程
-
-        # 监听线程完成
-        thread_done = threading.Thread(target=self._check_thread_completion, args=(event,))
-        thread_done.start()
-
-    def _check_thread_completion(self, event):
-        """检查线程是否完成"""
-        event.wait()  # 等待事件被设置
+                checked_at = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                if new_rank_data:
+                    rank_value, page, url = new_rank_data[2], new_rank_data[0] + 1, new_rank_data[3]
+                else:
+                    rank_value, page, url = 0, None, None
+
+                # 立即保存，中途退出时已完成的查询不会丢失
+                self.writer.submit(site_id, (keyword, rank_value, page, url, checked_at))
+                self.rank_events.put(('rank', selected_site, keyword, rank_value, checked_at))
+            # 等待结果写入完成，写入失败时不能提示已刷新
+            self.rank_events.put(('done', selected_site, error, self.writer.flush()))
+
+        threading.Thread(target=worker, daemon=True).start()  # 启动线程
+
+    def _process_rank_events(self):
+        """在主线程中处理查询线程提交的更新，单个更新出错不影响其余更新和之后的轮询"""
+        try:
+            while True:
+                try:
+                    item = self.rank_events.get_nowait()
+                except queue.Empty:
+                    break
+                try:
+                    self._handle_rank_event(item)
+                except Exception as e:
+                    messagebox.showerror("错误", f"更新排名出错: {str(e)}")
+        finally:
+            self.root.after(RANK_POLL_MS, self._process_rank_events)
+
+    def _handle_rank_event(self, item):
+        """处理一条更新：('rank', 站点, 关键词, 排名, 查询时间) 或 ('done', 站点, 查询出错, 写入错误)"""
+        if item[0] == 'rank':
+            _, site, keyword, rank_value, checked_at = item
+            self._update_keyword_rank(site, keyword, rank_value, checked_at)
+            self.progress_bar['value'] += 1
+            self.progress_label['text'] = f"{int(self.progress_bar['value'])}/{int(self.progress_bar['maximum'])}"
+            return
+        _, site, error, write_error = item
         # 使刷新按钮可用
         self.refresh_button.config(state=tk.NORMAL)
-        if self.rank_error:
-            messagebox.showerror("错误", "获取排名时发生错误，请检查网络连接！")
-        else:
-            self.rank_update = True
-
-    def _update_database_ranks(self, selected_site, updated_keywords):
-        """更新数据库中的关键词排名"""
-        # 获取站点ID
-        self.cursor.execute('SELECT id FROM sites WHERE name = ?', (selected_site,))
-        site_id = self.cursor.fetchone()[0]
-        
-        # 批量更新数据库中的排名
-        for keyword, rank_value in updated_keywords:
-            self.cursor.execute(''' 
-                UPDATE keywords 
-                SET rank = ? 
-                WHERE site_id = ? AND keyword = ? 
-            ''', (rank_value, site_id, keyword))
-        
-        self.conn.commit()  # 提交更改
+        if write_error is not None:
+            messagebox.showerror("错误", f"保存排名失败: {str(write_error)}")
+        elif not self.stop_refreshing:  # 用户停止时不再提示
+            if error:
+                messagebox.showerror("错误", "获取排名时发生错误，请检查网络连接！已完成的查询结果已保存。")
+            else:
+                messagebox.showinfo("刷新排名", "关键词排名已刷新")
+
+    def _update_keyword_rank(self, site, keyword, rank_value, checked_at):
+        """更新内存中的排名，站点正在显示时同步更新表格中的对应行"""
+        keywords = self.keywords.get(site)
+        if keywords is not None:
+            for index, (name, _, _) in enumerate(keywords):
+                if name == keyword:
+                    keywords[index] = (keyword, rank_value, checked_at)
+                    break
+        if site == self.shown_site and keyword in self.keyword_items:
+            item = self.keyword_items[keyword]
+            values = self.keyword_tree.item(item)['values']
+            self.keyword_tree.item(item, values=(values[0], keyword, "无排名" if rank_value == 0 else rank_value))
 
     def stop_refresh(self):
         """停止刷新操作"""
         self.stop_refreshing = True
 
-    def __del__(self):
-        """析构函数，确保程序退出时关闭数据库连接"""
-        if hasattr(self, 'conn'):
-            self.conn.close()
+    def on_close(self):
+        """停止查询，等待已完成的结果写入数据库后退出"""
+        self.stop_refresh()
+        self.writer.close()
+        self.db.close()
+        self.root.destroy()
 
     def export_report(self):
         """导出排名报告"""
@@ -525,6 +478,9 @@ class SiteKeywordManager:
             return
             
         try:
+            import openpyxl
+            from openpyxl.styles import Font, PatternFill
+
             # 创建Excel工作簿
             wb = openpyxl.Workbook()
             ws = wb.active
@@ -543,12 +499,20 @@ class SiteKeywordManager:
                 cell.fill = header_fill
             
             # 写入数据
-            current_time = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            for row, (keyword, rank) in enumerate(self.keywords[selected_site], 2):
+            for row, (keyword, rank, checked_at) in enumerate(self.site_keywords(selected_site), 2):
                 ws.cell(row=row, column=1, value=row-1)  # 序号
                 ws.cell(row=row, column=2, value=keyword)  # 关键词
                 ws.cell(row=row, column=3, value=rank if rank > 0 else "无排名")  # 排名
-                ws.cell(row=row, column=4, value=current_time)  # 更新时间
+                ws.cell(row=row, column=4, value=checked_at or "未查询")  # 更新时间
+
+            # 排名历史，按关键词和查询时间排列
+            history = wb.create_sheet("排名历史")
+            history.append(["关键词", "查询时间", "排名", "页码", "地址"])
+            for cell in history[1]:
+                cell.font = header_font
+                cell.fill = header_fill
+            for keyword, checked_at, rank, page, url in self.db.history(selected_site):
+                history.append([keyword, checked_at, rank if rank > 0 else "无排名", page, url])
             
             # 调整列宽
             for column in ws.columns:
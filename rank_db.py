@@ -0,0 +1,228 @@
+import queue
+import sqlite3
+import threading
+
+SCHEMA_VERSION = 1
+
+
+def _insert_ranks(conn, site_id, results):
+    """写入排名历史，results 为 [(关键词, 排名, 页码, 地址, 查询时间)]"""
+    conn.executemany('''
+        INSERT INTO rank_history (keyword_id, checked_at, rank, page, url)
+        SELECT id, ?, ?, ?, ? FROM keywords
+        WHERE site_id = ? AND keyword = ?
+    ''', [(checked_at, rank, page, url, site_id, keyword) for keyword, rank, page, url, checked_at in results])
+
+
+# 排名查询器的数据访问层：统一管理 local.db 的连接、表结构升级和读写
+class RankDatabase:
+    def __init__(self, path='local.db'):
+        self.path = path
+        self.conn = self.connect()
+        self.site_ids = {}  # 站点名称 -> 站点ID 的缓存
+        self.init_schema()
+
+    def connect(self):
+        """打开一个连接并设置 pragma；WAL 模式下读取不会被写入阻塞"""
+        conn = sqlite3.connect(self.path)
+        conn.execute('PRAGMA journal_mode = WAL')
+        conn.execute('PRAGMA synchronous = NORMAL')  # WAL 下只在检查点时同步，断电最多丢失最后的事务
+        conn.execute('PRAGMA foreign_keys = ON')
+        conn.execute('PRAGMA busy_timeout = 5000')
+        conn.execute('PRAGMA temp_store = MEMORY')
+        conn.execute('PRAGMA cache_size = -16000')  # 16MB
+        return conn
+
+    def close(self):
+        self.conn.close()
+
+    def init_schema(self):
+        """创建表，并按 user_version 升级旧版本的 local.db"""
+        with self.conn:
+            # 创建站点表
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS sites (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    name TEXT UNIQUE
+                )
+            ''')
+
+            # 创建关键表，rank 和 checked_at 保存最近一次查询的结果，由 rank_history 的触发器维护
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS keywords (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    site_id INTEGER,
+                    keyword TEXT,
+                    rank INTEGER DEFAULT 0,
+                    checked_at TEXT,
+                    FOREIGN KEY (site_id) REFERENCES sites (id),
+                    UNIQUE(site_id, keyword)
+                )
+            ''')
+
+        version = self.conn.execute('PRAGMA user_version').fetchone()[0]
+        if version < 1:
+            with self.conn:
+                self._migrate_v1()
+
+    def _migrate_v1(self):
+        # 旧版本的关键词表可能缺少 rank 列，且没有查询时间
+        columns = [row[1] for row in self.conn.execute('PRAGMA table_info(keywords)')]
+        if 'rank' not in columns:
+            self.conn.execute('ALTER TABLE keywords ADD COLUMN rank INTEGER DEFAULT 0')
+        if 'checked_at' not in columns:
+            self.conn.execute('ALTER TABLE keywords ADD COLUMN checked_at TEXT')
+
+        # 排名历史，每次查询追加一行；索引覆盖按关键词和时间范围的趋势查询
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS rank_history (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                keyword_id INTEGER NOT NULL,
+                checked_at TEXT NOT NULL,
+                rank INTEGER NOT NULL DEFAULT 0,
+                page INTEGER,
+                url TEXT,
+                FOREIGN KEY (keyword_id) REFERENCES keywords (id) ON DELETE CASCADE
+            )
+        ''')
+        self.conn.execute('''
+            CREATE INDEX IF NOT EXISTS idx_rank_history_keyword_time
+            ON rank_history (keyword_id, checked_at, rank, page)
+        ''')
+
+        # 写入历史时同步更新关键词表中的最新排名，补录的旧记录不会覆盖更新的结果
+        self.conn.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_rank_history_latest
+            AFTER INSERT ON rank_history
+            BEGIN
+                UPDATE keywords SET rank = NEW.rank, checked_at = NEW.checked_at
+                WHERE id = NEW.keyword_id AND (checked_at IS NULL OR checked_at <= NEW.checked_at);
+            END
+        ''')
+
+        # 各关键词的最新排名
+        self.conn.execute('''
+            CREATE VIEW IF NOT EXISTS latest_ranks AS
+            SELECT s.name AS site, k.id AS keyword_id, k.keyword, k.rank, k.checked_at
+            FROM keywords k JOIN sites s ON k.site_id = s.id
+        ''')
+        self.conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+
+    def sites(self):
+        """按添加顺序返回所有站点名称，同时刷新站点ID缓存"""
+        rows = self.conn.execute('SELECT id, name FROM sites ORDER BY id').fetchall()
+        self.site_ids = {name: site_id for site_id, name in rows}
+        return [name for _, name in rows]
+
+    def site_id(self, site):
+        """站点名称对应的ID，优先使用缓存"""
+        if site not in self.site_ids:
+            row = self.conn.execute('SELECT id FROM sites WHERE name = ?', (site,)).fetchone()
+            if row is None:
+                raise KeyError(site)
+            self.site_ids[site] = row[0]
+        return self.site_ids[site]
+
+    def add_site(self, site):
+        """添加站点，站点已存在时抛出 sqlite3.IntegrityError"""
+        with self.conn:
+            cursor = self.conn.execute('INSERT INTO sites (name) VALUES (?)', (site,))
+        self.site_ids[site] = cursor.lastrowid
+        return cursor.lastrowid
+
+    def delete_site(self, site):
+        """在一个事务中删除站点及其关键词，排名历史随关键词级联删除"""
+        site_id = self.site_id(site)
+        with self.conn:
+            self.conn.execute('DELETE FROM keywords WHERE site_id = ?', (site_id,))
+            self.conn.execute('DELETE FROM sites WHERE id = ?', (site_id,))
+        self.site_ids.pop(site, None)
+
+    def keywords(self, site):
+        """站点的关键词列表 [(关键词, 排名, 查询时间)]"""
+        return self.conn.execute('''
+            SELECT keyword, rank, checked_at FROM keywords
+            WHERE site_id = ? ORDER BY id
+        ''', (self.site_id(site),)).fetchall()
+
+    def add_keyword(self, site, keyword):
+        """添加关键词，默认排名为0，已存在时抛出 sqlite3.IntegrityError"""
+        with self.conn:
+            self.conn.execute('INSERT INTO keywords (site_id, keyword, rank) VALUES (?, ?, 0)',
+                              (self.site_id(site), keyword))
+
+    def delete_keyword(self, site, keyword):
+        with self.conn:
+            self.conn.execute('DELETE FROM keywords WHERE site_id = ? AND keyword = ?', (self.site_id(site), keyword))
+
+    def history(self, site):
+        """站点所有关键词的排名历史 [(关键词, 查询时间, 排名, 页码, 地址)]，按关键词和时间排列"""
+        return self.conn.execute('''
+            SELECT k.keyword, h.checked_at, h.rank, h.page, h.url
+            FROM keywords k
+            JOIN rank_history h ON h.keyword_id = k.id
+            WHERE k.site_id = ?
+            ORDER BY k.id, h.checked_at
+        ''', (self.site_id(site),))
+
+
+# 排名写入线程：独占一个连接，查询线程每完成一个关键词就提交结果，
+# 队列中积压的结果合并为一个事务写入，中途退出时已完成的查询不会丢失
+class RankWriter:
+    def __init__(self, db, batch_size=500):
+        self.db = db
+        self.batch_size = batch_size
+        self.queue = queue.Queue()
+        self.closed = False
+        self.error = None  # 最近一次写入失败的异常
+        self.thread = threading.Thread(target=self._write_loop, name="rank-writer", daemon=True)
+        self.thread.start()
+
+    def submit(self, site_id, result):
+        """提交一个关键词的查询结果 (关键词, 排名, 页码, 地址, 查询时间)，写入器关闭后忽略"""
+        if not self.closed:
+            self.queue.put((site_id, result))
+
+    def flush(self):
+        """等待已提交的结果全部写入，返回期间最近一次写入失败的异常并清除，没有失败时返回 None"""
+        self.queue.join()
+        error, self.error = self.error, None
+        return error
+
+    def close(self):
+        """写完已提交的结果后关闭"""
+        if self.closed:
+            return
+        self.closed = True
+        self.queue.put(None)
+        self.thread.join()
+
+    def _write_loop(self):
+        # 连接在写入线程中创建，只在本线程使用
+        conn = self.db.connect()
+        running = True
+        while running:
+            batch = [self.queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            by_site = {}
+            for item in batch:
+                if item is None:
+                    running = False
+                    continue
+                site_id, result = item
+                by_site.setdefault(site_id, []).append(result)
+            try:
+                with conn:
+                    for site_id, results in by_site.items():
+                        _insert_ranks(conn, site_id, results)
+            except sqlite3.Error as e:
+                self.error = e
+                print(f"写入排名失败: {str(e)}")
+            for _ in batch:
+                self.queue.task_done()
+        conn.close()
@@ -1,42 +1,57 @@
 import tkinter as tk
 from tkinter import messagebox, filedialog, ttk
-import requests
 import json
 import time
-from threading import Thread, Event
-from browser.bit import Bit
-from browser.web import Web
+import queue
+import logging
+from collections import deque
+from logging.handlers import RotatingFileHandler
+from concurrent.futures import ThreadPoolExecutor
+from engine.compiler import compile_script, validate_script
+from engine.estimate import estimate, format_estimate
+from engine.pacing import Pacing
+from engine.session import DEFAULT_MAX_WORKERS, Session, SessionPool, input_options_from_config, max_workers_from_config
+from engine.trace import TraceWriter, summarize, format_summary
+from engine.profiler import Profiler, CATEGORIES
 import configparser
 import os
-import hashlib
-import uuid
-import datetime
+from licensing import LICENSE_FILE, check_license, machine_code as current_machine_code
+
+
+UI_POLL_MS = 50  # 界面更新队列的处理间隔（毫秒）
+LOG_FRAME_MS = 100  # 日志写入文本框的间隔（毫秒）
+LOG_BUFFER_SIZE = 10000  # 日志环形缓冲区大小，来不及显示的旧日志被丢弃（文件中仍完整保留）
 
 
 class ScriptRunner:
     def __init__(self, root):
-        self.bit_window = None
-        self.bit_browser = None
-        self.web_browser = None
+        self.session = None  # 第一个会话，单步运行时使用
+        self.pool = None  # 运行中的会话池
+        self.trace = None  # 运行记录写入器
+        self.profiler = None  # 性能分析，按 [Profile] 配置开启
+
+        # 脚本在后台线程执行，单步和连续运行共用；界面更新通过队列交回主线程
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="runner")
+        self.ui_queue = queue.Queue()
+        self.stepping = False
+
+        # 日志先进入环形缓冲区，再按固定帧率批量写入文本框
+        self.log_buffer = deque(maxlen=LOG_BUFFER_SIZE)
+        self.log_max_lines = 5000
+        self.file_log = None
 
         self.root = root
         self.root.title("脚本运行器 v1.0")
         self.root.iconbitmap(".\\resource\\run.ico")
 
         self.scripts = []
+        self.program = []  # 编译后的指令列表
         self.running = False
-        self.pause_event = Event()
+        self.paused = False
         self.current_index = 0
-        self.loop_start_index = None  # 添加循环起点索引变量
-        self.loop_count = 0  # 添加循环计数器
         self.max_loops = 3  # 设置最大循环次数，防止无限循环
-
-        self.abort_image = False
-        self.abort_media = False
-        self.proxy_use = False
-        self.proxy_api = None
-
-        self.waiting_time = 0
+        self.session_count = 1  # 同时运行的会话数
+        self.max_workers = DEFAULT_MAX_WORKERS  # 会话并发上限
 
         self.config_file = "config.ini"
         
@@ -45,6 +60,7 @@ class ScriptRunner:
         
         # 加载配置文件
         self.load_config()
+        self.file_log = self.setup_file_log()
 
         # 配置根窗口的网格权重
         self.root.grid_rowconfigure(0, weight=1)
@@ -113,6 +129,12 @@ class ScriptRunner:
         # 绑定循环次数变更事件
         self.max_loops_var.trace_add("write", self.on_loops_change)
 
+        # 会话数输入框，每个会话使用独立的比特窗口
+        tk.Label(right_control_frame, text="会话数:").pack(side=tk.LEFT, padx=(10, 5))
+        self.session_count_var = tk.StringVar(value=str(self.session_count))
+        self.session_count_entry = tk.Entry(right_control_frame, textvariable=self.session_count_var, width=5, justify=tk.CENTER)
+        self.session_count_entry.pack(side=tk.LEFT, padx=2)
+
         # 创建脚本列表框架
         list_frame = tk.Frame(main_frame)
         list_frame.grid(row=1, column=0, sticky='nsew')
@@ -153,6 +175,10 @@ class ScriptRunner:
         # 配置文本框的滚动
         self.text_browser.configure(yscrollcommand=text_scrollbar_y.set)
 
+        # 处理后台线程提交的界面更新
+        self.root.after(UI_POLL_MS, self._process_ui_queue)
+        self.root.after(LOG_FRAME_MS, self._flush_log)
+
         # 验证 license
         if not self.verify_license():
             self.show_license_dialog()
@@ -166,12 +192,28 @@ class ScriptRunner:
         if filename:
             try:
                 with open(filename, 'r', encoding='utf-8') as f:
-                    self.scripts = json.load(f)
+                    scripts = json.load(f)
+                # 加载时检查整个脚本，一次列出所有参数错误
+                errors = validate_script(scripts)
+                if errors:
+                    messagebox.showerror("错误", "加载脚本失败:\n" + "\n".join(str(e) for e in errors))
+                    return
+                self.program = compile_script(scripts)
+                self.scripts = scripts
+                self.session = None
+                self.current_index = 0
                 self.update_listbox()
+                self.show_estimate()
                 messagebox.showinfo("成功", "脚本加载成功")
             except Exception as e:
                 messagebox.showerror("错误", f"加载脚本失败: {str(e)}")
 
+    def show_estimate(self):
+        """按当前的循环次数、会话数和节奏设置输出预计运行时间"""
+        result = estimate(self.program, self.pacing, self.max_loops, self.input_options)
+        for line in format_estimate(result, self.session_count, self.max_workers):
+            self.show_message(line, level="info")
+
     def update_listbox(self):
         """更新列表框显示"""
         self.script_listbox.delete(0, tk.END)
@@ -197,85 +239,153 @@ class ScriptRunner:
             messagebox.showerror("错误", f"无效的循环次数: {str(e)}")
             return
 
+        # 获取并验证会话数
+        try:
+            self.session_count = int(self.session_count_var.get())
+            if self.session_count <= 0:
+                raise ValueError("会话数必须大于0")
+        except ValueError as e:
+            messagebox.showerror("错误", f"无效的会话数: {str(e)}")
+            return
+        self.save_config()
+
         if not self.running:
+            self.show_estimate()
             self.running = True
+            self.paused = False
             self.run_button.config(state=tk.DISABLED)
             self.load_button.config(state=tk.DISABLED)
             self.pause_button.config(state=tk.NORMAL)
             self.max_loops_entry.config(state=tk.DISABLED)  # 运行时禁用输入框
-            self.pause_event.set()
-            Thread(target=self.run_script).start()
+            self.session_count_entry.config(state=tk.DISABLED)
+            self.trace = self.open_trace()
+            self.profiler = self.open_profiler()
+            self.pool = SessionPool(self._make_session, self.session_count, self.max_workers)
+            self.executor.submit(self.run_script)
 
     def pause_running(self):
         """暂停运行脚本"""
-        if self.running:
-            if self.pause_event.is_set():
-                self.pause_event.clear()
+        if self.running and self.pool:
+            if not self.paused:
+                self.paused = True
+                self.pool.pause()
                 self.pause_button.config(text="继续脚本")
             else:
-                self.pause_event.set()
+                self.paused = False
+                self.pool.resume()
                 self.pause_button.config(text="暂停脚本")
                 self.stop_button.config(state=tk.NORMAL)  # 暂停时启用停止按钮
 
     def stop_running(self):
         """停止运行脚本"""
         self.running = False
-        self.pause_event.set()  # 确保暂停事件被设置
+        self.paused = False
+        if self.pool:
+            self.pool.stop()
+        self.pause_button.config(text="暂停脚本")
         self.run_button.config(state=tk.NORMAL)
         self.load_button.config(state=tk.NORMAL)
         self.pause_button.config(state=tk.DISABLED)
         self.stop_button.config(state=tk.DISABLED)  # 停止时禁用停止按钮
         self.max_loops_entry.config(state=tk.NORMAL)  # 停止时启用输入框
+        self.session_count_entry.config(state=tk.NORMAL)
 
     def run_script(self):
-        """运行脚本的主逻辑"""
+        """运行脚本的主逻辑：以会话池运行一个或多个会话"""
         try:
-            i = self.current_index
-            while i < len(self.scripts):
-                if not self.running:
-                    break
-
-                self.pause_event.wait()  # 等待暂停事件
-                if not self.running:
-                    break
-
-                if time.time() < self.waiting_time:
-                    waiting = int(self.waiting_time-int(time.time()))
-                    message = f"时间等待还有{waiting}秒"
-                    if waiting % 5 == 0 or waiting <= 10:
-                        self.show_message(f"{message}", level="info")
-                    # 可选：仍然显示错误对话框
-                    time.sleep(1)
-                    continue
-                else:
-                    self.waiting_time = 0
+            self.pool.run()
+            errors = self.pool.errors()
+            if errors:
+                session_id, error_message = errors[0]
+                if self.session_count > 1:
+                    error_message = f"会话{session_id}: {error_message}"
+                # 可选：仍然显示错误对话框
+                self.ui(messagebox.showerror, "错误", error_message)
+        finally:
+            self.current_index = 0
+            self.close_trace()
+            self.close_profiler()
+            self.ui(self.stop_running)
 
-                self.current_index = i
-                script = self.scripts[i]
-                
-                # 在主线程中更新UI
-                self.root.after(500, self.select_current_script)
-                
-                # 执行脚本命令
-                try:
-                    self.execute_command(script)
-                    time.sleep(0.3)  # 添加短暂延迟，避免执行过快
-                except Exception as e:
-                    error_message = f"执行命令 '{script['command']}' 时发生错误: {str(e)}"
-                    self.show_message(f"{error_message}", level="error")  # 添加错误标识符
-                    # 可选：仍然显示错误对话框
-                    self.root.after(0, lambda msg=error_message: messagebox.showerror("错误", msg))
-                    break
+    def open_trace(self):
+        """按 [Trace] 配置为本次运行创建记录文件"""
+        if not self.config.getboolean('Trace', 'enabled', fallback=True):
+            return None
+        trace_dir = self.config.get('Trace', 'dir', fallback='logs')
+        try:
+            os.makedirs(trace_dir, exist_ok=True)
+            return TraceWriter(os.path.join(trace_dir, time.strftime("trace_%Y%m%d_%H%M%S.jsonl")))
+        except OSError as e:
+            self.show_message(f"创建运行记录失败: {str(e)}", level="warning")
+            return None
 
-                # 更新索引，考虑循环情况
-                i = self.current_index + 1
+    def close_trace(self):
+        """关闭运行记录，并输出每种指令的耗时统计"""
+        if self.trace is None:
+            return
+        for session in self.pool.sessions:
+            session.trace = None
+        self.trace.close()
+        self.show_message(f"运行记录已保存到: {self.trace.path}", level="info")
+        for line in format_summary(summarize(self.trace.path)):
+            self.show_message(line, level="info")
+        self.trace = None
+
+    def open_profiler(self):
+        """按 [Profile] 配置开启性能分析，关闭时不安装任何钩子"""
+        if not self.config.getboolean('Profile', 'enabled', fallback=False):
+            return None
+        return Profiler()
 
-        finally:
-            self.current_index = 0
-            self.loop_start_index = None  # 重置循环起点
-            self.loop_count = 0  # 重置循环计数
-            self.show_message("脚本执行结束", clear=False)
-            self.root.after(0, self.stop_running)
+    def close_profiler(self):
+        """卸载性能分析钩子，输出折叠栈文件和各类耗时统计"""
+        if self.profiler is None:
+            return
+        for session in self.pool.sessions:
+            session.profiler = None
+        self.profiler.uninstall()
+        profile_dir = self.config.get('Profile', 'dir', fallback='logs')
+        try:
+            os.makedirs(profile_dir, exist_ok=True)
+            path = os.path.join(profile_dir, time.strftime("profile_%Y%m%d_%H%M%S.folded"))
+            self.profiler.write_collapsed(path)
+            self.show_message(f"性能分析已保存到: {path}", level="info")
+        except OSError as e:
+            self.show_message(f"保存性能分析失败: {str(e)}", level="warning")
+        self.show_message(f"{'指令':<10}{'次数':>8}" + "".join(f"{category:>10}" for category in CATEGORIES), level="info")
+        for command, categories in self.profiler.summary().items():
+            self.show_message(f"{command:<10}{self.profiler.counts.get(command, 0):>8}"
+                              + "".join(f"{categories[category]:>10.3f}" for category in CATEGORIES), level="info")
+        self.profiler = None
+
+    def _make_session(self, session_id):
+        """创建会话；单会话运行时沿用单步运行的会话，从单步停下的位置继续"""
+        if self.session_count == 1 and self.session is not None and self.session.program is self.program:
+            self.session.max_loops = self.max_loops
+            self.session.pacing = self.pacing
+            self.session.input_options = self.input_options
+            self.session.trace = self.trace
+            self.session.profiler = self.profiler
+            return self.session
+        session = Session(self.program, session_id, max_loops=self.max_loops, pacing=self.pacing,
+                          input_options=self.input_options, trace=self.trace, profiler=self.profiler,
+                          on_message=self._on_session_message, on_step=self._on_session_step)
+        if session_id == 1:
+            self.session = session
+        return session
+
+    def _on_session_message(self, session, message, clear, level):
+        """会话日志回调，多会话时添加会话编号"""
+        if self.session_count > 1:
+            message = f"[会话{session.session_id}] {message}"
+        self.show_message(message, clear=clear, level=level)
+
+    def _on_session_step(self, session, index):
+        """会话执行进度回调，列表框跟随第一个会话"""
+        if session.session_id == 1:
+            self.current_index = index
+            # 在主线程中更新UI
+            self.ui(self.select_current_script)
 
     def select_current_script(self):
         """选中当前正在执行的脚本行"""
@@ -283,6 +393,25 @@ class ScriptRunner:
         self.script_listbox.selection_set(self.current_index)
         self.script_listbox.see(self.current_index)
 
+    def ui(self, func, *args):
+        """从任意线程提交一个界面更新，由主线程执行"""
+        self.ui_queue.put((func, args))
+
+    def _process_ui_queue(self):
+        """在主线程中执行排队的界面更新，单个更新出错不影响其余更新和之后的轮询"""
+        try:
+            while True:
+                try:
+                    func, args = self.ui_queue.get_nowait()
+                except queue.Empty:
+                    break
+                try:
+                    func(*args)
+                except Exception as e:
+                    self.show_message(f"界面更新出错: {str(e)}", level="error")
+        finally:
+            self.root.after(UI_POLL_MS, self._process_ui_queue)
+
     def show_message(self, message, clear=False, level="info"):
         """显示信息到文本框
         Args:
@@ -290,247 +419,78 @@ class ScriptRunner:
             clear: 是否清除之前的信息
             level: 信息级别 ("info", "warning", "error")
         """
-        def _update():
-            if clear:
-                self.text_browser.delete(1.0, tk.END)
-            
-            # 根据不同级别添加不同的前缀标识
-            prefix = {
-                "info": "●",
-                "warning": "◆",
-                "error": "✘"
-            }.get(level, "")
-            
-            timestamp = time.strftime('%H:%M:%S')
-            formatted_message = f"[{timestamp}] {prefix} {message}\n"
-            
-            # # 检查最后一行是否包含“时间等待还有”
-            # current_content = self.text_browser.get(1.0, tk.END)
-            # lines = current_content.splitlines()
-            # if lines and len(lines) > 2 and "时间等待还有" in lines[-2]:
-            #     # 替换最后一行
-            #     self.text_browser.delete(f"{len(lines)}.0", tk.END)  # 删除最后一行
-            # elif lines and len(lines) > 2 and "时间等待还有" in lines[-1]:
-            #     # 替换最后一行
-            #     self.text_browser.delete(f"{len(lines)-1}.0", tk.END)  # 删除最后一行
-            
-            # 根据不同级别设置不同的标签
-            self.text_browser.insert(tk.END, formatted_message)
-            self.text_browser.see(tk.END)  # 自动滚动到最新信息
-        
-        self.root.after(0, _update)
-
-    def get_proxy(self):
+        # 根据不同级别添加不同的前缀标识
+        prefix = {
+            "info": "●",
+            "warning": "◆",
+            "error": "✘"
+        }.get(level, "")
+
+        timestamp = time.strftime('%H:%M:%S')
+        formatted_message = f"[{timestamp}] {prefix} {message}"
+
+        # 完整日志实时写入滚动文件，文本框只显示最近的部分
+        if self.file_log is not None:
+            self.file_log.info(formatted_message)
+        if clear:
+            self.log_buffer.append(None)  # 清除标记
+        self.log_buffer.append(formatted_message)
+
+    def _flush_log(self):
+        """按固定帧率把缓冲的日志写入文本框"""
         try:
-            response = requests.post(self.proxy_api)
-            if response.status_code == 200:
-                data = response.json()
-                if data['status'] == 'success':
-                    proxy_info = data['proxy']
-                    return proxy_info
+            self._write_log()
+        finally:
+            self.root.after(LOG_FRAME_MS, self._flush_log)
+
+    def _write_log(self):
+        """把缓冲的日志一次性写入文本框，并限制文本框的行数"""
+        lines = []
+        clear = False
+        while True:
+            try:
+                line = self.log_buffer.popleft()
+            except IndexError:
+                break
+            if line is None:  # 清除标记
+                clear = True
+                lines = []
             else:
-                data = response.json()
-                self.show_message(f"获取代理失败:{data['message']}", level="error")
-                return None
-        except Exception as e:
-            self.show_message(f"获取代理异常:{str(e)}", level="error")
-            return None
+                lines.append(line)
 
-    def execute_command(self, script):
-        """执行单个脚本命令"""
-        command = script['command']
-        params = script.get('params', [])
-        self.show_message(f"执行命令: {command}, 参数: {params}", level="info")
+        if clear:
+            self.text_browser.delete(1.0, tk.END)
+        if lines:
+            self.text_browser.insert(tk.END, "\n".join(lines) + "\n")
+            # 超过行数上限时删除最早的行
+            line_count = int(self.text_browser.index('end-1c').split('.')[0]) - 1
+            if line_count > self.log_max_lines:
+                self.text_browser.delete(1.0, f"{line_count - self.log_max_lines + 1}.0")
+            self.text_browser.see(tk.END)  # 自动滚动到最新信息
+
+    def setup_file_log(self):
+        """按 [Log] 配置创建滚动日志文件"""
+        log_file = self.config.get('Log', 'file', fallback=os.path.join('logs', 'run.log'))
+        max_bytes = self.config.getint('Log', 'max_bytes', fallback=10 * 1024 * 1024)
+        backup_count = self.config.getint('Log', 'backup_count', fallback=5)
+        self.log_max_lines = self.config.getint('Log', 'max_lines', fallback=5000)
+
+        logger = logging.getLogger('run')
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        if not logger.handlers:
+            try:
+                log_dir = os.path.dirname(log_file)
+                if log_dir:
+                    os.makedirs(log_dir, exist_ok=True)
+                handler = RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count,
+                                              encoding='utf-8')
+            except OSError:
+                return None
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            logger.addHandler(handler)
+        return logger
 
-        try:
-            if command == "创建比特窗口":
-                if params[1] == '是':
-                    self.abort_image = True
-                if params[2] == '是':
-                    self.abort_media = True
-                if params[3] == '是':
-                    self.proxy_use = True
-                    self.proxy_api = params[4]
-                self.bit_window = Bit(params[0], abortImage=self.abort_image, abortMedia=self.abort_media)
-                self.show_message("比特窗口创建成功", level="info")
-            elif command == "打开比特窗口":
-                self.bit_browser = self.bit_window.create()
-                self.web_browser = Web(self.bit_window, self.bit_browser)
-                self.show_message("比特窗口打开成功", level="info")
-            elif command == "关闭比特窗口":
-                self.bit_window.close(self.bit_browser)
-                self.show_message("比特窗口已关闭", level="info")
-            elif command == "删除比特窗口":
-                self.bit_window.delete(self.bit_browser)
-                self.show_message("比特窗口已删除", level="info")
-            elif command == "重置关闭状态":
-                self.bit_window.reset(self.bit_browser)
-                self.show_message("窗口状态已重置", level="info")
-            elif command == "获取窗口详情":
-                detail = self.bit_window.detail(self.bit_browser)
-                self.show_message("窗口详情:", clear=True)
-                self.show_message(detail, level="info")
-            elif command == "清理窗口缓存":
-                self.bit_window.clear([self.bit_browser])
-                self.show_message("窗口缓存已清理", level="info")
-            elif command == "一键排列窗口":
-                self.bit_window.flexable()
-                self.show_message("窗口已重新排列", level="info")
-            elif command == "窗口随机指纹":
-                if self.bit_window.finger(self.bit_browser):
-                    self.show_message("窗口指纹已随机化", level="info")
-                else:
-                    raise Exception("窗口随机指纹失败")
-            elif command == "窗口固定指纹":
-                if self.bit_window.finger_fix(self.bit_browser, params[0]):
-                    self.show_message("窗口指纹已修改", level="info")
-                else:
-                    raise Exception("窗口指纹修改失败")
-            elif command == "修改窗口代理":
-                if self.proxy_use:
-                    proxy_mode = params[0]  # 获取代理模式
-                    proxy_type = params[1]  # 获取代理类型
-                    
-                    if proxy_mode == "fixed":
-                        proxy_params = params[2]  # 获取代理参数
-                        # 解析代理参数
-                        parts = proxy_params.split('@')
-                        if len(parts) != 2:
-                            raise Exception("代理参数格式应为: {username}:{password}@{ip}:{port}")
-                        
-                        user_pass, host_port = parts
-                        user_pass_parts = user_pass.split(':')
-                        if len(user_pass_parts) != 2:
-                            raise Exception("代理用户名和密码格式应为: username:password")
-                        
-                        username, password = user_pass_parts
-                        host_port_parts = host_port.split(':')
-                        if len(host_port_parts) != 2:
-                            raise Exception("代理IP和端口格式应为: ip:port")
-                        
-                        ip, port = host_port_parts
-
-                        proxy_data = {
-                            'ids': [self.bit_browser],
-                            'proxyMethod': 2,
-                            'proxyType': proxy_type,
-                            'host': ip,
-                            'port': port,
-                            'proxyUserName': username,
-                            'proxyPassword': password,
-                        }
-                        if self.bit_window.proxy(proxy_data):
-                            self.show_message(f"窗口代理已修改（固定模式）: {proxy_type} {ip}:{port} {username}/{password}", level="info")
-                        else:
-                            raise Exception("窗口代理修改失败")
-                    else:  # api
-                        proxy = self.get_proxy()
-                        if proxy:
-                            proxy_data = {
-                                'ids': [self.bit_browser],
-                                'proxyMethod': 2,
-                                'proxyType': proxy['type'],
-                                'host': proxy['ip'],
-                                'port': proxy['port'],
-                                'proxyUserName': proxy['username'],
-                                'proxyPassword': proxy['password'],
-                            }
-                            if self.bit_window.proxy(proxy_data):
-                                self.show_message(f"窗口代理已修改（接口模式）: {proxy['type']} {proxy['ip']}:{proxy['port']} {proxy['username']}/{proxy['password']}", level="info")
-                            else:
-                                raise Exception("窗口代理修改失败")
-                        else:
-                            raise Exception("获取代理失败，无法修改窗口代理")
-                else:
-                    self.show_message("代理功能未启用", level="warning")
-            elif command == "访问URL":
-                self.web_browser.open(params[0])
-                self.show_message(f"正在访问: {params[0]}", level="info")
-            elif command == "滚动页面":
-                scroll_pixels = int(params[0])
-                is_random = False
-                if len(params) > 1 and params[1] == "是":
-                    is_random = True
-                
-                if is_random:
-                    import random
-                    # 根据滚动方向决定随机范围
-                    if scroll_pixels > 0:
-                        actual_pixels = random.randint(0, scroll_pixels)
-                    else:
-                        actual_pixels = random.randint(scroll_pixels, 0)
-                    self.web_browser.scroll(str(actual_pixels))
-                    self.show_message(f"随机滚动页面: {actual_pixels}像素", level="info")
-                else:
-                    self.web_browser.scroll(params[0])
-                    self.show_message(f"滚动页面: {params[0]}像素", level="info")
-            elif command == "回到顶部":
-                self.web_browser.top()
-                self.show_message(f"回到顶部", level="info")
-            elif command == "鼠标悬停":
-                self.web_browser.hover(params[0])
-                self.show_message(f"鼠标悬停于元素: {params[0]}", level="info")
-            elif command == "鼠标点击":
-                if ',' in params[0]:
-                    import random
-                    selectors = [s.strip() for s in params[0].split(',')]
-                    selected_selector = random.choice(selectors)
-                    self.show_message(f"随机选择元素: {selected_selector}", level="info")
-                    self.web_browser.click(selected_selector)
-                else:
-                    self.web_browser.click(params[0])
-                    self.show_message(f"点击元素: {params[0]}", level="info")
-            elif command == "元素等待":
-                self.web_browser.wait_for_element(params[0])
-                self.show_message(f"等待元素出现: {params[0]}", level="info")
-            elif command == "元素滚动":
-                self.web_browser.scroll_to_element(params[0])
-                self.show_message(f"滚动到元素: {params[0]}", level="info")
-            elif command == "输入文本":
-                self.web_browser.input_text(params[0], params[1])
-                self.show_message(f"在元素 {params[0]} 中输入文本", level="info")
-            elif command == "时间等待":
-                try:
-                    import random
-                    wait_time = int(params[0])  # 强制转换为整数
-                    if len(params) > 1 and params[1] == '是':
-                        wait_time = random.randint(1, wait_time)
-                    self.show_message(f"时间等待共需{wait_time}秒", level="info")
-                    # 使用 after 方法进行非阻塞等待
-                    self.waiting_time = time.time() + wait_time
-                except ValueError:
-                    raise Exception(f"无效的等待时间: {params[0]}，必须为整数")
-            elif command == "循环起点":
-                if self.loop_start_index is None:
-                    self.loop_start_index = self.current_index
-                    self.loop_count = 0
-                    self.show_message(f"设置循环起点: 第 {self.loop_start_index + 1} 行", level="info")
-            elif command == "循环终点":
-                if self.loop_start_index is not None:
-                    self.loop_count += 1
-                    if self.loop_count < self.max_loops:
-                        self.show_message(f"第 {self.loop_count} 次循环完成，返回第 {self.loop_start_index + 1} 行", level="info")
-                        self.current_index = self.loop_start_index - 1
-                    else:
-                        self.show_message(f"达到最大循环次数 {self.max_loops}，循环结束", level="info")
-                        self.loop_start_index = None
-                        self.loop_count = 0
-            elif command == "Google搜索":
-                while True:
-                    find = False
-                    for page in range(int(params[2])-1, int(params[3])):
-                        search_page = self.web_browser.google(params[0], params[1], page)
-                        if search_page > 0:
-                            self.show_message(f"Google搜索: 在第 {search_page} 页找到关键词 {params[1]} 搜索结果", level="info")
-                            find = True
-                            break
-                        else:
-                            raise Exception(f"Google搜索: 在第 {page+1} 页未找到关键词 {params[1]} 搜索结果")
-                    if find or len(params) < 5 or params[4] != '是':
-                        break
-        except Exception as e:
-            self.show_message(f"执行命令 '{command}' 时出错: {str(e)}", level="error")
-            raise  # 重新抛出异常，让上层处理
 
     def increase_loops(self):
         """增加最大循环次数"""
@@ -558,8 +518,14 @@ class ScriptRunner:
         try:
             self.config.read(self.config_file, encoding='utf-8')
             self.max_loops = self.config.getint('Settings', 'max_loops', fallback=3)
+            self.session_count = self.config.getint('Settings', 'sessions', fallback=1)
+            self.max_workers = max_workers_from_config(self.config)
+            self.pacing = Pacing.from_config(self.config)
+            self.input_options = input_options_from_config(self.config)
         except Exception:
             self.max_loops = 3
+            self.pacing = Pacing()
+            self.input_options = {}
             self.save_config()
 
     def save_config(self):
@@ -567,6 +533,8 @@ class ScriptRunner:
         if not self.config.has_section('Settings'):
             self.config.add_section('Settings')
         self.config.set('Settings', 'max_loops', str(self.max_loops))
+        self.config.set('Settings', 'sessions', str(self.session_count))
+        self.config.set('Settings', 'max_workers', str(self.max_workers))
         try:
             with open(self.config_file, 'w', encoding='utf-8') as f:
                 self.config.write(f)
@@ -605,6 +573,7 @@ class ScriptRunner:
             )
             
             if filename:
+                self._write_log()  # 先写入尚在缓冲区中的日志
                 # 获取文本框中的所有内容
                 log_content = self.text_browser.get(1.0, tk.END)
                 
@@ -613,53 +582,30 @@ class ScriptRunner:
                     f.write(log_content)
                 
                 self.show_message(f"记录已保存到: {filename}", level="info")
+                # 文本框只保留最近的记录，完整的历史日志在滚动日志文件中
+                log_file = self.log_file_path()
+                if log_file:
+                    self.show_message(f"完整日志文件: {os.path.abspath(log_file)}", level="info")
                 
         except Exception as e:
             messagebox.showerror("错误", f"保存记录失败: {str(e)}")
 
+    def log_file_path(self):
+        """滚动日志文件的路径，未启用时返回 None"""
+        if self.file_log is None or not self.file_log.handlers:
+            return None
+        return self.file_log.handlers[0].baseFilename
+
     def verify_license(self):
         """验证 license"""
         try:
-            # 检查 license 文件是否存在
-            if not os.path.exists("license.json"):
-                self.show_message(f"未找到 license 文件", level="warning")
-                return False
-                
-            # 读取 license 文件
-            with open("license.json", "r", encoding="utf-8") as f:
-                license_data = json.load(f)
-                
-            # 验证 license 格式
-            if "data" not in license_data or "signature" not in license_data:
-                return False
-                
-            # 验证签名
-            data_str = json.dumps(license_data["data"], sort_keys=True)
-            current_signature = hashlib.sha256(data_str.encode()).hexdigest()
-            if current_signature != license_data["signature"]:
-                return False
-                
-            # 验证机器码
-            current_machine_code = str(uuid.getnode())
-            if current_machine_code != license_data["data"]["machine_code"]:
-                return False
-                
-            # 验证过期时间
-            expiry_date = datetime.datetime.strptime(
-                license_data["data"]["expiry_date"], 
-                "%Y-%m-%d %H:%M:%S"
-            )
-            if datetime.datetime.now() > expiry_date:
-                self.show_message(f"License 已过期", level="warning")
-                return False
-                
-            # 验证成功，更新窗口标题
-            self.update_title(license_data["data"]["customer"], expiry_date)
-            return True
-                
+            customer, expiry_date = check_license()
         except Exception as e:
             self.show_message(f"License 验证失败: {str(e)}", level="warning")
             return False
+        # 验证成功，更新窗口标题
+        self.update_title(customer, expiry_date)
+        return True
 
     def update_title(self, customer, expiry_date):
         """更新窗口标题"""
@@ -712,7 +658,7 @@ class ScriptRunner:
         machine_code_frame.pack(fill=tk.X, pady=(0, 10))
         
         # 机器码输入框
-        machine_code = str(uuid.getnode())
+        machine_code = current_machine_code()
         code_text = ttk.Entry(machine_code_frame)
         code_text.insert(0, machine_code)
         code_text.config(state='readonly')
@@ -761,7 +707,7 @@ class ScriptRunner:
             try:
                 # 复制 license 文件到程序目录
                 import shutil
-                shutil.copy2(license_path.get(), "license.json")
+                shutil.copy2(license_path.get(), LICENSE_FILE)
                 
                 # 重新验证
                 if self.verify_license():
@@ -792,36 +738,44 @@ class ScriptRunner:
             messagebox.showwarning("警告", "请先加载脚本")
             return
   
-        if not self.running:
+        if not self.running and not self.stepping:
             self.load_button.config(state=tk.DISABLED)
             self.pause_button.config(state=tk.NORMAL)
-            self.pause_event.set()
+            self.step_button.config(state=tk.DISABLED)  # 执行完成前不接受下一次单步
+            self.run_button.config(state=tk.DISABLED)
 
             selected_indices = self.script_listbox.curselection()
             if selected_indices:
                 self.current_index = selected_indices[0]  # 赋值给 current_index
             else:
                 self.current_index = 0  # 如果没有选中项，默认从第一个开始
-            
-            self.execute_next_command(True)  # 执行下一条命令
 
-    def execute_next_command(self, step=False):
-        """执行当前索引的命令"""
-        if self.current_index < len(self.scripts):
-            script = self.scripts[self.current_index]
-            try:
-                self.execute_command(script)
-                self.select_current_script()  # 选中当前执行的脚本行
-                self.current_index += 1  # 更新索引
-                if step:  # 如果是单步运行，直接返回
-                    self.script_listbox.selection_clear(0, "end")
-                    self.script_listbox.selection_set(self.current_index)
-                    return
-                self.root.after(0, self.execute_next_command)  # 继续执行下一条命令
-            except Exception as e:
-                error_message = f"执行命令 '{script['command']}' 时发生错误: {str(e)}"
-                self.show_message(f"☹ {error_message}", level="error")
-                self.stop_running()  # 停止运行
+            self.stepping = True
+            self.select_current_script()  # 选中当前执行的脚本行
+            self.executor.submit(self.execute_next_command)  # 在后台线程执行下一条命令
+
+    def execute_next_command(self):
+        """在后台线程执行当前索引的命令"""
+        try:
+            if self.current_index < len(self.program):
+                instr = self.program[self.current_index]
+                session = self.session or self._make_session(1)
+                try:
+                    self.current_index = session.step(self.current_index)  # 更新索引
+                    self.ui(self.select_current_script)
+                except Exception as e:
+                    error_message = f"执行命令 '{instr.command}' 时发生错误: {str(e)}"
+                    self.show_message(f"☹ {error_message}", level="error")
+                    self.ui(self.stop_running)  # 停止运行
+        finally:
+            self.ui(self._step_done)
+
+    def _step_done(self):
+        """单步执行结束，恢复按钮状态"""
+        self.stepping = False
+        self.step_button.config(state=tk.NORMAL)
+        if not self.running:
+            self.run_button.config(state=tk.NORMAL)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,165 @@
+import argparse
+import configparser
+import json
+import os
+import signal
+import sys
+import time
+from engine.compiler import compile_script, validate_script
+from engine.estimate import estimate, format_estimate
+from engine.pacing import Pacing
+from engine.session import Session, SessionPool, input_options_from_config, max_workers_from_config
+from engine.trace import TraceWriter, summarize, format_summary
+from engine.profiler import Profiler
+from licensing import check_license
+
+# 命令行脚本运行器：不依赖 tkinter，用于服务器和计划任务
+# 用法: python run_cli.py script1.json [script2.json ...] --loops 3 --sessions 4 --workers 2 --summary
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="命令行运行脚本文件")
+    parser.add_argument('scripts', nargs='+', help="脚本文件（JSON），按顺序依次运行")
+    parser.add_argument('-l', '--loops', type=int, help="未指定次数的循环的最大循环次数，缺省读取配置文件")
+    parser.add_argument('-n', '--sessions', type=int, help="每个脚本同时运行的会话数，缺省读取配置文件")
+    parser.add_argument('-w', '--workers', type=int, help="会话并发上限，缺省读取配置文件")
+    parser.add_argument('-t', '--trace', help="运行记录文件（JSONL），缺省按 [Trace] 配置生成")
+    parser.add_argument('-s', '--summary', action='store_true', help="结束后输出每种指令的耗时统计")
+    parser.add_argument('-p', '--profile', help="开启性能分析，并将折叠栈写入该文件")
+    parser.add_argument('--check', action='store_true', help="只检查脚本并估算运行时间，不运行")
+    parser.add_argument('-c', '--config', default="config.ini", help="配置文件")
+    return parser.parse_args(argv)
+
+
+def positive(value, name):
+    if value <= 0:
+        raise SystemExit(f"{name}必须大于0")
+    return value
+
+
+def show_message(session, message, clear, level):
+    """会话日志输出到标准输出，错误输出到标准错误"""
+    line = f"[{time.strftime('%H:%M:%S')}] [会话{session.session_id}] [{level}] {message}"
+    print(line, file=sys.stderr if level == "error" else sys.stdout, flush=True)
+
+
+def load_program(path):
+    """加载并检查脚本，返回 (指令列表, 错误列表)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        scripts = json.load(f)
+    errors = validate_script(scripts)
+    if errors:
+        return None, errors
+    return compile_script(scripts), []
+
+
+def open_trace(args, config):
+    """按参数或 [Trace] 配置创建运行记录"""
+    path = args.trace
+    if path is None:
+        # 需要输出统计时，即使配置中关闭了运行记录也要生成
+        if not config.getboolean('Trace', 'enabled', fallback=True) and not args.summary:
+            return None
+        trace_dir = config.get('Trace', 'dir', fallback='logs')
+        os.makedirs(trace_dir, exist_ok=True)
+        path = os.path.join(trace_dir, time.strftime("trace_%Y%m%d_%H%M%S.jsonl"))
+    return TraceWriter(path)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    config = configparser.ConfigParser()
+    config.read(args.config, encoding='utf-8')
+
+    try:
+        check_license()
+    except Exception as e:
+        print(f"License 验证失败: {str(e)}", file=sys.stderr)
+        return 2
+
+    # 参数为 0 时也要检查，不能当作未指定而改用配置值
+    max_loops = positive(args.loops if args.loops is not None
+                         else config.getint('Settings', 'max_loops', fallback=3), "循环次数")
+    session_count = positive(args.sessions if args.sessions is not None
+                             else config.getint('Settings', 'sessions', fallback=1), "会话数")
+    max_workers = positive(args.workers if args.workers is not None
+                           else max_workers_from_config(config), "并发数")
+    pacing = Pacing.from_config(config)
+    input_options = input_options_from_config(config)
+
+    # 先检查所有脚本，有错误时不启动任何浏览器
+    programs = []
+    invalid = False
+    for path in args.scripts:
+        try:
+            program, errors = load_program(path)
+        except (OSError, ValueError) as e:
+            print(f"加载脚本失败 {path}: {str(e)}", file=sys.stderr)
+            invalid = True
+            continue
+        for error in errors:
+            print(f"{path}: {error}", file=sys.stderr)
+        if errors:
+            invalid = True
+            continue
+        programs.append((path, program))
+        print(f"{path}:")
+        print("\n".join(format_estimate(estimate(program, pacing, max_loops, input_options),
+                                        session_count, max_workers)), flush=True)
+    if invalid:
+        return 2
+    if args.check:
+        return 0
+
+    try:
+        trace = open_trace(args, config)
+    except OSError as e:
+        print(f"创建运行记录失败: {str(e)}", file=sys.stderr)
+        return 2
+    profiler = None
+    if args.profile:
+        profiler = Profiler()
+
+    failed = False
+    pool = None
+
+    # Ctrl+C 或 SIGTERM 时停止所有会话，等待其正常收尾
+    def stop(signum, frame):
+        nonlocal failed
+        failed = True
+        if pool is not None:
+            pool.stop()
+    signal.signal(signal.SIGINT, stop)
+    if hasattr(signal, 'SIGTERM'):
+        signal.signal(signal.SIGTERM, stop)
+
+    try:
+        for path, program in programs:
+            if failed:
+                break
+            print(f"运行脚本: {path}", flush=True)
+            pool = SessionPool(
+                lambda session_id: Session(program, session_id, max_loops=max_loops, pacing=pacing,
+                                           on_message=show_message, input_options=input_options,
+                                           trace=trace, profiler=profiler),
+                session_count, max_workers)
+            pool.run()
+            for session_id, error in pool.errors():
+                failed = True
+                print(f"{path} 会话{session_id}: {error}", file=sys.stderr)
+    finally:
+        if profiler is not None:
+            profiler.uninstall()
+            profiler.write_collapsed(args.profile)
+            print(f"性能分析已保存到: {args.profile}")
+        if trace is not None:
+            trace.close()
+            print(f"运行记录已保存到: {trace.path}")
+            if args.summary:
+                print("\n".join(format_summary(summarize(trace.path))))
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,186 @@
+from html.parser import HTMLParser
+from urllib.parse import parse_qs, quote_plus, urlsplit
+
+# Google 搜索结果页解析：只提取结果块中的链接地址和位置，不构建完整的文档树
+# 解析后端按速度优先选择已安装的 selectolax、lxml、bs4，都未安装时使用标准库 html.parser
+
+SEARCH_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.3"
+}
+RESULT_SLICE = slice(3, 13)  # div#main 的直接子 div 中，第 4 到第 13 个是自然搜索结果
+
+
+def search_url(query, page):
+    return f"https://www.google.com/search?q={quote_plus(query)}&start={page * 10}"
+
+
+def fetch(url, timeout=30):
+    """请求搜索结果页，requests 在首次使用时才导入"""
+    import requests
+    return requests.get(url, headers=SEARCH_HEADERS, timeout=timeout)
+
+
+def result_url(href):
+    """将结果链接还原为目标地址，Google 的跳转链接取 q 参数，站内链接返回 None"""
+    if not href:
+        return None
+    if href.startswith('/url?'):
+        query = parse_qs(urlsplit(href).query)
+        target = query.get('q') or query.get('url')
+        return target[0] if target else None
+    if href.startswith(('http://', 'https://')):
+        return href
+    return None
+
+
+def normalize_domain(value):
+    """从地址或域名中取出小写主机名，去掉协议、端口、www. 前缀和末尾的点"""
+    value = value.strip().lower()
+    if '//' not in value:
+        value = '//' + value
+    host = (urlsplit(value).hostname or '').rstrip('.')
+    if host.startswith('www.'):
+        host = host[4:]
+    return host
+
+
+def domain_matches(url, site):
+    """地址的域名是否为目标站点或其子域名"""
+    target = normalize_domain(site)
+    host = normalize_domain(url)
+    return bool(target) and (host == target or host.endswith('.' + target))
+
+
+def _first_url(hrefs):
+    for href in hrefs:
+        url = result_url(href)
+        if url:
+            return url
+    return None
+
+
+def _parse_selectolax(html):
+    # selectolax 1.0 起只保留 lexbor 引擎，selectolax.parser 已不可导入
+    from selectolax.lexbor import LexborHTMLParser
+    main = LexborHTMLParser(html).css_first('div#main')
+    if main is None:
+        return None
+    return [_first_url(a.attributes.get('href') for a in block.css('a[href]'))
+            for block in main.iter() if block.tag == 'div']
+
+
+def _parse_lxml(html):
+    import lxml.html
+    found = lxml.html.fromstring(html).xpath('//div[@id="main"]')
+    if not found:
+        return None
+    return [_first_url(a.get('href') for a in block.iterfind('.//a[@href]'))
+            for block in found[0].iterchildren('div')]
+
+
+def _parse_bs4(html):
+    from bs4 import BeautifulSoup
+    main = BeautifulSoup(html, 'html.parser').find('div', id='main')
+    if main is None:
+        return None
+    return [_first_url(a['href'] for a in block.find_all('a', href=True))
+            for block in main.find_all('div', recursive=False)]
+
+
+class _ResultExtractor(HTMLParser):
+    """流式提取 div#main 的每个直接子 div 中的链接，只跟踪 div 的嵌套层数"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.div_depth = 0
+        self.main_depth = None  # div#main 所在的层数
+        self.blocks = None  # 每个结果块中的链接列表
+        self.in_block = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'div':
+            self.div_depth += 1
+            if self.main_depth is None:
+                if dict(attrs).get('id') == 'main':
+                    self.main_depth = self.div_depth
+                    self.blocks = []
+            elif self.div_depth == self.main_depth + 1:
+                self.blocks.append([])
+                self.in_block = True
+        elif tag == 'a' and self.in_block:
+            href = dict(attrs).get('href')
+            if href:
+                self.blocks[-1].append(href)
+
+    def handle_endtag(self, tag):
+        if tag != 'div':
+            return
+        if self.main_depth is not None:
+            if self.div_depth == self.main_depth + 1:
+                self.in_block = False
+            elif self.div_depth == self.main_depth:
+                self.main_depth = -1  # div#main 已结束，之后的内容不再处理
+        self.div_depth -= 1
+
+
+def _parse_stdlib(html):
+    extractor = _ResultExtractor()
+    extractor.feed(html)
+    extractor.close()
+    if extractor.blocks is None:
+        return None
+    return [_first_url(hrefs) for hrefs in extractor.blocks]
+
+
+# 解析后端，按优先顺序排列
+BACKENDS = {
+    'selectolax': _parse_selectolax,
+    'lxml': _parse_lxml,
+    'bs4': _parse_bs4,
+    'html': _parse_stdlib,
+}
+_MODULES = {'selectolax': 'selectolax.lexbor', 'lxml': 'lxml.html', 'bs4': 'bs4', 'html': 'html.parser'}
+_default_backend = None
+
+
+def available_backends():
+    """已安装的解析后端名称，按优先顺序排列"""
+    import importlib.util
+    names = []
+    for name, module in _MODULES.items():
+        try:
+            if importlib.util.find_spec(module) is not None:
+                names.append(name)
+        except ImportError:
+            pass
+    return names
+
+
+def get_backend(name=None):
+    """返回解析函数，未指定时使用已安装的最快后端"""
+    global _default_backend
+    if name is not None:
+        if name not in BACKENDS:
+            raise ValueError(f"未知的解析后端: {name}")
+        return BACKENDS[name]
+    if _default_backend is None:
+        _default_backend = available_backends()[0]
+    return BACKENDS[_default_backend]
+
+
+def parse_results(html, backend=None):
+    """提取搜索结果页中的自然结果地址，按位置排列，没有链接的结果块为 None
+    页面中没有搜索结果区域时抛出 ValueError
+    """
+    blocks = get_backend(backend)(html)
+    if blocks is None:
+        raise ValueError("搜索结果页中未找到 div#main")
+    return blocks[RESULT_SLICE]
+
+
+def find_site(html, site, backend=None):
+    """在搜索结果页中查找目标站点，返回 (页内位置, 结果地址)，未找到时返回 None"""
+    for index, url in enumerate(parse_results(html, backend), 1):
+        if url and domain_matches(url, site):
+            return index, url
+    return None
@@ -0,0 +1,102 @@
+import asyncio
+import threading
+from aiohttp import web
+
+
+# 比特浏览器本地接口的进程内模拟服务，在后台线程的事件循环中运行，同步和异步客户端都可以连接
+class BitStub:
+    def __init__(self, delay=0):
+        self.delay = delay  # 每个请求的处理耗时（秒），用于观察并发
+        self.requests = []  # 收到的请求 [(路径, 请求体)]
+        self.failures = {}  # 路径 -> 依次返回的错误状态码，用完后恢复正常
+        self.responses = {}  # 路径 -> 固定返回的 JSON
+        self.windows = {}  # 窗口ID -> 'open' / 'closed'
+        self.active = {}  # 路径 -> 处理中的请求数
+        self.max_active = {}  # 路径 -> 同时处理中的最大请求数
+        self.url = None
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self._loop = None
+        self._thread = None
+
+    def fail(self, path, *statuses):
+        """令 path 接下来的请求依次返回这些状态码"""
+        self.failures[path] = list(statuses)
+
+    def count(self, path):
+        return sum(1 for request_path, _ in self.requests if request_path == path)
+
+    def start(self):
+        ready = threading.Event()
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._serve, args=(ready,), daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self.url
+
+    def stop(self):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def _serve(self, ready):
+        asyncio.set_event_loop(self._loop)
+        app = web.Application()
+        app.router.add_post('/{path:.*}', self._handle)
+        runner = web.AppRunner(app, shutdown_timeout=0.1)  # 停止时不等待未完成的请求
+        self._loop.run_until_complete(runner.setup())
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        self._loop.run_until_complete(site.start())
+        host, port = runner.addresses[0][:2]
+        self.url = f"http://{host}:{port}"
+        ready.set()
+        self._loop.run_forever()
+        self._loop.run_until_complete(runner.cleanup())
+        self._loop.close()
+
+    async def _handle(self, request):
+        path = request.path
+        body = await request.json() if request.can_read_body else None
+        with self._lock:
+            self.requests.append((path, body))
+            self.active[path] = self.active.get(path, 0) + 1
+            self.max_active[path] = max(self.max_active.get(path, 0), self.active[path])
+        try:
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            statuses = self.failures.get(path)
+            if statuses:
+                return web.json_response({'success': False, 'msg': 'unavailable'}, status=statuses.pop(0))
+            if path in self.responses:
+                return web.json_response(self.responses[path])
+            return web.json_response(self._dispatch(path, body or {}))
+        finally:
+            with self._lock:
+                self.active[path] -= 1
+
+    def _dispatch(self, path, body):
+        with self._lock:
+            if path == '/browser/update':
+                self._next_id += 1
+                browser_id = f"window{self._next_id}"
+                self.windows[browser_id] = 'closed'
+                return {'success': True, 'data': {'id': browser_id}}
+            if path == '/browser/open':
+                self.windows[body['id']] = 'open'
+                return {'success': True, 'data': {'ws': '', 'http': '127.0.0.1:0', 'driver': ''}}
+            if path == '/browser/close':
+                self.windows[body['id']] = 'closed'
+            elif path == '/browser/delete':
+                self.windows.pop(body['id'], None)
+            elif path == '/browser/delete/ids':
+                for browser_id in body['ids']:
+                    self.windows.pop(browser_id, None)
+            elif path == '/browser/detail':
+                return {'success': True, 'data': {'id': body['id'], 'status': self.windows.get(body['id'])}}
+            return {'success': True}
@@ -0,0 +1,38 @@
+import os
+import socket
+import sys
+import pytest
+
+# 测试直接导入仓库根目录下的模块
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+def make_script(*commands):
+    """由 (指令, 参数...) 元组构造脚本"""
+    return [{'command': command, 'params': list(params)} for command, *params in commands]
+
+
+@pytest.fixture
+def script():
+    """构造脚本的函数，见 make_script"""
+    return make_script
+
+
+@pytest.fixture
+def refused_url():
+    """没有服务监听的本地地址，连接会被拒绝"""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    return f"http://127.0.0.1:{port}"
+
+
+@pytest.fixture
+def bit_stub():
+    """启动比特浏览器接口模拟服务，需要 aiohttp"""
+    pytest.importorskip('aiohttp')
+    from bit_stub import BitStub
+    with BitStub() as stub:
+        yield stub
@@ -0,0 +1,126 @@
+import asyncio
+import pytest
+
+aiohttp = pytest.importorskip('aiohttp')
+from browser.async_bit import AsyncBit
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """记录重试退避的等待时间"""
+    delays = []
+    sleep = asyncio.sleep
+
+    async def record(delay, *args, **kwargs):
+        if delay > 0:
+            delays.append(delay)
+        return await sleep(0)
+
+    monkeypatch.setattr(asyncio, 'sleep', record)
+    return delays
+
+
+def run(coro_func, *args, **kwargs):
+    """在新的事件循环中使用 AsyncBit 运行 coro_func(bit)，结束后关闭连接池"""
+    async def main():
+        async with AsyncBit(*args, **kwargs) as bit:
+            return await coro_func(bit)
+    return asyncio.run(main())
+
+
+def test_post_retries_service_unavailable_with_backoff(bit_stub, sleeps):
+    bit_stub.fail('/health', 503, 503)
+    res = run(lambda bit: bit._post('/health'), bit_stub.url, retries=3, backoff=0.1)
+    assert res['success']
+    assert bit_stub.count('/health') == 3
+    assert sleeps == [0.1, 0.2]
+
+
+def test_post_returns_last_response_when_retries_are_exhausted(bit_stub, sleeps):
+    bit_stub.fail('/health', 503, 503, 503)
+    res = run(lambda bit: bit._post('/health'), bit_stub.url, retries=1, backoff=0.1)
+    assert res == {'success': False, 'msg': 'unavailable'}
+    assert bit_stub.count('/health') == 2
+
+
+def test_post_retries_refused_connections(sleeps, refused_url):
+    with pytest.raises(aiohttp.ClientConnectorError):
+        run(lambda bit: bit._post('/health'), refused_url, retries=2, backoff=0.1)
+    assert sleeps == [0.1, 0.2]
+
+
+def test_create_is_not_retried_on_gateway_error(bit_stub, sleeps):
+    bit_stub.fail('/browser/update', 503)
+    with pytest.raises(KeyError):
+        run(lambda bit: bit.create(), bit_stub.url, retries=3, backoff=0.1)
+    assert bit_stub.count('/browser/update') == 1
+    assert sleeps == []
+
+
+def test_create_many_and_close_many_fan_out(bit_stub):
+    bit_stub.delay = 0.05
+
+    async def lifecycle(bit):
+        ids = await bit.create_many(5)
+        assert set(ids) == bit.ids
+        results = await bit.close_many(ids + ['unknown'])
+        return ids, results
+
+    ids, results = run(lifecycle, bit_stub.url)
+    assert len(set(ids)) == 5
+    assert [res['success'] for res in results[:5]] == [True] * 5
+    assert results[5] is None  # 未登记的窗口不发送请求
+    assert bit_stub.count('/browser/close') == 5
+    assert bit_stub.max_active['/browser/close'] > 1
+    assert set(bit_stub.windows.values()) == {'closed'}
+
+
+def test_delete_many_sends_batches(bit_stub):
+    async def lifecycle(bit):
+        ids = await bit.create_many(5)
+        results = await bit.delete_many(ids + ['unknown'], batch_size=2)
+        return results, bit.ids
+
+    results, remaining = run(lifecycle, bit_stub.url)
+    batches = [body['ids'] for path, body in bit_stub.requests if path == '/browser/delete/ids']
+    assert sorted(len(ids) for ids in batches) == [1, 2, 2]
+    assert 'unknown' not in sum(batches, [])
+    assert len(results) == 3
+    assert remaining == set()
+    assert bit_stub.windows == {}
+
+
+def test_delete_many_keeps_ids_of_failed_batches(bit_stub):
+    async def lifecycle(bit):
+        ids = await bit.create_many(3)
+        bit_stub.responses['/browser/delete/ids'] = {'success': False, 'msg': 'failed'}
+        await bit.delete_many(ids)
+        return ids, bit.ids
+
+    ids, remaining = run(lifecycle, bit_stub.url)
+    assert remaining == set(ids)
+
+
+def test_health_is_cached(bit_stub):
+    async def check(bit):
+        assert bit.status is None
+        first = await bit.health()
+        second = await bit.health()
+        assert bit_stub.count('/health') == 1
+        await bit.health(max_age=0)
+        assert bit_stub.count('/health') == 2
+        return first, second, bit.status
+
+    first, second, status = run(check, bit_stub.url)
+    assert first is second
+    assert status is True
+
+
+def test_health_reports_unreachable_service(refused_url):
+    async def check(bit):
+        res = await bit.health()
+        return res, bit.status
+
+    res, status = run(check, refused_url, retries=0)
+    assert res['success'] is False
+    assert status is False
@@ -0,0 +1,108 @@
+import pytest
+
+pytest.importorskip('requests')
+from browser.bit import Bit
+
+
+def make_bit(url):
+    bit = Bit(url, retries=2, backoff=0)
+    bit._health_thread.join()  # 等待构造时的后台健康检查结束，避免计入请求次数
+    return bit
+
+
+def test_gateway_errors_are_retried_on_idempotent_endpoints(bit_stub):
+    bit = make_bit(bit_stub.url)
+    browser_id = bit.create()
+    bit_stub.fail('/browser/close', 503, 502)
+    assert bit.close(browser_id)['success']
+    assert bit_stub.count('/browser/close') == 3
+
+
+def test_create_is_not_retried_on_gateway_error(bit_stub):
+    bit = make_bit(bit_stub.url)
+    bit_stub.fail('/browser/update', 503)
+    with pytest.raises(KeyError):
+        bit.create()
+    assert bit_stub.count('/browser/update') == 1
+    assert bit_stub.windows == {}
+
+
+def test_create_many_and_close_many_pipeline_requests(bit_stub):
+    bit = make_bit(bit_stub.url)
+    bit_stub.delay = 0.05
+    ids = bit.create_many(5)
+    assert len(set(ids)) == 5
+    assert bit.ids == set(ids)
+    results = bit.close_many(ids + ['unknown'])
+    assert [res['success'] for res in results[:5]] == [True] * 5
+    assert results[5] is None  # 未登记的窗口不发送请求
+    assert bit_stub.count('/browser/close') == 5
+    assert bit_stub.max_active['/browser/close'] > 1
+    assert set(bit_stub.windows.values()) == {'closed'}
+
+
+def test_delete_many_sends_batches(bit_stub):
+    bit = make_bit(bit_stub.url)
+    ids = bit.create_many(5)
+    results = bit.delete_many(ids + ['unknown'], batch_size=2)
+    batches = [body['ids'] for path, body in bit_stub.requests if path == '/browser/delete/ids']
+    assert sorted(len(batch) for batch in batches) == [1, 2, 2]
+    assert 'unknown' not in sum(batches, [])
+    assert len(results) == 3
+    assert bit.ids == set()
+    assert bit_stub.windows == {}
+
+
+def test_delete_many_keeps_ids_of_failed_batches(bit_stub):
+    bit = make_bit(bit_stub.url)
+    ids = bit.create_many(3)
+    bit_stub.responses['/browser/delete/ids'] = {'success': False, 'msg': 'failed'}
+    bit.delete_many(ids)
+    assert bit.ids == set(ids)
+
+
+def test_status_comes_from_background_probe(bit_stub, capsys):
+    bit = make_bit(bit_stub.url)
+    assert bit.status is True
+    assert bit.status is True
+    assert bit_stub.count('/health') == 1  # 结果未过期时不重新检查
+    assert capsys.readouterr().out == ""
+
+
+def test_status_is_unknown_until_probe_returns(bit_stub):
+    bit_stub.delay = 0.2
+    bit = Bit(bit_stub.url)
+    assert bit.status is None  # 构造时不阻塞
+    bit.probe()  # 检查进行中时不重复发起
+    bit._health_thread.join()
+    assert bit.status is True
+    assert bit_stub.count('/health') == 1
+
+
+def test_expired_status_is_refreshed_in_background(bit_stub):
+    bit = make_bit(bit_stub.url)
+    first = bit.health()
+    bit_stub.responses['/health'] = {'success': False, 'msg': 'stopping'}
+    bit._health_checked -= bit.health_ttl  # 结果过期
+    assert bit.status is True  # 先返回上次的结果，同时在后台重新检查
+    bit._health_thread.join()
+    assert bit.status is False
+    assert bit_stub.count('/health') == 2
+    assert bit.health() is not first
+    assert bit.health()['msg'] == 'stopping'
+
+
+def test_health_max_age(bit_stub):
+    bit = make_bit(bit_stub.url)
+    assert bit.health() is bit.health()
+    assert bit_stub.count('/health') == 1
+    bit.health(max_age=0)
+    assert bit_stub.count('/health') == 2
+
+
+def test_unreachable_service(refused_url, capsys):
+    bit = make_bit(refused_url)
+    assert bit.status is False
+    res = bit.health()
+    assert res['success'] is False and res['msg']
+    assert capsys.readouterr().out == ""
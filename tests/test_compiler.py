@@ -0,0 +1,102 @@
+import pytest
+from engine import commands
+from engine.compiler import ScriptError, compile_script, validate_script
+from engine.pacing import BROWSER, CONTROL, LOCAL
+
+
+@pytest.fixture
+def compile_one(script):
+    """编译单条指令"""
+    return lambda command, *params: compile_script(script((command, *params)))[0]
+
+
+def test_params_are_parsed_to_typed_values(compile_one):
+    wait = compile_one("时间等待", "5", "是")
+    assert wait.args == {'seconds': 5, 'random': True}
+    assert wait.handler is commands.time_wait
+    assert wait.kind == CONTROL
+    assert compile_one("时间等待", "0", "否").args == {'seconds': 0, 'random': False}
+
+    assert compile_one("滚动页面", "-300").args == {'pixels': -300, 'random': False}
+    assert compile_one("鼠标点击", "#a, .b ,").args == ['#a', '.b']
+    assert compile_one("鼠标点击", "#a").args == ['#a']
+    assert compile_one("输入文本", "#q", "hello").args == {'selector': '#q', 'text': 'hello'}
+    assert compile_one("窗口固定指纹", '{"coreVersion": "124"}').args == {'coreVersion': '124'}
+    assert compile_one("Google搜索", "example.com", "kw", "1", "3", "是").args == {
+        'site': 'example.com', 'keyword': 'kw', 'start': 1, 'end': 3, 'loop': True}
+    assert compile_one("访问URL", "https://example.com").kind == BROWSER
+
+
+def test_proxy_params(compile_one):
+    fixed = compile_one("修改窗口代理", "fixed", "socks5", "user:pass@1.2.3.4:1080")
+    assert fixed.args == {'mode': 'fixed', 'type': 'socks5', 'host': '1.2.3.4', 'port': '1080',
+                          'username': 'user', 'password': 'pass'}
+    assert fixed.kind == LOCAL
+    anonymous = compile_one("修改窗口代理", "fixed", "http", "1.2.3.4:8080")
+    assert (anonymous.args['username'], anonymous.args['password']) == ('', '')
+    assert compile_one("修改窗口代理", "api", "http").args == {'mode': 'api', 'type': 'http'}
+
+
+def test_create_window_params(compile_one):
+    assert compile_one("创建比特窗口", "http://127.0.0.1:54345", "是", "否").args == {
+        'url': 'http://127.0.0.1:54345', 'abort_image': True, 'abort_media': False,
+        'proxy_use': False, 'proxy_api': None}
+    with pytest.raises(ScriptError, match="代理接口地址"):
+        compile_one("创建比特窗口", "http://127.0.0.1:54345", "否", "否", "是")
+
+
+@pytest.mark.parametrize('command, params, message', [
+    ("时间等待", ["abc"], "等待时间"),
+    ("时间等待", ["-1"], "不能为负数"),
+    ("时间等待", ["0", "是"], "随机等待时必须大于0"),
+    ("循环起点", ["0"], "必须大于0"),
+    ("修改窗口代理", ["fixed", "http", "1.2.3.4"], "ip:port"),
+    ("修改窗口代理", ["fixed", "http", "1.2.3.4:port"], "代理端口"),
+    ("Google搜索", ["example.com", "kw", "3", "1"], "结束页"),
+    ("窗口固定指纹", ["{"], "指纹JSON"),
+    ("输入文本", ["#q"], "需要 2 个参数"),
+])
+def test_invalid_params_are_reported_at_load_time(script, command, params, message):
+    errors = validate_script(script((command, *params)))
+    assert errors[0].index == 0
+    assert message in str(errors[0])
+
+
+def test_validate_script_collects_every_error_in_line_order(script):
+    scripts = script(("访问URL", "https://example.com"), ("时间等待", "x"), ("不存在的指令",),
+                     ("循环终点",), ("滚动页面", "1.5"))
+    scripts.insert(1, {'params': []})
+    errors = validate_script(scripts)
+    assert [error.index for error in errors] == [1, 2, 3, 4, 5]
+    assert "缺少 command" in str(errors[0])
+    assert "未知指令" in str(errors[2])
+    assert "没有匹配的循环起点" in str(errors[3])
+    with pytest.raises(ScriptError) as info:
+        compile_script(scripts)
+    assert info.value.index == 1
+
+
+def test_valid_script_has_no_errors(script):
+    assert validate_script(script(("循环起点", "2"), ("回到顶部",), ("循环终点",))) == []
+    assert validate_script([]) == []
+    assert len(validate_script({'command': "回到顶部"})) == 1
+
+
+def test_unmatched_loop_markers(script):
+    errors = validate_script(script(("循环起点",), ("循环起点", "2"), ("循环终点",)))
+    assert [(error.index, error.command) for error in errors] == [(0, "循环起点")]
+    assert "没有匹配的循环终点" in str(errors[0])
+
+    errors = validate_script(script(("循环终点",), ("回到顶部",)))
+    assert [(error.index, error.command) for error in errors] == [(0, "循环终点")]
+
+
+def test_nested_loops_resolve_to_matching_markers(script):
+    program = compile_script(script(("循环起点", "2"), ("循环起点", "3"), ("回到顶部",), ("循环终点",),
+                                    ("循环起点",), ("循环终点",), ("循环终点",)))
+    outer_start, inner_start, _, inner_end, bare_start, bare_end, outer_end = program
+    assert (outer_start.target, outer_end.target) == (6, 0)
+    assert (inner_start.target, inner_end.target) == (3, 1)
+    assert (bare_start.target, bare_end.target) == (5, 4)
+    # 循环终点共享起点的循环次数，未指定时为 None，运行时使用最大循环次数
+    assert (outer_end.args, inner_end.args, bare_end.args) == (2, 3, None)
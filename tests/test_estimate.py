@@ -0,0 +1,33 @@
+import pytest
+from engine.compiler import compile_script
+from engine.estimate import batch_time, estimate, format_duration
+from engine.pacing import Pacing
+from engine import session
+
+
+def test_nested_loops_multiply_wait_time(script):
+    program = compile_script(script(("循环起点", "2"), ("循环起点",), ("时间等待", "5"), ("循环终点",),
+                                    ("循环终点",)))
+    result = estimate(program, Pacing(), max_loops=3)
+    assert result['total'] == 2 * 3 * 5
+    assert result['commands']["时间等待"] == 30
+
+
+def test_batch_time_by_concurrency():
+    assert batch_time(10, sessions=4, max_workers=2) == 20
+    assert batch_time(10, sessions=4, max_workers=8) == 10
+
+
+def test_editor_uses_runner_default_concurrency(tmp_path, monkeypatch, script):
+    pytest.importorskip('tkinter')
+    monkeypatch.setattr(session, 'DEFAULT_MAX_WORKERS', 4)
+    from actor import ScriptManager
+    config_file = tmp_path / "config.ini"
+    config_file.write_text("[Settings]\nsessions = 4\n", encoding='utf-8')
+    manager = ScriptManager()
+    manager.scripts = script(("时间等待", "10"))
+
+    errors, lines = manager.check_script(str(config_file))
+    assert errors == []
+    # 未配置 max_workers 时与运行器一样按 CPU 核数并发，4 个会话一批完成
+    assert lines[0].startswith(f"预计最长运行时间: {format_duration(10)}（")
@@ -0,0 +1,98 @@
+import configparser
+from types import SimpleNamespace
+import pytest
+from engine.compiler import compile_script
+from engine.pacing import BROWSER, CONTROL, LOCAL, READY_DOCUMENT, READY_ELEMENT, READY_NONE, Pacing
+
+
+class FakeTimer:
+    def __init__(self):
+        self.waits = []
+
+    def wait(self, seconds, cancelled):
+        self.waits.append(seconds)
+        return True
+
+
+class FakeWeb:
+    def __init__(self):
+        self.calls = []
+
+    def wait_for_element(self, selector, timeout=10):
+        self.calls.append(('element', selector, timeout))
+        return True
+
+    def wait_ready(self, timeout=10):
+        self.calls.append(('ready', timeout))
+        return True
+
+
+@pytest.fixture
+def ctx():
+    return SimpleNamespace(timer=FakeTimer(), web_browser=FakeWeb())
+
+
+@pytest.fixture
+def instr(script):
+    """编译单条指令"""
+    return lambda command, *params: compile_script(script((command, *params)))[0]
+
+
+def pace(pacing, ctx, instr):
+    pacing.before(ctx, instr)
+    pacing.after(ctx, instr, lambda: False)
+
+
+def test_default_delays_by_command_class(ctx, instr):
+    pacing = Pacing()
+    pace(pacing, ctx, instr("时间等待", "0"))  # CONTROL
+    pace(pacing, ctx, instr("一键排列窗口"))  # LOCAL
+    pace(pacing, ctx, instr("回到顶部"))  # BROWSER
+    assert ctx.timer.waits == [0.3]
+    assert ctx.web_browser.calls == []
+
+
+def test_configured_delays_by_command_class(ctx, instr):
+    pacing = Pacing({CONTROL: 0.5, LOCAL: 1, BROWSER: 2})
+    for command in ("时间等待", "一键排列窗口", "回到顶部", "获取窗口详情"):
+        pace(pacing, ctx, instr(command, "1"))
+    assert ctx.timer.waits == [0.5, 1, 2, 1]
+
+
+def test_document_ready_replaces_browser_delay(ctx, instr):
+    pacing = Pacing({LOCAL: 1, BROWSER: 2}, ready=READY_DOCUMENT, ready_timeout=5)
+    pace(pacing, ctx, instr("访问URL", "https://example.com"))
+    pace(pacing, ctx, instr("鼠标点击", "#a"))
+    pace(pacing, ctx, instr("一键排列窗口"))
+    assert ctx.web_browser.calls == [('ready', 5), ('ready', 5)]
+    assert ctx.timer.waits == [1]  # 本地接口仍按固定延迟
+
+
+def test_element_ready_waits_for_target_first(ctx, instr):
+    pacing = Pacing(ready=READY_ELEMENT, ready_timeout=3)
+    pace(pacing, ctx, instr("鼠标点击", "#a"))
+    pace(pacing, ctx, instr("输入文本", "#q", "hello"))
+    pace(pacing, ctx, instr("鼠标点击", "#a, #b"))  # 多个候选元素时不等待
+    pace(pacing, ctx, instr("回到顶部"))
+    assert ctx.web_browser.calls == [('element', '#a', 3), ('ready', 3),
+                                     ('element', '#q', 3), ('ready', 3),
+                                     ('ready', 3), ('ready', 3)]
+    assert ctx.timer.waits == []
+
+
+def test_ready_modes_without_browser_do_nothing(instr):
+    ctx = SimpleNamespace(timer=FakeTimer(), web_browser=None)
+    pace(Pacing(ready=READY_ELEMENT), ctx, instr("鼠标点击", "#a"))
+    assert ctx.timer.waits == []
+
+
+def test_from_config():
+    config = configparser.ConfigParser()
+    config.read_string("[Pacing]\nlocal_delay = 0.5\nbrowser_delay = 1\nready = element\nready_timeout = 4\n")
+    pacing = Pacing.from_config(config)
+    assert pacing.delays == {CONTROL: 0, LOCAL: 0.5, BROWSER: 1}
+    assert (pacing.ready, pacing.ready_timeout) == (READY_ELEMENT, 4)
+
+    config.read_string("[Pacing]\nready = always\n")
+    assert Pacing.from_config(config).ready == READY_NONE  # 未知的就绪模式按 none 处理
+    assert Pacing.from_config(configparser.ConfigParser()).delays == Pacing().delays
@@ -0,0 +1,161 @@
+import sys
+import threading
+import types
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+import pytest
+from engine import profiler as profiler_module
+from engine.profiler import BIT_API, PYTHON, SLEEP, WEBDRIVER, Profiler
+
+
+class Clock:
+    """代替 time 模块：perf_counter 返回虚拟时间，sleep 只推进虚拟时间"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.lock = threading.Lock()
+
+    def perf_counter(self):
+        return self.now
+
+    def advance(self, seconds):
+        with self.lock:
+            self.now += seconds
+
+    sleep = advance
+
+
+class FakeBit:
+    def __init__(self, clock):
+        self.clock = clock
+
+    def _post(self, path, json_data=None):
+        self.clock.advance(0.125)
+        return path
+
+    def _pipeline(self, func, items):
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            return list(executor.map(func, items))
+
+    def close_many(self, browser_ids):
+        return self._pipeline(lambda browser_id: self._post("/browser/close"), browser_ids)
+
+
+class FakeDriver:
+    def __init__(self, clock):
+        self.clock = clock
+
+    def execute(self, command, params=None):
+        self.clock.advance(0.0625)
+
+
+class FakeDriverCache:
+    def __init__(self, clock):
+        self.clock = clock
+
+    def attach(self, browser_id, path, address):
+        self.clock.advance(1.5)  # 启动 chromedriver 并建立会话
+        return FakeDriver(self.clock)
+
+
+class FakeTimer:
+    def __init__(self, clock):
+        self.clock = clock
+
+    def wait(self, seconds, cancelled):
+        self.clock.advance(seconds)
+        return True
+
+    def wait_until(self, deadline, cancelled):
+        return True
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(profiler_module, 'time', clock)
+    return clock
+
+
+@pytest.fixture
+def web_module(clock, monkeypatch):
+    """代替 browser.web，不需要 selenium"""
+    module = types.ModuleType('browser.web')
+    module.driver_cache = FakeDriverCache(clock)
+    module.time = clock
+    monkeypatch.setitem(sys.modules, 'browser.web', module)
+    return module
+
+
+def run_script(profiler, clock, web_module):
+    session = SimpleNamespace(bit_window=None, web_browser=None, timer=FakeTimer(clock))
+
+    def create(instr):
+        session.bit_window = FakeBit(clock)
+        clock.advance(0.03125)
+
+    def open_window(instr):
+        session.bit_window._post("/browser/update")
+        session.bit_window._post("/browser/open")
+        session.web_browser = SimpleNamespace(driver=web_module.driver_cache.attach('w1', 'chromedriver', 'addr'))
+        clock.advance(0.03125)
+
+    def click(instr):
+        session.web_browser.driver.execute('findElement')
+        session.web_browser.driver.execute('clickElement')
+        web_module.time.sleep(0.25)  # browser.web 内部的随机延迟
+
+    def close(instr):
+        session.bit_window.close_many(['w1', 'w2', 'w3', 'w4'])
+
+    def wait(instr):
+        session.timer.wait(2, None)
+
+    for command, func in [("创建比特窗口", create), ("打开比特窗口", open_window), ("鼠标点击", click),
+                          ("鼠标点击", click), ("关闭比特窗口", close), ("时间等待", wait)]:
+        profiler.run(session, SimpleNamespace(command=command), func)
+    return session
+
+
+def test_time_is_split_by_category(clock, web_module):
+    profiler = Profiler()
+    run_script(profiler, clock, web_module)
+    summary = profiler.summary()
+
+    assert summary["创建比特窗口"] == {WEBDRIVER: 0.0, BIT_API: 0.0, SLEEP: 0.0, PYTHON: 0.03125}
+    # 连接浏览器发生在打开比特窗口指令内部，必须计入 webdriver 而不是 python
+    assert summary["打开比特窗口"] == {WEBDRIVER: 1.5, BIT_API: 0.25, SLEEP: 0.0, PYTHON: 0.03125}
+    assert summary["鼠标点击"] == {WEBDRIVER: 0.25, BIT_API: 0.0, SLEEP: 0.5, PYTHON: 0.0}
+    # 批量接口的请求在工作线程中发出，整个批量调用计入 bit_api
+    assert summary["关闭比特窗口"][BIT_API] == pytest.approx(0.5)
+    assert summary["关闭比特窗口"][PYTHON] == 0.0
+    assert summary["时间等待"] == {WEBDRIVER: 0.0, BIT_API: 0.0, SLEEP: 2.0, PYTHON: 0.0}
+    assert profiler.counts == {"创建比特窗口": 1, "打开比特窗口": 1, "鼠标点击": 2, "关闭比特窗口": 1, "时间等待": 1}
+
+
+def test_write_collapsed(clock, web_module, tmp_path):
+    profiler = Profiler()
+    run_script(profiler, clock, web_module)
+    path = tmp_path / 'profile.folded'
+    profiler.write_collapsed(str(path))
+    lines = path.read_text(encoding='utf-8').splitlines()
+    assert sorted(lines) == sorted([
+        "脚本;创建比特窗口;python 31250",
+        "脚本;打开比特窗口;webdriver 1500000",
+        "脚本;打开比特窗口;bit_api 250000",
+        "脚本;打开比特窗口;python 31250",
+        "脚本;鼠标点击;webdriver 250000",
+        "脚本;鼠标点击;sleep 500000",
+        "脚本;关闭比特窗口;bit_api 500000",
+        "脚本;时间等待;sleep 2000000",
+    ])
+
+
+def test_uninstall_restores_hooks(clock, web_module):
+    profiler = Profiler()
+    session = run_script(profiler, clock, web_module)
+    profiler.uninstall()
+    assert 'attach' not in vars(web_module.driver_cache)
+    assert '_post' not in vars(session.bit_window)
+    assert 'execute' not in vars(session.web_browser.driver)
+    assert web_module.time is clock
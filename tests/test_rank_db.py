@@ -0,0 +1,79 @@
+import sqlite3
+import pytest
+from rank_db import RankDatabase, RankWriter
+
+
+def open_db(tmp_path):
+    db = RankDatabase(str(tmp_path / "local.db"))
+    db.add_site("example.com")
+    db.add_keyword("example.com", "kw")
+    return db
+
+
+def test_writer_records_history_and_latest_rank(tmp_path):
+    db = open_db(tmp_path)
+    site_id = db.site_id("example.com")
+    writer = RankWriter(db)
+    writer.submit(site_id, ("kw", 5, 1, "https://example.com/a", "2026-01-02 00:00:00"))
+    writer.submit(site_id, ("kw", 3, 1, "https://example.com/b", "2026-01-03 00:00:00"))
+    writer.submit(site_id, ("kw", 9, 1, "https://example.com/c", "2026-01-01 00:00:00"))  # 补录的旧记录
+    assert writer.flush() is None
+    writer.close()
+
+    assert db.keywords("example.com") == [("kw", 3, "2026-01-03 00:00:00")]
+    assert [row[2] for row in db.history("example.com")] == [9, 5, 3]
+
+
+def test_writer_reports_failed_writes_once(tmp_path):
+    db = open_db(tmp_path)
+    site_id = db.site_id("example.com")
+    writer = RankWriter(db)
+    with db.conn:
+        db.conn.execute("DROP TABLE rank_history")
+    writer.submit(site_id, ("kw", 1, 1, None, "2026-01-01 00:00:00"))
+    assert isinstance(writer.flush(), sqlite3.Error)
+    assert writer.flush() is None
+    writer.close()
+
+
+def test_existing_database_is_migrated(tmp_path):
+    path = str(tmp_path / "local.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE sites (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT UNIQUE)")
+    conn.execute("CREATE TABLE keywords (id INTEGER PRIMARY KEY AUTOINCREMENT, site_id INTEGER, keyword TEXT, "
+                 "UNIQUE(site_id, keyword))")
+    conn.execute("INSERT INTO sites (name) VALUES ('example.com')")
+    conn.execute("INSERT INTO keywords (site_id, keyword) VALUES (1, 'kw')")
+    conn.commit()
+    conn.close()
+
+    db = RankDatabase(path)
+    assert db.conn.execute("PRAGMA user_version").fetchone()[0] == 1
+    assert db.keywords("example.com") == [("kw", 0, None)]
+
+
+def test_delete_site_removes_keywords_and_history(tmp_path):
+    db = open_db(tmp_path)
+    db.add_keyword("example.com", "kw2")
+    db.add_site("other.com")
+    db.add_keyword("other.com", "kw")
+    writer = RankWriter(db)
+    for site in ("example.com", "other.com"):
+        site_id = db.site_id(site)
+        writer.submit(site_id, ("kw", 5, 1, None, "2026-01-01 00:00:00"))
+        writer.submit(site_id, ("kw", 3, 1, None, "2026-01-02 00:00:00"))
+    writer.submit(db.site_id("example.com"), ("kw2", 7, 1, None, "2026-01-02 00:00:00"))
+    assert writer.flush() is None
+    writer.close()
+    site_id = db.site_id("example.com")
+
+    db.delete_site("example.com")
+
+    assert "example.com" not in db.site_ids
+    assert db.sites() == ["other.com"]
+    with pytest.raises(KeyError):
+        db.site_id("example.com")
+    assert db.conn.execute("SELECT COUNT(*) FROM keywords WHERE site_id = ?", (site_id,)).fetchone()[0] == 0
+    # 排名历史随关键词级联删除，其他站点的记录保留
+    assert db.conn.execute("SELECT COUNT(*) FROM rank_history").fetchone()[0] == 2
+    assert [row[2] for row in db.history("other.com")] == [5, 3]
@@ -0,0 +1,129 @@
+import queue
+import threading
+from types import SimpleNamespace
+import pytest
+
+pytest.importorskip('tkinter')
+import rank
+from rank import SiteKeywordManager
+
+
+class FakeRoot:
+    """只提供 after：查询线程不能调用 Tk，调用其他方法会出错"""
+
+    def __init__(self):
+        self.scheduled = []
+
+    def after(self, ms, func):
+        self.scheduled.append((ms, func))
+
+
+class EventQueue(queue.Queue):
+    """查询线程提交 'done' 时通知测试"""
+
+    def __init__(self):
+        super().__init__()
+        self.done = threading.Event()
+
+    def put(self, item):
+        super().put(item)
+        if item[0] == 'done':
+            self.done.set()
+
+
+class FakeWriter:
+    def __init__(self, error=None):
+        self.rows = []
+        self.error = error
+
+    def submit(self, site_id, row):
+        self.rows.append((site_id, row))
+
+    def flush(self):
+        return self.error
+
+
+@pytest.fixture
+def dialogs(monkeypatch):
+    shown = []
+    monkeypatch.setattr(rank.messagebox, 'showinfo', lambda title, message: shown.append(('info', message)))
+    monkeypatch.setattr(rank.messagebox, 'showerror', lambda title, message: shown.append(('error', message)))
+    return shown
+
+
+def fake_manager(writer=None):
+    """只带有刷新排名相关属性的 SiteKeywordManager 替身，不创建窗口"""
+    manager = SimpleNamespace(root=FakeRoot(), rank_events=EventQueue(), stop_refreshing=False,
+                              writer=writer or FakeWriter(), db=SimpleNamespace(site_id=lambda site: 7),
+                              progress_bar={}, progress_label={}, updated=[])
+    manager.refresh_button = SimpleNamespace(state=None)
+    manager.refresh_button.config = lambda state: setattr(manager.refresh_button, 'state', state)
+    manager._update_keyword_rank = lambda *args: manager.updated.append(args)
+    manager._handle_rank_event = lambda item: SiteKeywordManager._handle_rank_event(manager, item)
+    manager._process_rank_events = lambda: SiteKeywordManager._process_rank_events(manager)
+    return manager
+
+
+def refresh(manager, monkeypatch, results):
+    """运行查询线程直到结束，results 为 关键词 -> search_google 的返回值或异常"""
+    def search(keyword, site, max_pages):
+        result = results[keyword]
+        if isinstance(result, Exception):
+            raise result
+        return result
+    monkeypatch.setattr(rank, 'search_google', search)
+    keywords = [(keyword, 0, None) for keyword in results]
+    SiteKeywordManager._refresh_ranks_thread(manager, 'example.com', keywords, 5)
+    assert manager.refresh_button.state == rank.tk.DISABLED
+    assert manager.rank_events.done.wait(5)
+    SiteKeywordManager._process_rank_events(manager)
+
+
+def test_worker_results_are_applied_by_polling(monkeypatch, dialogs):
+    manager = fake_manager()
+    refresh(manager, monkeypatch, {'widgets': [0, 2, 3, 'https://example.com/'], 'gadgets': None})
+    assert [args[:3] for args in manager.updated] == [('example.com', 'widgets', 3), ('example.com', 'gadgets', 0)]
+    assert manager.progress_label['text'] == "2/2"
+    assert [row[:4] for _, row in manager.writer.rows] == [('widgets', 3, 1, 'https://example.com/'),
+                                                           ('gadgets', 0, None, None)]
+    assert manager.refresh_button.state == rank.tk.NORMAL
+    assert dialogs == [('info', "关键词排名已刷新")]
+    assert [ms for ms, _ in manager.root.scheduled] == [rank.RANK_POLL_MS]
+
+
+def test_search_error_is_reported(monkeypatch, dialogs):
+    manager = fake_manager()
+    refresh(manager, monkeypatch, {'widgets': ConnectionError("offline"), 'gadgets': None})
+    assert manager.updated == []
+    assert manager.refresh_button.state == rank.tk.NORMAL
+    assert dialogs[0][0] == 'error' and "网络连接" in dialogs[0][1]
+
+
+def test_write_error_is_reported(monkeypatch, dialogs):
+    manager = fake_manager(FakeWriter(error=OSError("disk full")))
+    refresh(manager, monkeypatch, {'widgets': None})
+    assert manager.refresh_button.state == rank.tk.NORMAL
+    assert dialogs == [('error', "保存排名失败: disk full")]
+
+
+def test_stopped_refresh_is_not_reported(dialogs):
+    manager = fake_manager()
+    manager.stop_refreshing = True
+    manager.rank_events.put(('done', 'example.com', False, None))
+    SiteKeywordManager._process_rank_events(manager)
+    assert manager.refresh_button.state == rank.tk.NORMAL
+    assert dialogs == []
+
+
+def test_polling_survives_failing_update(dialogs):
+    manager = fake_manager()
+
+    def fail(*args):
+        raise KeyError('widgets')
+    manager._update_keyword_rank = fail
+    manager.rank_events.put(('rank', 'example.com', 'widgets', 3, '2026-01-01 00:00:00'))
+    manager.rank_events.put(('done', 'example.com', False, None))
+    SiteKeywordManager._process_rank_events(manager)
+    assert dialogs == [('error', "更新排名出错: 'widgets'"), ('info', "关键词排名已刷新")]
+    assert manager.refresh_button.state == rank.tk.NORMAL
+    assert [ms for ms, _ in manager.root.scheduled] == [rank.RANK_POLL_MS]
@@ -0,0 +1,92 @@
+import json
+import signal
+import pytest
+import run_cli
+
+
+@pytest.fixture
+def cli(tmp_path, monkeypatch):
+    """在临时目录中运行命令行入口，跳过 license 验证，结束后恢复信号处理"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(run_cli, 'check_license', lambda: None)
+    handlers = {signum: signal.getsignal(signum) for signum in (signal.SIGINT, signal.SIGTERM)}
+    yield tmp_path
+    for signum, handler in handlers.items():
+        signal.signal(signum, handler)
+
+
+@pytest.fixture
+def write_script(cli, script):
+    """在临时目录中写入脚本文件，返回路径"""
+    def write(name, *commands):
+        path = cli / name
+        path.write_text(json.dumps(script(*commands), ensure_ascii=False), encoding='utf-8')
+        return str(path)
+    return write
+
+
+def test_check_prints_estimate_without_running(cli, write_script, capsys):
+    path = write_script('wait.json', ("循环起点", "2"), ("时间等待", "5"), ("循环终点",))
+    assert run_cli.main([path, '--check', '--loops', '4', '--sessions', '2', '--workers', '1']) == 0
+    out = capsys.readouterr().out
+    assert path in out
+    assert not (cli / 'logs').exists()
+
+
+@pytest.mark.parametrize('option', ['--loops', '--sessions', '--workers'])
+@pytest.mark.parametrize('value', ['0', '-1'])
+def test_counts_must_be_positive(cli, write_script, option, value):
+    path = write_script('wait.json', ("时间等待", "0"))
+    with pytest.raises(SystemExit, match="必须大于0"):
+        run_cli.main([path, '--check', option, value])
+
+
+def test_counts_from_config_are_checked(cli, write_script):
+    (cli / 'config.ini').write_text("[Settings]\nmax_loops = 0\n", encoding='utf-8')
+    path = write_script('wait.json', ("时间等待", "0"))
+    with pytest.raises(SystemExit, match="循环次数"):
+        run_cli.main([path, '--check'])
+
+
+def test_invalid_script_exits_with_2_before_running(cli, write_script, capsys):
+    good = write_script('good.json', ("时间等待", "0"))
+    bad = write_script('bad.json', ("时间等待", "x"), ("不存在的指令",))
+    assert run_cli.main([good, bad, str(cli / 'missing.json')]) == 2
+    err = capsys.readouterr().err
+    assert "等待时间" in err and "未知指令" in err
+    assert "加载脚本失败" in err
+    assert not (cli / 'logs').exists()
+
+
+def test_license_failure_exits_with_2(cli, write_script, monkeypatch, capsys):
+    def fail():
+        raise ValueError("未找到 license 文件")
+    monkeypatch.setattr(run_cli, 'check_license', fail)
+    assert run_cli.main([write_script('wait.json', ("时间等待", "0")), '--check']) == 2
+    assert "License 验证失败" in capsys.readouterr().err
+
+
+def test_successful_run_exits_with_0_and_writes_trace(cli, write_script, capsys):
+    path = write_script('wait.json', ("循环起点", "2"), ("时间等待", "0"), ("循环终点",))
+    trace = cli / 'trace.jsonl'
+    assert run_cli.main([path, '--sessions', '2', '--trace', str(trace), '--summary']) == 0
+    events = [json.loads(line) for line in trace.read_text(encoding='utf-8').splitlines()]
+    assert {event['session'] for event in events} == {1, 2}
+    assert all(event['outcome'] == 'ok' for event in events)
+    assert "运行记录已保存到" in capsys.readouterr().out
+
+
+def test_failed_session_exits_with_1(cli, write_script, capsys):
+    # 未打开窗口时随机指纹失败，后面的脚本不再运行
+    failing = write_script('fail.json', ("窗口随机指纹",))
+    after = write_script('after.json', ("时间等待", "0"))
+    assert run_cli.main([failing, after, '--trace', str(cli / 'trace.jsonl')]) == 1
+    captured = capsys.readouterr()
+    assert "会话1" in captured.err
+    assert f"运行脚本: {after}" not in captured.out
+
+
+def test_trace_in_missing_directory_exits_with_2(cli, write_script, capsys):
+    path = write_script('wait.json', ("时间等待", "0"))
+    assert run_cli.main([path, '--trace', str(cli / 'missing' / 'trace.jsonl')]) == 2
+    assert "创建运行记录失败" in capsys.readouterr().err
@@ -0,0 +1,87 @@
+import queue
+from collections import deque
+from types import SimpleNamespace
+import pytest
+
+pytest.importorskip('tkinter')
+import run
+from run import ScriptRunner
+
+
+class FakeRoot:
+    def __init__(self):
+        self.scheduled = []
+
+    def after(self, ms, func):
+        self.scheduled.append((ms, func))
+
+
+def fake_runner():
+    """只带有界面队列相关属性的 ScriptRunner 替身，不创建窗口"""
+    runner = SimpleNamespace(ui_queue=queue.Queue(), root=FakeRoot(), messages=[])
+    runner.show_message = lambda message, clear=False, level="info": runner.messages.append((level, message))
+    runner.ui = lambda func, *args: ScriptRunner.ui(runner, func, *args)
+    runner._process_ui_queue = lambda: ScriptRunner._process_ui_queue(runner)
+    return runner
+
+
+def test_ui_queue_survives_failing_callable():
+    runner = fake_runner()
+    done = []
+
+    def fail():
+        raise RuntimeError("boom")
+
+    runner.ui(fail)
+    runner.ui(done.append, 'stop_running')
+    ScriptRunner._process_ui_queue(runner)
+
+    assert done == ['stop_running']
+    assert runner.messages == [("error", "界面更新出错: boom")]
+    assert [ms for ms, _ in runner.root.scheduled] == [run.UI_POLL_MS]  # 出错后仍继续轮询
+
+
+class FakeText:
+    """只实现日志写入用到的 Text 方法"""
+
+    def __init__(self):
+        self.text = ""
+
+    def delete(self, start, end):
+        if start in (1.0, "1.0") and end == run.tk.END:
+            self.text = ""
+        else:
+            lines = self.text.split("\n")
+            self.text = "\n".join(lines[int(float(end)) - 1:])
+
+    def insert(self, index, text):
+        self.text += text
+
+    def index(self, index):
+        return f"{self.text.count(chr(10)) + 1}.0"
+
+    def see(self, index):
+        pass
+
+    def get(self, start, end):
+        return self.text
+
+
+def log_runner():
+    runner = SimpleNamespace(log_buffer=deque(maxlen=100), file_log=None, log_max_lines=100,
+                             text_browser=FakeText())
+    runner.show_message = lambda *args, **kwargs: ScriptRunner.show_message(runner, *args, **kwargs)
+    return runner
+
+
+def test_clear_keeps_the_message_that_requested_it():
+    runner = log_runner()
+    runner.show_message("执行命令: 获取窗口详情")
+    runner.show_message("窗口详情:", clear=True)
+    runner.show_message("{'success': True}")
+    ScriptRunner._write_log(runner)
+
+    lines = runner.text_browser.text.splitlines()
+    assert len(lines) == 2
+    assert lines[0].endswith("窗口详情:")
+    assert lines[1].endswith("{'success': True}")
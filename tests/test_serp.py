@@ -0,0 +1,85 @@
+import os
+import pytest
+import serp
+
+FIXTURE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                       'fixtures', 'serp', 'google_basic.html')
+EXPECTED = [
+    'https://www.notexample.com/widgets',
+    'https://shop.example.com:8443/widgets?color=blue',
+    'https://www.example.com/',
+    None,  # 只有站内链接的结果块
+    'http://widgets.test/catalog',
+    'https://docs.widgets.test/guide',
+    'https://example.org/widgets',
+    'https://WWW.Example.COM./blog/widgets',
+    'https://forum.widgets.test/t/1',
+    'https://widgets.test/about',
+]
+
+
+@pytest.fixture(scope='module')
+def html():
+    with open(FIXTURE, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+@pytest.mark.parametrize('backend', serp.available_backends())
+def test_backends_extract_the_same_results(html, backend):
+    assert serp.parse_results(html, backend) == EXPECTED
+
+
+def test_stdlib_backend_is_always_available():
+    assert 'html' in serp.available_backends()
+    assert serp.get_backend() in serp.BACKENDS.values()
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        serp.get_backend('regex')
+
+
+def test_page_without_results_area():
+    with pytest.raises(ValueError):
+        serp.parse_results("<html><body><div id='footer'></div></body></html>", 'html')
+
+
+@pytest.mark.parametrize('backend', serp.available_backends())
+def test_find_site_matches_by_domain(html, backend):
+    # notexample.com 排在第 1 位，但不是 example.com 的子域名
+    assert serp.find_site(html, 'example.com', backend) == (2, 'https://shop.example.com:8443/widgets?color=blue')
+    assert serp.find_site(html, 'www.example.com', backend) == (2, 'https://shop.example.com:8443/widgets?color=blue')
+    assert serp.find_site(html, 'https://example.org/', backend) == (7, 'https://example.org/widgets')
+    assert serp.find_site(html, 'widgets.test', backend) == (5, 'http://widgets.test/catalog')
+    assert serp.find_site(html, 'missing.test', backend) is None
+
+
+@pytest.mark.parametrize('href, expected', [
+    ('/url?q=https://example.com/a%3Fb%3D1&sa=U', 'https://example.com/a?b=1'),
+    ('/url?url=https://example.com/&sa=U', 'https://example.com/'),
+    ('/url?sa=U', None),
+    ('https://example.com/', 'https://example.com/'),
+    ('http://example.com/', 'http://example.com/'),
+    ('/search?q=example', None),
+    ('#', None),
+    ('', None),
+    (None, None),
+])
+def test_result_url(href, expected):
+    assert serp.result_url(href) == expected
+
+
+@pytest.mark.parametrize('url, site, expected', [
+    ('https://example.com/page', 'example.com', True),
+    ('https://www.example.com/page', 'example.com', True),
+    ('https://example.com/page', 'www.example.com', True),
+    ('https://blog.example.com/page', 'example.com', True),
+    ('https://example.com:8443/page', 'example.com', True),
+    ('https://EXAMPLE.com./page', 'https://www.Example.com/', True),
+    ('https://notexample.com/page', 'example.com', False),
+    ('https://example.com.evil.test/page', 'example.com', False),
+    ('https://example.org/page', 'example.com', False),
+    ('https://example.com/page', '', False),
+])
+def test_domain_matches(url, site, expected):
+    assert serp.domain_matches(url, site) is expected
@@ -0,0 +1,132 @@
+import threading
+import time
+import pytest
+from engine.compiler import compile_script
+from engine.session import Session, SessionPool
+from engine.timer import Timer
+
+
+def test_pool_runs_sessions_against_bit_stub(bit_stub, script):
+    pytest.importorskip('requests')
+    bit_stub.delay = 0.05
+    program = compile_script(script(("创建比特窗口", bit_stub.url), ("一键排列窗口",), ("清理窗口缓存",)))
+    pool = SessionPool(lambda session_id: Session(program, session_id), count=4, max_workers=2)
+
+    assert pool.run() == [True] * 4
+    assert pool.errors() == []
+    assert bit_stub.count('/windowbounds/flexable') == 4
+    assert bit_stub.count('/cache/clear') == 4
+    assert bit_stub.max_active['/windowbounds/flexable'] <= 2
+    for session in pool.sessions:
+        assert any("窗口已重新排列" in line for line in session.logs)
+        assert session.bit_window.url == bit_stub.url
+    assert len({id(session.bit_window) for session in pool.sessions}) == 4
+
+
+def test_pool_collects_session_errors(bit_stub, script):
+    pytest.importorskip('requests')
+    # 未打开窗口时随机指纹失败
+    program = compile_script(script(("创建比特窗口", bit_stub.url), ("窗口随机指纹",), ("一键排列窗口",)))
+    pool = SessionPool(lambda session_id: Session(program, session_id), count=2, max_workers=2)
+
+    assert pool.run() == [False, False]
+    assert [session_id for session_id, _ in pool.errors()] == [1, 2]
+    assert all("窗口随机指纹" in error for _, error in pool.errors())
+    assert bit_stub.count('/windowbounds/flexable') == 0
+
+
+def test_pool_stop_before_session_starts_is_not_lost(script):
+    program = compile_script(script(("时间等待", "0"),))
+    steps = []
+    pool = SessionPool(lambda session_id: Session(program, session_id, on_step=lambda s, i: steps.append(i)),
+                       count=1, max_workers=1)
+    session = pool.sessions[0]
+    run = session.run
+
+    def stop_then_run(*args, **kwargs):
+        # 停止落在会话池的检查之后、会话开始运行之前
+        pool.stop()
+        return run(*args, **kwargs)
+
+    session.run = stop_then_run
+    assert pool.run() == [False]
+    assert steps == []
+    assert not session.running
+
+
+def run_steps(script, commands, **kwargs):
+    """运行脚本，返回每条指令的执行次数"""
+    steps = []
+    session = Session(compile_script(script(*commands)), on_step=lambda s, i: steps.append(i), **kwargs)
+    assert session.run()
+    return [steps.count(i) for i in range(len(commands))]
+
+
+def test_nested_loops_multiply_counts(script):
+    counts = run_steps(script, [("循环起点", "2"), ("时间等待", "0"), ("循环起点", "3"), ("时间等待", "0"),
+                        ("循环终点",), ("循环终点",), ("时间等待", "0")])
+    assert counts == [1, 2, 2, 6, 6, 2, 1]
+
+
+def test_loop_without_count_uses_max_loops(script):
+    counts = run_steps(script, [("循环起点",), ("时间等待", "0"), ("循环终点",)], max_loops=4)
+    assert counts == [1, 4, 4]
+
+
+def test_session_can_run_again_after_finishing(script):
+    steps = []
+    session = Session(compile_script(script(("循环起点", "2"), ("时间等待", "0"), ("循环终点",))),
+                      on_step=lambda s, i: steps.append(i))
+    assert session.run()
+    assert session.run()
+    assert steps.count(1) == 4
+
+
+def start(session):
+    thread = threading.Thread(target=session.run, daemon=True)
+    thread.start()
+    return thread
+
+
+def test_stop_interrupts_time_wait(script):
+    session = Session(compile_script(script(("时间等待", "10"), ("时间等待", "0"))))
+    began = time.monotonic()
+    thread = start(session)
+    time.sleep(0.1)
+    session.stop()
+    thread.join(2)
+    assert not thread.is_alive()
+    assert time.monotonic() - began < 1
+
+
+def test_remaining_wait_survives_pause(script):
+    steps = []
+    session = Session(compile_script(script(("时间等待", "1"), ("时间等待", "0"))),
+                      on_step=lambda s, i: steps.append(i))
+    began = time.monotonic()
+    thread = start(session)
+    time.sleep(0.3)
+    session.pause()
+    time.sleep(0.5)
+    assert steps == [0]  # 暂停期间不执行下一条指令
+    session.resume()
+    thread.join(3)
+    elapsed = time.monotonic() - began
+    assert steps == [0, 1]
+    # 暂停前已等待约 0.3 秒，恢复后只等待剩余的约 0.7 秒，共约 1.5 秒；
+    # 不计暂停时为 1 秒，重新等待全部时间为 1.8 秒
+    assert 1.4 <= elapsed < 1.75
+
+
+def test_timer_wait_is_interrupted_by_wake():
+    timer = Timer()
+    cancelled = threading.Event()
+    result = []
+    thread = threading.Thread(target=lambda: result.append(timer.wait(10, cancelled.is_set)))
+    thread.start()
+    time.sleep(0.05)
+    cancelled.set()
+    timer.wake()
+    thread.join(1)
+    assert result == [False]
+    assert Timer().wait(0.01, lambda: False) is True
@@ -0,0 +1,104 @@
+import json
+import os
+import subprocess
+import sys
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 启动耗时预算：启动时不应加载这些较重的依赖，它们在首次使用时才导入
+HEAVY_MODULES = ('requests', 'selenium', 'bs4', 'openpyxl', 'flask', 'lxml', 'selectolax', 'aiohttp')
+# 秒，取多次测量的最小值比较。实测导入并创建主窗口约 0.045 秒（run.py），
+# 多导入一个 requests 或 openpyxl 约增加 0.11 秒，会超出预算
+STARTUP_BUDGET = 0.15
+RUNS = 3
+
+# 在子进程中运行，保证 sys.modules 干净。参数为 JSON：
+# modules 要导入的模块；window 为 '模块:类' 时用其创建主窗口，计时到主窗口创建完成；
+# stub_tk 为真时 tkinter 用空模块代替，无需图形界面（此时计时不含 Tk 自身的绘制）
+PROBE = r'''
+import json
+import sys
+import time
+import types
+
+options = json.loads(sys.argv[1])
+sys.path.insert(0, options['root'])
+
+
+class _Stub:
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __getattr__(self, name):
+        return _Stub()
+
+    def __call__(self, *args, **kwargs):
+        return _Stub()
+
+    def __iter__(self):
+        return iter(())
+
+    def __str__(self):
+        return ''
+
+    def _zero(self, *args):
+        return 0
+
+    __add__ = __radd__ = __sub__ = __rsub__ = __mul__ = __rmul__ = __floordiv__ = __truediv__ = _zero
+    __int__ = __index__ = _zero
+
+
+def _stub_module(name):
+    module = types.ModuleType(name)
+    module.__getattr__ = lambda attr: _Stub
+    sys.modules[name] = module
+    return module
+
+
+if options['stub_tk']:
+    tk = _stub_module('tkinter')
+    tk.__path__ = []
+    for sub in ('ttk', 'messagebox', 'filedialog', 'simpledialog'):
+        setattr(tk, sub, _stub_module('tkinter.' + sub))
+
+start = time.perf_counter()
+for name in options['modules']:
+    __import__(name)
+if options['window']:
+    module, cls = options['window'].split(':')
+    getattr(sys.modules[module], cls)(sys.modules['tkinter'].Tk())
+elapsed = time.perf_counter() - start
+print(json.dumps({'elapsed': elapsed, 'modules': sorted(sys.modules)}))
+'''
+
+
+def probe(tmp_path, modules, window=None, stub_tk=False):
+    """在临时目录中运行探测子进程 RUNS 次，返回耗时最小的一次结果"""
+    options = json.dumps({'root': ROOT, 'modules': modules, 'window': window, 'stub_tk': stub_tk})
+    results = []
+    for _ in range(RUNS):
+        output = subprocess.run([sys.executable, '-c', PROBE, options], cwd=tmp_path,
+                                capture_output=True, text=True, check=True).stdout
+        results.append(json.loads(output))
+    return min(results, key=lambda result: result['elapsed'])
+
+
+def heavy_loaded(modules):
+    return sorted(name for name in modules if name.split('.')[0] in HEAVY_MODULES)
+
+
+def test_cli_and_engine_are_headless(tmp_path):
+    # 不替换 tkinter：命令行运行器用于没有图形界面的服务器，导入 tkinter 即为错误
+    result = probe(tmp_path, ['run_cli', 'engine.compiler', 'engine.commands', 'engine.session',
+                              'engine.estimate', 'engine.profiler', 'engine.trace'])
+    assert 'tkinter' not in result['modules']
+    assert heavy_loaded(result['modules']) == []
+    assert result['elapsed'] < STARTUP_BUDGET
+
+
+@pytest.mark.parametrize('window', ['run:ScriptRunner', 'actor:App', 'rank:SiteKeywordManager', 'proxy:ProxyApp'])
+def test_time_to_first_window(tmp_path, window):
+    result = probe(tmp_path, [window.split(':')[0]], window, stub_tk=True)
+    assert heavy_loaded(result['modules']) == []
+    assert result['elapsed'] < STARTUP_BUDGET
@@ -0,0 +1,56 @@
+import json
+import threading
+import time
+import pytest
+from engine.compiler import compile_script
+from engine.session import Session
+from engine.trace import TraceWriter, summarize
+
+
+@pytest.fixture
+def run_traced(tmp_path, script):
+    """运行脚本并返回 (运行记录, 记录文件路径)，stop_after 秒后停止"""
+    return lambda commands, stop_after=None: _run_traced(tmp_path, script(*commands), stop_after)
+
+
+def _run_traced(tmp_path, scripts, stop_after):
+    path = tmp_path / "trace.jsonl"
+    trace = TraceWriter(str(path))
+    program = compile_script(scripts)
+    session = Session(program, trace=trace)
+    if stop_after is None:
+        session.run()
+    else:
+        thread = threading.Thread(target=session.run)
+        thread.start()
+        time.sleep(stop_after)
+        session.stop()
+        thread.join()
+    trace.close()
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f], str(path)
+
+
+def test_time_wait_event_covers_the_actual_wait(run_traced):
+    events, path = run_traced([("时间等待", "1"), ("循环起点", "1"), ("循环终点",)])
+    assert [event['command'] for event in events] == ["时间等待", "循环起点", "循环终点"]
+    wait = events[0]
+    assert wait['outcome'] == 'ok'
+    assert 0.95 <= wait['duration'] < 1.5
+    assert wait['end'] <= events[1]['start']
+    assert summarize(path)["时间等待"]['p50'] >= 0.95
+
+
+def test_stopped_time_wait_is_recorded(run_traced):
+    events, path = run_traced([("时间等待", "10"), ("循环起点", "1"), ("循环终点",)], stop_after=0.2)
+    assert [event['command'] for event in events] == ["时间等待"]
+    assert events[0]['outcome'] == 'stopped'
+    assert 0.15 <= events[0]['duration'] < 1
+    assert summarize(path)["时间等待"]['errors'] == 0
+
+
+def test_trailing_time_wait_is_recorded(run_traced):
+    events, _ = run_traced([("循环起点", "1"), ("循环终点",), ("时间等待", "5")])
+    assert [event['command'] for event in events] == ["循环起点", "循环终点", "时间等待"]
+    assert events[2]['outcome'] == 'ok'
+    assert events[2]['duration'] < 1  # 脚本以时间等待结束时不再实际等待
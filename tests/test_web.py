@@ -0,0 +1,343 @@
+import threading
+from types import SimpleNamespace
+import pytest
+
+pytest.importorskip('selenium')
+from selenium.common.exceptions import InvalidSelectorException
+from browser import web
+from engine import commands
+
+
+class FakeDriver:
+    def __init__(self, alive=True, error=ConnectionError):
+        self.alive = alive
+        self.error = error
+        self.quit_called = False
+
+    def quit(self):
+        self.quit_called = True
+        if not self.alive:
+            raise self.error("chromedriver 已退出")
+
+
+class FakeService:
+    service_url = 'http://127.0.0.1:0'
+
+    def __init__(self):
+        self.stopped = False
+
+    def stop(self):
+        self.stopped = True
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = web.DriverCache()
+    created = []
+
+    def remote(command_executor, options):
+        driver = FakeDriver()
+        created.append(driver)
+        return driver
+
+    monkeypatch.setattr(web.webdriver, 'Remote', remote)
+    monkeypatch.setattr(cache, '_service', lambda path: cache.services.setdefault(path, FakeService()))
+    cache.created = created
+    return cache
+
+
+def test_attach_shares_one_service_per_driver_path(cache):
+    first = cache.attach('w1', 'chromedriver', '127.0.0.1:9222')
+    second = cache.attach('w2', 'chromedriver', '127.0.0.1:9223')
+    assert first is not second
+    assert list(cache.services) == ['chromedriver']
+    assert cache.drivers == {'w1': [first], 'w2': [second]}
+
+
+def test_concurrent_attaches_are_all_tracked(cache):
+    threads = [threading.Thread(target=cache.attach, args=('w1', 'chromedriver', '127.0.0.1:9222'))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(cache.services) == 1
+    assert sorted(map(id, cache.drivers['w1'])) == sorted(map(id, cache.created))
+    cache.release('w1')
+    assert all(driver.quit_called for driver in cache.created)
+
+
+@pytest.mark.parametrize('error', [ConnectionError, OSError, web.WebDriverException])
+def test_release_quits_drivers_whose_chromedriver_is_gone(cache, error):
+    dead = cache.attach('w1', 'chromedriver', '127.0.0.1:9222')
+    other = cache.attach('w2', 'chromedriver', '127.0.0.1:9223')
+    dead.alive = False
+    dead.error = error
+    cache.release('w1')
+    cache.release('unknown')
+    assert dead.quit_called and not other.quit_called
+    assert cache.drivers == {'w2': [other]}
+
+
+def test_shutdown_quits_drivers_and_stops_services(cache):
+    live = cache.attach('w1', 'chromedriver', '127.0.0.1:9222')
+    dead = cache.attach('w2', 'chromedriver', '127.0.0.1:9223')
+    dead.alive = False
+    service = cache.services['chromedriver']
+    cache.shutdown()
+    assert live.quit_called and dead.quit_called
+    assert service.stopped
+    assert cache.drivers == {} and cache.services == {}
+
+
+class FakeClock:
+    """代替 browser.web 中的 time 模块，sleep 只推进虚拟时间并记录"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class FakeElement:
+    def __init__(self, displayed=True):
+        self.displayed = displayed
+        self.keys = []
+        self.cleared = False
+
+    def is_displayed(self):
+        return self.displayed
+
+    def clear(self):
+        self.cleared = True
+
+    def send_keys(self, text):
+        self.keys.append(text)
+
+
+class PageDriver:
+    """模拟页面的 WebDriver：elements 为 选择器 -> 元素，appear_after 为元素在第几次查找时出现"""
+
+    def __init__(self, clock, elements=None):
+        self.clock = clock
+        self.elements = dict(elements or {})
+        self.appear_after = {}
+        self.observe = None  # 异步脚本的返回值，为异常类时抛出
+        self.script_result = None
+        self.script_error = None
+        self.script_timeouts = []
+        self.async_calls = []
+        self.scripts = []
+        self.lookups = []
+        self.invalid = set()  # 无效的选择器
+
+    def set_script_timeout(self, seconds):
+        self.script_timeouts.append(seconds)
+
+    def execute_async_script(self, script, selector, timeout_ms):
+        self.async_calls.append((selector, timeout_ms))
+        if isinstance(self.observe, type):
+            raise self.observe("页面已跳转")
+        if not self.observe:
+            self.clock.now += timeout_ms / 1000  # 页面内等待到超时
+        return self.observe
+
+    def execute_script(self, script, *args):
+        self.scripts.append((script, args))
+        if self.script_error is not None:
+            raise self.script_error("javascript error")
+        return self.script_result
+
+    def find_elements(self, by, selector):
+        self.lookups.append(selector)
+        if selector in self.invalid:
+            raise InvalidSelectorException(selector)
+        if self.lookups.count(selector) < self.appear_after.get(selector, 0):
+            return []
+        return [self.elements[selector]] if selector in self.elements else []
+
+    def find_element(self, by, selector):
+        elements = self.find_elements(by, selector)
+        if not elements:
+            raise web.NoSuchElementException(selector)
+        return elements[0]
+
+
+class FakeBit:
+    def open(self, browser_id):
+        return {'data': {'driver': 'chromedriver', 'http': '127.0.0.1:9222'}}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(web, 'time', clock)
+    return clock
+
+
+@pytest.fixture
+def page(clock, monkeypatch):
+    """连接到 PageDriver 的 Web"""
+    driver = PageDriver(clock)
+    monkeypatch.setattr(web.driver_cache, 'attach', lambda browser_id, path, address: driver)
+    return web.Web(FakeBit(), 'w1')
+
+
+def test_wait_for_element_returns_when_observer_finds_it(page, clock):
+    page.driver.observe = True
+    assert page.wait_for_element('#result', timeout=5)
+    assert page.driver.async_calls == [('#result', 5000)]
+    assert page.driver.script_timeouts == [6]  # 异步脚本超时比页面内计时长
+    assert page.driver.lookups == []
+    assert clock.sleeps == []
+    # 超时不变时不再重复设置
+    page.wait_for_element('#other', timeout=5)
+    assert page.driver.script_timeouts == [6]
+
+
+def test_wait_for_element_times_out(page, clock):
+    page.driver.observe = False
+    assert not page.wait_for_element('#missing', timeout=2)
+    assert page.driver.async_calls == [('#missing', 2000)]
+    # 页面内已等到超时，只补查一次，不再轮询
+    assert page.driver.lookups == ['#missing']
+    assert clock.sleeps == []
+
+
+def test_wait_for_element_polls_when_observer_fails(page, clock):
+    page.driver.observe = web.WebDriverException
+    page.driver.elements['#late'] = FakeElement()
+    page.driver.appear_after['#late'] = 4
+    assert page.wait_for_element('#late', timeout=5)
+    assert page.driver.lookups == ['#late'] * 4
+    assert clock.sleeps == [0.05, 0.1, 0.2]  # 轮询间隔翻倍
+
+
+def test_poll_fallback_times_out_with_capped_interval(page, clock):
+    page.driver.observe = web.WebDriverException
+    assert not page.wait_for_element('#missing', timeout=2)
+    assert clock.sleeps[:5] == [0.05, 0.1, 0.2, 0.4, 0.5]
+    assert max(clock.sleeps) == 0.5
+    assert sum(clock.sleeps) == pytest.approx(2)  # 最后一次只等待剩余时间
+
+
+def test_poll_mode_skips_observer(page, clock):
+    page.wait_mode = 'poll'
+    page.driver.elements['#ready'] = FakeElement()
+    assert page.wait_for_element('#ready')
+    assert page.driver.async_calls == []
+    assert page.driver.lookups == ['#ready']
+
+
+def test_live_selectors_keeps_requested_order(page):
+    page.driver.script_result = ['#c', '#a', '#unknown']
+    assert page.live_selectors(('#a', '#b', '#c')) == ['#a', '#c']
+    script, args = page.driver.scripts[0]
+    assert script == web.LIVE_SELECTORS_JS
+    assert args == (['#a', '#b', '#c'],)  # 一次脚本调用检查全部选择器
+    assert page.driver.lookups == []
+
+    page.driver.script_result = None
+    assert page.live_selectors(['#a']) == []
+
+
+def test_live_selectors_checks_one_by_one_when_script_fails(page):
+    page.driver.script_error = web.WebDriverException
+    page.driver.elements = {'#shown': FakeElement(), '#hidden': FakeElement(displayed=False)}
+    page.driver.invalid.add('a[')
+    assert page.live_selectors(['#hidden', 'a[', '#shown', '#missing']) == ['#shown']
+    assert page.driver.lookups == ['#hidden', 'a[', '#shown', '#missing']
+
+
+def click_context(page, monkeypatch):
+    clicked, messages = [], []
+    monkeypatch.setattr(page, 'click', clicked.append)
+    ctx = SimpleNamespace(web_browser=page,
+                          show_message=lambda message, clear=False, level="info": messages.append((level, message)))
+    return ctx, clicked, messages
+
+
+def test_click_chooses_among_live_selectors(page, monkeypatch):
+    ctx, clicked, messages = click_context(page, monkeypatch)
+    page.driver.script_result = ['#b']
+    commands.click(ctx, SimpleNamespace(args=['#a', '#b', '#c']))
+    assert clicked == ['#b']
+    assert messages == [("info", "随机选择元素: #b")]
+
+
+def test_click_warns_when_no_candidate_is_live(page, monkeypatch):
+    ctx, clicked, messages = click_context(page, monkeypatch)
+    page.driver.script_error = web.WebDriverException
+    commands.click(ctx, SimpleNamespace(args=['#a', '#b']))
+    assert clicked == []
+    assert messages == [("warning", "候选元素均未找到: #a, #b")]
+
+
+def test_click_single_selector_skips_live_check(page, monkeypatch):
+    ctx, clicked, messages = click_context(page, monkeypatch)
+    commands.click(ctx, SimpleNamespace(args=['#a']))
+    assert clicked == ['#a']
+    assert page.driver.scripts == []
+
+
+@pytest.fixture
+def field(page):
+    element = FakeElement()
+    page.driver.elements['#q'] = element
+    return element
+
+
+def test_human_input_types_one_character_at_a_time(page, clock, field):
+    page.set_input_mode(web.INPUT_HUMAN, min_delay=0.1, max_delay=0.3)
+    page.input_text('#q', "hello")
+    assert field.cleared
+    assert field.keys == list("hello")
+    assert len(clock.sleeps) == 5
+    assert all(0.1 <= delay <= 0.3 for delay in clock.sleeps)
+
+
+def test_chunk_input_sends_chunks(page, clock, field):
+    page.set_input_mode(web.INPUT_CHUNK, min_delay=0.2, max_delay=0.2, chunk_size=3)
+    page.input_text('#q', "abcdefg")
+    assert field.keys == ['abc', 'def', 'g']
+    assert clock.sleeps == [0.2, 0.2, 0.2]
+
+
+def test_input_without_delay_does_not_sleep(page, clock, field):
+    page.set_input_mode(web.INPUT_CHUNK, min_delay=0, max_delay=0, chunk_size=0)
+    page.input_text('#q', "abc")
+    assert field.keys == ['a', 'b', 'c']  # 每段至少 1 个字
+    assert clock.sleeps == []
+
+
+def test_fast_input_sends_all_text_at_once(page, clock, field):
+    page.set_input_mode(web.INPUT_FAST)
+    page.input_text('#q', "hello world")
+    assert field.cleared
+    assert field.keys == ["hello world"]
+    assert clock.sleeps == []
+
+
+def test_script_input_sets_value_in_one_call(page, clock, field):
+    page.set_input_mode(web.INPUT_SCRIPT)
+    page.input_text('#q', "hello")
+    assert page.driver.scripts == [(web.SET_VALUE_JS, (field, "hello"))]
+    assert field.keys == [] and not field.cleared
+    assert clock.sleeps == []
+
+
+def test_invalid_input_mode_is_rejected(page):
+    with pytest.raises(ValueError, match="未知的输入方式"):
+        page.set_input_mode('paste')
+    assert page.input_mode == web.INPUT_HUMAN
+
+
+def test_input_into_missing_element_is_reported(page, capsys):
+    page.input_text('#missing', "hello")
+    assert "元素未找到: #missing" in capsys.readouterr().out